@@ -1,155 +1,31 @@
 # booking/admin.py
 import io
-import csv
-import base64
-import plotly.express as px
-import plotly.io as pio
 import datetime
-import matplotlib
-matplotlib.use("Agg")   # non-GUI backend
-import matplotlib.pyplot as plt
 
-from django.http import HttpResponse
-from django.db.models import Count, Sum, Avg, F, ExpressionWrapper, DurationField
+from django import forms
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.db.models import Avg, Count, Max, Q
 from django.utils.html import format_html
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
 from django.template.response import TemplateResponse
-from django.urls import path
+from django.urls import path, reverse
 from django.utils import timezone
-from django.template.loader import render_to_string
-from weasyprint import HTML
-from django.core.cache import cache
-
-from .models import Room, Booking
-
-# Example: Weekly Bookings
-def get_weekly_bookings_chart(queryset):
-    df = queryset.values("check_in").order_by("check_in")
-    if not df:
-        return None
-
-    # Convert to pandas dataframe (Plotly likes DataFrames)
-    import pandas as pd
-    data = pd.DataFrame(df)
-
-    fig = px.histogram(
-        data,
-        x="check_in",
-        nbins=7,
-        title="Weekly Bookings",
-        labels={"check_in": "Check-in Date", "count": "Bookings"},
-    )
-
-    fig.update_layout(
-        template="plotly_white",
-        margin=dict(l=10, r=10, t=30, b=10),
-        height=400,
-    )
 
-    # Export as full HTML div (with tooltips!)
-    return pio.to_html(fig, full_html=False, include_plotlyjs="cdn")
-
-
-
-
-# --- SVG helpers (left in place for future use) ---
-def svg_bar(labels, values, title="", width=600, height=300, bar_color="#0d6efd"):
-    if not labels:
-        return "<svg></svg>"
-    max_v = max(values) or 1
-    padding = 20
-    inner_w = width - 2 * padding
-    inner_h = height - 2 * padding
-    bar_w = inner_w / (len(values) * 1.5)
-    gap = bar_w / 2
-    svg_parts = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img" aria-label="{title}">'
-    ]
-    if title:
-        svg_parts.append(f'<title>{title}</title>')
-        svg_parts.append(
-            f'<text x="{width/2}" y="16" text-anchor="middle" font-size="14" fill="#ffffff" style="font-family:Arial">{title}</text>'
-        )
-    svg_parts.append(f'<rect x="0" y="0" width="{width}" height="{height}" fill="none"/>')
-    svg_parts.append(
-        f'<line x1="{padding}" y1="{height-padding}" x2="{width-padding}" y2="{height-padding}" stroke="#ccc" stroke-width="1"/>'
-    )
-
-    cur_x = padding + gap / 2
-    for lab, val in zip(labels, values):
-        h = (val / max_v) * (inner_h - 30)
-        y = (height - padding) - h
-        rect = (
-            f'<g>'
-            f'<rect x="{cur_x}" y="{y}" width="{bar_w}" height="{h}" fill="{bar_color}" '
-            f'style="rx:4; stroke:none;">'
-            f'<animate attributeName="height" from="0" to="{h}" dur="600ms" fill="freeze" />'
-            f'<animate attributeName="y" from="{height-padding}" to="{y}" dur="600ms" fill="freeze" />'
-            f'</rect>'
-            f'<title>{lab}: {val}</title>'
-            f'</g>'
-        )
-        svg_parts.append(rect)
-        svg_parts.append(
-            f'<text x="{cur_x + bar_w/2}" y="{height - padding + 14}" font-size="11" text-anchor="middle" fill="#ffffff" style="font-family:Arial">{lab}</text>'
-        )
-        cur_x += bar_w + gap
-
-    svg_parts.append("</svg>")
-    return "".join(svg_parts)
-
-
-def svg_line(labels, values, title="", width=700, height=300, stroke="#0dcaf0"):
-    if not labels:
-        return "<svg></svg>"
-    max_v = max(values) or 1
-    padding = 30
-    inner_w = width - 2 * padding
-    inner_h = height - 2 * padding
-    pts = []
-    for i, v in enumerate(values):
-        x = padding + (i * (inner_w / max(1, (len(values) - 1))))
-        y = padding + (inner_h - (v / max_v) * inner_h)
-        pts.append((x, y))
-    poly_pts = " ".join(f"{x},{y}" for x, y in pts)
-
-    svg = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img" aria-label="{title}">'
-    ]
-    if title:
-        svg.append(f'<title>{title}</title>')
-        svg.append(
-            f'<text x="{width/2}" y="16" text-anchor="middle" font-size="14" fill="#ffffff" style="font-family:Arial">{title}</text>'
-        )
-    svg.append(f'<rect x="0" y="0" width="{width}" height="{height}" fill="none"/>')
-    svg.append(f'<polyline points="{poly_pts}" fill="none" stroke="{stroke}" stroke-width="2" stroke-linejoin="round" stroke-linecap="round">')
-    svg.append('<animate attributeName="stroke-dashoffset" from="1000" to="0" dur="800ms" fill="freeze" />')
-    svg.append("</polyline>")
-
-    for (x, y), lab, v in zip(pts, labels, values):
-        svg.append(f'<circle cx="{x}" cy="{y}" r="4" fill="{stroke}">')
-        svg.append(f"<title>{lab}: {v}</title>")
-        svg.append("</circle>")
-        svg.append(
-            f'<text x="{x}" y="{height - padding + 14}" text-anchor="middle" font-size="11" fill="#ffffff" style="font-family:Arial">{lab}</text>'
-        )
-    svg.append("</svg>")
-    return "".join(svg)
-
-
-def fig_to_base64(fig):
-    """Save a Matplotlib figure to base64 and close it (prevents GUI & memory leaks)."""
-    buf = io.BytesIO()
-    try:
-        fig.tight_layout()
-    except Exception:
-        pass
-    fig.savefig(buf, format="png", transparent=True)
-    buf.seek(0)
-    s = base64.b64encode(buf.read()).decode("utf-8")
-    plt.close(fig)
-    buf.close()
-    return s
+from .models import Room, Booking, OutboundEmail, ReportJob, SlowQuery
+from .availability import OCCUPYING_STATUSES, RoomUnavailable, nights_taken
+from .reports import report_filename, submit_report
+from .stats import day_bounds
+from .timing import query_budget
+from .dashboard import plan_dashboard
+from .occupancy import occupancy, occupancy_by_room_type
+from .charts import dashboard_charts, svg_bar, svg_line, weekly_bookings_html
+from .exports import ExportUnavailable, stream_csv, stream_parquet
+from .images import image_variants
+from .pagination import EstimatedCountPaginator, keyset_page
+from .search import search_booking_ids
 
 
 def fig_to_svg(fig, inject_tag=None, values=None):
@@ -181,30 +57,34 @@ def fig_to_svg(fig, inject_tag=None, values=None):
     return svg
 
 
-def apply_dark_style(ax, fig):
-    """Apply dashboard dark styling to a Matplotlib Axes/Figure."""
-    ax.set_facecolor("#1e3c72")
-    fig.patch.set_facecolor("#1e3c72")
-    for spine in ax.spines.values():
-        spine.set_color("white")
-    ax.tick_params(colors="white")
-    ax.xaxis.label.set_color("white")
-    ax.yaxis.label.set_color("white")
-    ax.title.set_color("white")
-
-
-# --- Inline Booking inside Room ---
-class BookingInline(admin.TabularInline):
-    model = Booking
-    extra = 1
-    fields = ("customer_name", "check_in", "check_out")
-    readonly_fields = ("created_at",)
-    show_change_link = True
+# Dashboard ?export=parquet: (values_list field, Parquet column kind) per column
+BOOKING_PARQUET_FIELDS = [
+    ("customer_name", "string"),
+    ("room__room_number", "string"),
+    ("room__room_type", "category"),
+    ("status", "category"),
+    ("payment_status", "category"),
+    ("source", "category"),
+    ("check_in", "date"),
+    ("check_out", "date"),
+    ("amount_paid", "decimal"),
+    ("created_at", "timestamp"),
+]
+BOOKING_PARQUET_COLUMNS = [(field.replace("room__", "room_"), kind) for field, kind in BOOKING_PARQUET_FIELDS]
 
 
 # =========================================
 # Custom Admin Site with Dashboard
 # =========================================
+# session + user + plan_dashboard + occupancy + top rooms/recent bookings + chart data
+DASHBOARD_QUERY_BUDGET = 14
+# best full-text hits shown when searching the Booking changelist
+ADMIN_SEARCH_LIMIT = 500
+# /admin/slow-queries/?days=N: default and largest window
+SLOW_QUERY_DAYS = 7
+SLOW_QUERY_MAX_DAYS = 90
+
+
 class CustomAdminSite(admin.AdminSite):
     site_header = "Paradise Hotel Admin"
     site_title = "Paradise Admin"
@@ -212,18 +92,71 @@ class CustomAdminSite(admin.AdminSite):
 
     def get_urls(self):
         urls = super().get_urls()
-        custom_urls = [path("dashboard/", self.admin_view(self.dashboard_view))]
+        custom_urls = [
+            path("dashboard/", self.admin_view(self.dashboard_view)),
+            path("reports/<int:job_id>/", self.admin_view(self.report_status_view), name="report_status"),
+            path(
+                "reports/<int:job_id>/download/",
+                self.admin_view(self.report_download_view),
+                name="report_download",
+            ),
+            path("slow-queries/", self.admin_view(self.slow_queries_view), name="slow_queries"),
+        ]
         return custom_urls + urls
 
+    @query_budget(DASHBOARD_QUERY_BUDGET)
     def index(self, request, extra_context=None):
         return self.dashboard_view(request)
 
+    def report_status_view(self, request, job_id):
+        """Progress page for a background PDF report (?format=json for polling scripts)."""
+        job = get_object_or_404(ReportJob, pk=job_id)
+        if request.GET.get("format") == "json":
+            return JsonResponse({
+                "id": job.id,
+                "status": job.status,
+                "progress": job.progress,
+                "error": job.error,
+                "download_url": reverse(f"{self.name}:report_download", args=[job.id]) if job.status == "done" else None,
+            })
+        context = dict(self.each_context(request), job=job, title=f"Report #{job.id}")
+        return TemplateResponse(request, "admin/report_status.html", context)
+
+    def report_download_view(self, request, job_id):
+        job = get_object_or_404(ReportJob, pk=job_id, status="done")
+        try:
+            handle = open(job.file_path, "rb")
+        except OSError:
+            raise Http404("Report file is no longer available.")
+        return FileResponse(handle, as_attachment=True, filename=report_filename(job), content_type="application/pdf")
+
+    def slow_queries_view(self, request):
+        """SlowQuery rows grouped by normalized SQL, worst first."""
+        try:
+            days = int(request.GET.get("days") or SLOW_QUERY_DAYS)
+        except ValueError:
+            days = SLOW_QUERY_DAYS
+        days = min(max(days, 1), SLOW_QUERY_MAX_DAYS)
+        since = timezone.now() - datetime.timedelta(days=days)
+        groups = (
+            SlowQuery.objects.filter(created_at__gte=since)
+            .values("fingerprint", "normalized_sql")
+            .annotate(
+                hits=Count("id"),
+                full_scans=Count("id", filter=Q(full_scan=True)),
+                avg_ms=Avg("duration_ms"),
+                max_ms=Max("duration_ms"),
+                last_seen=Max("created_at"),
+            )
+            .order_by("-full_scans", "-max_ms")[:200]
+        )
+        context = dict(self.each_context(request), title="Slow queries", groups=groups, since=since)
+        return TemplateResponse(request, "admin/slow_queries.html", context)
+
+    @query_budget(DASHBOARD_QUERY_BUDGET)
     def dashboard_view(self, request):
         today = timezone.now().date()
 
-        # --- Stats ---
-        total_rooms = Room.objects.count()
-
         # --- Filters from request ---
         start = request.GET.get("start")
         end = request.GET.get("end")
@@ -257,46 +190,65 @@ class CustomAdminSite(admin.AdminSite):
         if start_date > end_date:
             start_date, end_date = end_date, start_date
 
+        # ✅ PDF export: queued for `manage.py run_report_jobs` (booking/reports.py), then polled
+        if request.GET.get("export") == "pdf":
+            job = submit_report(start_date, end_date, room_type=room_type, user=request.user)
+            return redirect(reverse(f"{self.name}:report_status", args=[job.id]))
+
         # --- Safe defaults so template never errors if a chart wasn't created ---
-        chart_base64 = chart_svg = ""
-        room_chart_base64 = room_chart_svg = ""
-        occupancy_chart_base64 = revenue_chart_base64 = source_chart_base64 = ""
-        source_chart_svg = ""
-
-        # simple cache helper (uses Django cache)
-        def cached_chart(key, make_func, timeout=300):
-            val = cache.get(key)
-            if val is not None:
-                return val
-            val = make_func()
-            if val:
-                cache.set(key, val, timeout)
-            return val
+        chart_svg = room_chart_svg = source_chart_svg = ""
 
         # Apply filters
+        created_from, created_to = day_bounds(start_date, end_date)
         bookings_qs = Booking.objects.select_related("room").filter(
-            created_at__date__gte=start_date, created_at__date__lte=end_date
+            created_at__gte=created_from, created_at__lt=created_to
         )
         if room_type:
             bookings_qs = bookings_qs.filter(room__room_type=room_type)
 
-        # --- Updated stats (filtered) ---
-        total_bookings = bookings_qs.count()
-        today_checkins = bookings_qs.filter(check_in=today).count()
-        today_checkouts = bookings_qs.filter(check_out=today).count()
-        paid_bookings = Booking.objects.filter(payment_status="paid")
-        unpaid_bookings = Booking.objects.filter(payment_status="unpaid")
-        refunded_bookings = Booking.objects.filter(payment_status="refunded")
+        # ✅ CSV export: straight from the filtered queryset, before any KPI or chart work
+        if request.GET.get("export") == "csv":
+            return stream_csv(
+                request,
+                "bookings.csv",
+                ["Customer", "Room", "Check-in", "Check-out", "Created At"],
+                bookings_qs.order_by("id"),
+                ("customer_name", "room__room_number", "check_in", "check_out", "created_at"),
+            )
+
+        # ✅ Parquet export (typed, for pandas/Arrow), likewise before the dashboard work.
+        #    Both exports read their rows while the body streams, after this view has
+        #    returned, so @query_budget and the timing middleware only count the queries
+        #    made up to here, not the export's own SELECTs.
+        if request.GET.get("export") == "parquet":
+            try:
+                return stream_parquet(
+                    "bookings.parquet",
+                    BOOKING_PARQUET_COLUMNS,
+                    bookings_qs.order_by("id"),
+                    [field for field, _ in BOOKING_PARQUET_FIELDS],
+                )
+            except ExportUnavailable as exc:
+                return HttpResponse(str(exc), status=501)
+
+        # --- Every KPI for this filter set, in a fixed handful of queries (booking/dashboard.py) ---
+        kpis = plan_dashboard(start_date, end_date, room_type=room_type, today=today)
+        total_rooms = kpis["total_rooms"]
+        total_bookings = kpis["total_bookings"]
+        today_checkins = kpis["today_checkins"]
+        today_checkouts = kpis["today_checkouts"]
 
         # --- Weekly bookings data ---
-        last_week = [end_date - datetime.timedelta(days=i) for i in range(6, -1, -1)]
-        labels = [d.strftime("%b %d") for d in last_week]
-        data = [bookings_qs.filter(created_at__date=d).count() for d in last_week]
+        labels = [d.strftime("%b %d") for d in kpis["week"]]
+        data = kpis["weekly_counts"]
 
         # --- Bar chart: Bookings per Room Type ---
-        room_type_data = bookings_qs.values("room__room_type").annotate(total=Count("id")).order_by("-total")
-        room_labels = [entry["room__room_type"] for entry in room_type_data]
-        room_counts = [entry["total"] for entry in room_type_data]
+        room_labels = [rtype for rtype, _ in kpis["by_room_type"]]
+        room_counts = [total for _, total in kpis["by_room_type"]]
+
+        # --- Bookings by Source ---
+        source_labels = [source for source, _ in kpis["by_source"]]
+        source_counts = [total for _, total in kpis["by_source"]]
 
         # --- SVG fallbacks (non-JS interactive charts) ---
         try:
@@ -304,178 +256,45 @@ class CustomAdminSite(admin.AdminSite):
                 chart_svg = svg_line(labels, data, title="Weekly Bookings")
             if room_labels and any(room_counts):
                 room_chart_svg = svg_bar(room_labels, room_counts, title="Bookings per Room Type")
+            if source_labels and any(source_counts):
+                source_chart_svg = svg_bar(source_labels, source_counts, title="Bookings by Source")
         except Exception:
             chart_svg = chart_svg or ""
             room_chart_svg = room_chart_svg or ""
-
-        # draw room type chart (PNG fallback)
-        if room_labels and any(room_counts):
-            fig2, ax2 = plt.subplots(figsize=(6, 4))
-            ax2.bar(room_labels, room_counts, color="#198754")
-            ax2.set_title("🏨 Bookings per Room Type", fontsize=14, fontweight="bold", color="white")
-            ax2.set_ylabel("Number of Bookings", color="white")
-            ax2.set_xlabel("Room Type", color="white")
-            apply_dark_style(ax2, fig2)
-            plt.xticks(rotation=20, color="white")
-            plt.yticks(color="white")
-            key = f"chart_roomtype:{start_date}:{end_date}:{room_type or 'all'}"
-            room_chart_base64 = cached_chart(key, lambda: fig_to_base64(fig2), timeout=300)
-        else:
-            room_chart_base64 = ""
-
-        # --- Weekly line chart (PNG fallback) ---
-        if labels and any(data):
-            fig, ax = plt.subplots(figsize=(7, 4))
-            ax.plot(labels, data, marker="o", color="#0dcaf0", linewidth=2)
-            ax.fill_between(labels, data, color="#0dcaf0", alpha=0.25)
-            ax.grid(True, linestyle="--", alpha=0.4)
-            ax.set_title("📈 Weekly Bookings", fontsize=14, fontweight="bold", color="white")
-            ax.set_ylabel("Bookings", color="white")
-            ax.set_xlabel("Date", color="white")
-            apply_dark_style(ax, fig)
-            plt.xticks(rotation=30, color="white", fontsize=9)
-            plt.yticks(color="white", fontsize=9)
-            key = f"chart_weekly:{start_date}:{end_date}:{room_type or 'all'}"
-            chart_base64 = cached_chart(key, lambda: fig_to_base64(fig), timeout=300)
-        else:
-            chart_base64 = ""
+            source_chart_svg = source_chart_svg or ""
 
         # --- Revenue per Room Type ---
-        revenue_per_type = bookings_qs.values("room__room_type").annotate(total_revenue=Sum("room__price")).order_by(
-            "-total_revenue"
-        )
-
-        # --- Daily Revenue Trend ---
-        revenue_data = bookings_qs.values("check_in").annotate(total=Sum("room__price")).order_by("check_in")
-        revenue_labels = [r["check_in"].strftime("%b %d") for r in revenue_data if r.get("check_in")]
-        revenue_totals = [r["total"] for r in revenue_data if r.get("check_in")]
-
-        if revenue_labels and any(revenue_totals):
-            fig4, ax4 = plt.subplots(figsize=(7, 4))
-            ax4.plot(revenue_labels, revenue_totals, marker="o", color="#28a745", linewidth=2)
-            ax4.fill_between(revenue_labels, revenue_totals, color="#28a745", alpha=0.25)
-            ax4.set_title("💰 Revenue Trend (Daily)", fontsize=14, fontweight="bold", color="white")
-            ax4.set_ylabel("Revenue ($)", color="white")
-            apply_dark_style(ax4, fig4)
-            plt.xticks(rotation=30, color="white")
-            plt.yticks(color="white")
-            ax4.grid(True, linestyle="--", alpha=0.4)
-            key = f"chart_revenue:{start_date}:{end_date}:{room_type or 'all'}"
-            revenue_chart_base64 = cached_chart(key, lambda: fig_to_base64(fig4), timeout=300)
-        else:
-            revenue_chart_base64 = ""
+        # (keys kept as room__room_type/total_revenue for the dashboard and PDF templates)
+        revenue_per_type = kpis["revenue_per_type"]
 
         # --- Average Stay Duration (in days) ---
-        avg_stay = bookings_qs.annotate(
-            stay_length=ExpressionWrapper(F("check_out") - F("check_in"), output_field=DurationField())
-        ).aggregate(avg_days=Avg("stay_length"))
-        avg_stay_days = (avg_stay["avg_days"].days if avg_stay["avg_days"] else 0)
-
-        # --- Occupancy Rate ---
-        booked_days = sum([(b.check_out - b.check_in).days for b in bookings_qs if b.check_out and b.check_in])
-        days_span = (end_date - start_date).days + 1 if (end_date and start_date) else 30
-        if days_span <= 0:
-            days_span = 30
-        total_room_days = Room.objects.count() * days_span
-        occupancy_rate = round((booked_days / total_room_days) * 100, 2) if total_room_days else 0
-
-        # --- Occupancy Pie Chart ---
-        if total_room_days > 0:
-            values_pie = [booked_days, max(total_room_days - booked_days, 0)]
-            if sum(values_pie) > 0:
-                fig3, ax3 = plt.subplots(figsize=(5, 5))
-                labels_pie = ["Booked", "Available"]
-                colors = ["#0d6efd", "#6c757d"]
-                ax3.pie(values_pie, labels=labels_pie, autopct="%1.1f%%", startangle=140, colors=colors)
-                fig3.patch.set_facecolor("#1e3c72")
-                key = f"chart_occupancy:{start_date}:{end_date}:{room_type or 'all'}"
-                occupancy_chart_base64 = cached_chart(key, lambda: fig_to_base64(fig3), timeout=300)
-            else:
-                occupancy_chart_base64 = ""
-        else:
-            occupancy_chart_base64 = ""
+        avg_stay_days = kpis["avg_stay_days"]
 
-        # --- Bookings by Source ---
-        source_data = bookings_qs.values("source").annotate(total=Count("id")).order_by("-total")
-        source_labels = [s["source"] for s in source_data]
-        source_counts = [s["total"] for s in source_data]
+        # --- Occupancy Rate (room-nights inside the window, counted in SQL; booking/occupancy.py) ---
+        occupancy_stats = occupancy(start_date, end_date, room_type=room_type)
+        occupancy_rate = occupancy_stats["rate"]
+        occupancy_per_type = occupancy_by_room_type(start_date, end_date)
 
-        # SVG fallback for source
-        try:
-            if source_labels and any(source_counts):
-                source_chart_svg = svg_bar(source_labels, source_counts, title="Bookings by Source")
-        except Exception:
-            source_chart_svg = source_chart_svg or ""
-
-        if source_labels and any(source_counts):
-            fig5, ax5 = plt.subplots(figsize=(6, 4))
-            ax5.bar(source_labels, source_counts, color="#ffc107")
-            ax5.set_title("📊 Bookings by Source", fontsize=14, fontweight="bold", color="white")
-            ax5.set_ylabel("Number of Bookings", color="white")
-            apply_dark_style(ax5, fig5)
-            plt.xticks(rotation=15, color="white")
-            plt.yticks(color="white")
-            key = f"chart_source:{start_date}:{end_date}:{room_type or 'all'}"
-            source_chart_base64 = cached_chart(key, lambda: fig_to_base64(fig5), timeout=300)
-        else:
-            source_chart_base64 = ""
-
-        # ✅ CSV export
-        if request.GET.get("export") == "csv":
-            response = HttpResponse(content_type="text/csv")
-            response["Content-Disposition"] = "attachment; filename=bookings.csv"
-            writer = csv.writer(response)
-            writer.writerow(["Customer", "Room", "Check-in", "Check-out", "Created At"])
-            for b in bookings_qs:
-                writer.writerow([b.customer_name, b.room.room_number, b.check_in, b.check_out, b.created_at])
-            return response
-
-        # ✅ PDF export
-        if request.GET.get("export") == "pdf":
-            pdf_context = {
-                "bookings": bookings_qs,
-                "total_rooms": total_rooms,
-                "total_bookings": total_bookings,
-                "today_checkins": today_checkins,
-                "today_checkouts": today_checkouts,
-                "revenue_per_type": revenue_per_type,
-                "avg_stay_days": avg_stay_days,
-                "occupancy_rate": occupancy_rate,
-                "chart": chart_base64,
-                "room_chart": room_chart_base64,
-                "occupancy_chart": occupancy_chart_base64,
-                "revenue_chart": revenue_chart_base64,
-                "source_chart": source_chart_base64,
-                "chart_svg": chart_svg,
-                "room_chart_svg": room_chart_svg,
-                "filter_start": start_date,
-                "filter_end": end_date,
-            }
-            html_string = render_to_string("admin/pdf_report.html", pdf_context)
-            filename = f"bookings_report_{start_date.isoformat()}_to_{end_date.isoformat()}.pdf"
-            pdf_file = HTML(string=html_string).write_pdf()
-            response = HttpResponse(pdf_file, content_type="application/pdf")
-            response["Content-Disposition"] = f'attachment; filename="{filename}"'
-            return response
+        # --- PNG charts: cache first, Matplotlib only on a miss (booking/charts.py) ---
+        charts = dashboard_charts(start_date, end_date, room_type, kpis, occupancy_stats)
+        chart_base64 = charts["chart"]
+        room_chart_base64 = charts["room_chart"]
+        occupancy_chart_base64 = charts["occupancy_chart"]
+        revenue_chart_base64 = charts["revenue_chart"]
+        source_chart_base64 = charts["source_chart"]
 
         # --- Top rooms (dicts keyed to match templates expecting room__room_number) ---
-        top_rooms_agg = (
-            bookings_qs.values("room")
+        top_rooms = [
+            {
+                "room__room_number": a["room__room_number"],
+                "room__room_type": a["room__room_type"],
+                "status": a["room__status"],
+                "total_bookings": a["total_bookings"],
+            }
+            for a in bookings_qs.values("room", "room__room_number", "room__room_type", "room__status")
             .annotate(total_bookings=Count("id"))
             .order_by("-total_bookings")[:3]
-        )
-        room_ids = [a["room"] for a in top_rooms_agg]
-        rooms = Room.objects.filter(id__in=room_ids)
-        room_map = {r.id: r for r in rooms}
-        top_rooms = []
-        for a in top_rooms_agg:
-            r = room_map.get(a["room"])
-            top_rooms.append({
-                "room__room_number": r.room_number if r else "",
-                "room__room_type": r.room_type if r else "",
-                "status": r.status if r else "",
-                "total_bookings": a["total_bookings"],
-            })
+        ]
 
         recent_bookings = bookings_qs.order_by("-created_at")[:5]
 
@@ -503,12 +322,13 @@ class CustomAdminSite(admin.AdminSite):
             revenue_per_type=revenue_per_type,
             avg_stay_days=avg_stay_days,
             occupancy_rate=occupancy_rate,
+            occupancy_per_type=occupancy_per_type,
             # Filters to show in template if needed
             filter_start=start_date,
             filter_end=end_date,
             filter_room_type=room_type,
         )
-        context["chart_html"] = get_weekly_bookings_chart(Booking.objects.all())
+        context["chart_html"] = weekly_bookings_html(start_date, end_date, room_type)
         return TemplateResponse(request, "admin/dashboard.html", context)
 
 
@@ -516,22 +336,58 @@ class CustomAdminSite(admin.AdminSite):
 custom_admin_site = CustomAdminSite(name="custom_admin")
 
 
-#
-class BookingInline(admin.TabularInline):
-    model = Booking
-    extra = 0
-
-
-
+# --- Room Admin ---
+ROOM_BOOKINGS_PAGE_SIZE = 20
+ROOM_BOOKING_FIELDS = (
+    "id", "invoice_number", "customer_name", "check_in", "check_out", "status", "payment_status",
+)
 
 
-# --- Room Admin ---
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
     list_display = ("room_number", "room_type", "price", "status_badge", "preview_image")
     search_fields = ("room_number", "room_type")
     list_filter = ("room_type", "status")
-    inlines = [BookingInline]
+    # the room's bookings are a read-only list fetched page by page (room_bookings_view),
+    # not inline forms: opening a room with years of history stays one query
+    change_form_template = "admin/booking/room/change_form.html"
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                "<path:object_id>/bookings/",
+                self.admin_site.admin_view(self.room_bookings_view),
+                name="%s_%s_bookings" % info,
+            ),
+        ] + super().get_urls()
+
+    def can_view_bookings(self, request):
+        """The fragment lists Booking rows, so it follows the Booking admin's permission, not the Room one."""
+        if self.admin_site.is_registered(Booking):
+            return self.admin_site.get_model_admin(Booking).has_view_permission(request)
+        return request.user.has_perm("booking.view_booking")
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        extra_context = {**(extra_context or {}), "can_view_bookings": self.can_view_bookings(request)}
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def room_bookings_view(self, request, object_id):
+        """One page of the room's bookings, latest check-in first, as an HTML fragment."""
+        if not (self.has_view_permission(request) and self.can_view_bookings(request)):
+            raise PermissionDenied
+        page = keyset_page(
+            Booking.objects.filter(room_id=object_id).only(*ROOM_BOOKING_FIELDS),
+            request.GET,
+            per_page=ROOM_BOOKINGS_PAGE_SIZE,
+            key="check_in",
+        )
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, "admin/booking/room/bookings_page.html", {
+            "bookings": page["items"],
+            "older": page["older"],
+            "today": timezone.localdate(),
+        })
 
     def status_badge(self, obj):
         color_map = {"available": "green", "booked": "red", "maintenance": "orange"}
@@ -546,8 +402,11 @@ class RoomAdmin(admin.ModelAdmin):
 
     def preview_image(self, obj):
         if obj.image:
+            # smallest stored variant (booking/images.py) rather than the full-size upload
+            jpegs = image_variants(obj.image).get("jpg")
             return format_html(
-                '<img src="{}" width="60" height="40" style="object-fit:cover;" />', obj.image.url
+                '<img src="{}" width="60" height="40" style="object-fit:cover;" loading="lazy" />',
+                jpegs[0][1] if jpegs else obj.image.url,
             )
         return "No Image"
 
@@ -557,8 +416,29 @@ class RoomAdmin(admin.ModelAdmin):
 # --- Booking Admin ---
 # booking/admin.py (inside BookingAdmin)
 
+class BookingAdminForm(forms.ModelForm):
+    class Meta:
+        model = Booking
+        fields = "__all__"
+
+    def clean(self):
+        """Reject a stay that overlaps nights another booking already holds."""
+        cleaned = super().clean()
+        room, check_in, check_out = cleaned.get("room"), cleaned.get("check_in"), cleaned.get("check_out")
+        if room and check_in and check_out and cleaned.get("status") in OCCUPYING_STATUSES:
+            if check_out <= check_in:
+                raise forms.ValidationError("Check-out must be after check-in.")
+            exclude = self.instance if self.instance.pk else None
+            if nights_taken(room, check_in, check_out, exclude_booking=exclude):
+                raise forms.ValidationError(
+                    f"Room {room.room_number} is already booked for some nights of {check_in} → {check_out}."
+                )
+        return cleaned
+
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
+    form = BookingAdminForm
     list_display = (
         "invoice_number",
         "customer_name",
@@ -577,9 +457,99 @@ class BookingAdmin(admin.ModelAdmin):
     "amount_paid", "payment_date", "refund_requested", "refund_amount", "refund_date")
     list_filter = ("status", "payment_status", "refund_requested")
     search_fields = ("invoice_number", "customer_name", "room__room_number", "user__username", "user__email")
+    search_help_text = "Invoice number, room number, username or email (exact), or the start of the guest's name."
     ordering = ("-created_at",)
 
+    # ✅ High-volume changelist: one joined query per page, no COUNT(*) over the whole
+    #    table, and date drill-down on indexed created_at ranges
+    list_select_related = ("room", "user")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    date_hierarchy = "created_at"
 
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        # the form already checks overlaps; this covers a booking saved by someone else
+        # in between (the admin's transaction has rolled the save back by now)
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except RoomUnavailable as exc:
+            self.message_user(request, f"Not saved: {exc}", level=messages.ERROR)
+            return redirect(request.get_full_path())
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        The full-text index (booking/search.py) where there is one: every word
+        as a prefix, best ADMIN_SEARCH_LIMIT hits. Otherwise indexed_search().
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        ids = search_booking_ids(term, limit=ADMIN_SEARCH_LIMIT)
+        if ids is not None:
+            return queryset.filter(id__in=ids), False
+        return self.indexed_search(queryset, term), False
+
+    @staticmethod
+    def indexed_search(queryset, term):
+        """
+        Only index-backed lookups, OR'ed on Booking's own columns: exact invoice
+        number, room/user via id subqueries, and a case-sensitive prefix range on
+        customer_name (tried as typed, Capitalized and Title Cased).
+        """
+        names = Q()
+        for variant in dict.fromkeys((term, term.capitalize(), term.title())):
+            names |= Q(customer_name__gte=variant, customer_name__lt=variant + "\U0010ffff")
+        matches = (
+            Q(invoice_number=term.upper())
+            | Q(room__in=Room.objects.filter(room_number=term).values("id"))
+            | Q(user__in=User.objects.filter(Q(username=term) | Q(email__iexact=term)).values("id"))
+            | names
+        )
+        return queryset.filter(matches)
+
+
+
+
+# --- Email outbox (delivered by `manage.py deliver_outbox`) ---
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("subject",)
+    readonly_fields = ("attempts", "last_error", "created_at", "sent_at")
+    list_select_related = ("booking",)
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status="sent").update(status="pending", next_attempt_at=timezone.now())
+        self.message_user(request, f"{updated} email(s) queued for retry.")
+
+
+# --- Background PDF reports (rendered by `manage.py run_report_jobs`) ---
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "params", "status", "progress", "requested_by", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("params", "requested_by", "progress", "file_path", "error", "created_at", "started_at", "finished_at")
+    list_select_related = ("requested_by",)
+
+
+# --- Slow-query log (booking/slow_queries.py); grouped view at /admin/slow-queries/ ---
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "duration_ms", "reason", "full_scan", "source", "short_sql")
+    list_filter = ("reason", "full_scan", "source")
+    search_fields = ("=fingerprint", "normalized_sql")
+    readonly_fields = [f.name for f in SlowQuery._meta.fields]
+    date_hierarchy = "created_at"
+
+    @admin.display(description="SQL")
+    def short_sql(self, obj):
+        return obj.normalized_sql[:120]
+
+    def has_add_permission(self, request):
+        return False
 
 
 # Ensure the same ModelAdmin classes are registered with the custom admin site
@@ -594,3 +564,18 @@ try:
     custom_admin_site.register(Booking, BookingAdmin)
 except Exception:
     pass
+
+try:
+    custom_admin_site.register(OutboundEmail, OutboundEmailAdmin)
+except Exception:
+    pass
+
+try:
+    custom_admin_site.register(ReportJob, ReportJobAdmin)
+except Exception:
+    pass
+
+try:
+    custom_admin_site.register(SlowQuery, SlowQueryAdmin)
+except Exception:
+    pass
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the model signal handlers)
+        from django.db import connections
+        from .slow_queries import install
+
+        # connections opened before the connection_created handler was connected
+        for connection in connections.all(initialized_only=True):
+            install(connection)
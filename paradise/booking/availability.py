@@ -0,0 +1,137 @@
+# booking/availability.py
+"""
+Room-night occupancy index.
+
+Every night a room is held by an active booking is one RoomNight row, so an
+availability search is a single range lookup on (night, room) whose cost
+depends on the number of nights asked for, not on the size of the Booking
+table.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+
+from .models import Booking, Room, RoomNight
+
+# Bookings in these states hold their room; cancelled/refunded ones release it.
+OCCUPYING_STATUSES = ("pending", "confirmed")
+
+
+class RoomUnavailable(Exception):
+    """Raised when a booking would overlap nights already held for the room."""
+
+
+def stay_nights(check_in, check_out):
+    """Every night of a stay: check_in inclusive, check_out exclusive."""
+    nights = []
+    day = check_in
+    while day < check_out:
+        nights.append(day)
+        day += timedelta(days=1)
+    return nights
+
+
+def _as_date(booking, field_name):
+    # Booking.objects.create(check_in="2025-01-01") leaves strings on the instance
+    return booking._meta.get_field(field_name).to_python(getattr(booking, field_name))
+
+
+def check_booking_nights(booking):
+    """Raise RoomUnavailable if another booking already holds a night this one wants."""
+    check_in = _as_date(booking, "check_in")
+    check_out = _as_date(booking, "check_out")
+    if booking.status not in OCCUPYING_STATUSES or not (check_in and check_out and booking.room_id):
+        return
+    nights = RoomNight.objects.filter(room_id=booking.room_id, night__gte=check_in, night__lt=check_out)
+    if booking.pk is not None:
+        nights = nights.exclude(booking_id=booking.pk)
+    if nights.exists():
+        raise RoomUnavailable(
+            f"Room {booking.room_id} is already booked for part of {check_in} → {check_out}."
+        )
+
+
+def sync_booking_nights(booking):
+    """
+    Bring the booking's RoomNight rows in line with its current room, dates
+    and status. Only the difference is written, so saves that don't touch the
+    stay (payment updates etc.) cost a single indexed SELECT.
+
+    Raises RoomUnavailable if another booking already holds one of the nights.
+    """
+    wanted = set()
+    check_in = _as_date(booking, "check_in")
+    check_out = _as_date(booking, "check_out")
+    if booking.status in OCCUPYING_STATUSES and check_in and check_out:
+        wanted = {(booking.room_id, night) for night in stay_nights(check_in, check_out)}
+
+    existing = set(RoomNight.objects.filter(booking=booking).values_list("room_id", "night"))
+
+    stale = existing - wanted
+    if stale:
+        # a booking only ever holds one room, so matching on night is enough
+        RoomNight.objects.filter(booking=booking, night__in=[night for _, night in stale]).delete()
+
+    missing = wanted - existing
+    if missing:
+        try:
+            with transaction.atomic():
+                RoomNight.objects.bulk_create(
+                    RoomNight(room_id=room_id, booking=booking, night=night)
+                    for room_id, night in sorted(missing, key=lambda rn: rn[1])
+                )
+        except IntegrityError as exc:
+            raise RoomUnavailable(
+                f"Room {booking.room_id} is already booked for part of {check_in} → {check_out}."
+            ) from exc
+
+
+def release_bookings(booking_ids):
+    """Drop the nights held by bookings that were cancelled with a bulk update()."""
+    return RoomNight.objects.filter(booking_id__in=booking_ids).delete()[0]
+
+
+def taken_room_ids(check_in, check_out):
+    """Subquery of room ids holding at least one night in [check_in, check_out)."""
+    return RoomNight.objects.filter(night__gte=check_in, night__lt=check_out).values("room_id")
+
+
+def available_rooms(check_in, check_out, room_type=None):
+    """Rooms (optionally of one type) that are free for every night of the stay."""
+    rooms = Room.objects.exclude(status="maintenance")
+    if room_type:
+        rooms = rooms.filter(room_type=room_type)
+    return rooms.exclude(id__in=taken_room_ids(check_in, check_out)).order_by("room_number")
+
+
+def nights_taken(room, check_in, check_out, exclude_booking=None):
+    """True if another booking holds the room for any night of the stay."""
+    nights = RoomNight.objects.filter(room=room, night__gte=check_in, night__lt=check_out)
+    if exclude_booking is not None:
+        nights = nights.exclude(booking=exclude_booking)
+    return nights.exists()
+
+
+def is_room_available(room, check_in, check_out, exclude_booking=None):
+    """True if the room is in service and no other booking holds it for any night of the stay."""
+    if room.status == "maintenance":
+        return False
+    return not nights_taken(room, check_in, check_out, exclude_booking)
+
+
+def rebuild_room_nights(bookings=None):
+    """Recompute the index from scratch (or for the given bookings). Returns nights indexed."""
+    if bookings is None:
+        RoomNight.objects.all().delete()
+        bookings = Booking.objects.filter(status__in=OCCUPYING_STATUSES)
+    written = 0
+    batch = []
+    for booking in bookings.only("id", "room", "check_in", "check_out").iterator(chunk_size=2000):
+        for night in stay_nights(booking.check_in, booking.check_out):
+            batch.append(RoomNight(room_id=booking.room_id, booking_id=booking.id, night=night))
+        if len(batch) >= 5000:
+            written += len(RoomNight.objects.bulk_create(batch, ignore_conflicts=True))
+            batch = []
+    if batch:
+        written += len(RoomNight.objects.bulk_create(batch, ignore_conflicts=True))
+    return written
@@ -0,0 +1,130 @@
+# booking/catalogue.py
+"""
+Cached public room catalogue (room list, room detail, the book-a-room form).
+
+Rooms change a few times a day, so anonymous catalogue pages are cached as
+whole responses under a version number, and the version doubles as the
+ETag / Last-Modified for conditional GETs:
+
+  catalogue version   bumped by Room post_save/post_delete (booking/signals.py)
+                      and by bulk jobs that bypass signals (seed_bookings,
+                      billing_maintenance)
+  room version        bumped when one of the room's bookings changes, since
+                      room_detail lists them
+
+A version is the time.time() of the last change, so it is also the
+Last-Modified date. A warm hit costs one or two cache gets and no queries.
+Availability searches (?check_in=&check_out=) depend on bookings across all
+rooms and are never cached; neither are signed-in users' pages.
+
+Versions only reach the other workers through a shared cache backend
+(settings.CACHES, file-based by default); with a per-process LocMemCache a
+bump would invalidate one worker's pages and leave the rest stale.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Room
+
+CATALOGUE_TIMEOUT = 60 * 60   # safety net; versions normally retire entries first
+CATALOGUE_VERSION_KEY = "catalogue:version"
+
+
+def _room_version_key(room_id):
+    return f"catalogue:room:{room_id}:version"
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        # first use (or the cache was cleared): treat everything as changed now
+        cache.add(key, time.time(), None)
+        version = cache.get(key) or time.time()
+    return version
+
+
+def bump_catalogue():
+    """Invalidate every cached catalogue page and room list."""
+    cache.set(CATALOGUE_VERSION_KEY, time.time(), None)
+
+
+def bump_room(room_id):
+    """Invalidate the cached detail page of one room."""
+    if room_id is not None:
+        cache.set(_room_version_key(room_id), time.time(), None)
+
+
+def catalogue_rooms():
+    """All rooms, cached until the catalogue version changes. Safe to use behind CSRF forms."""
+    key = f"catalogue:rooms:{_version(CATALOGUE_VERSION_KEY)}"
+    rooms = cache.get(key)
+    if rooms is None:
+        rooms = list(Room.objects.order_by("room_number"))
+        cache.set(key, rooms, CATALOGUE_TIMEOUT)
+    return rooms
+
+
+# ========================
+# Full-response cache + conditional GET
+# ========================
+def _cacheable(request):
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        and not request.GET.get("check_in")
+        and not request.GET.get("check_out")
+    )
+
+
+def _page_version(request, pk=None):
+    """(etag, last_modified timestamp) for this page, or (None, None) when it isn't cacheable."""
+    if not hasattr(request, "_catalogue_page"):
+        request._catalogue_page = (None, None)
+        if _cacheable(request):
+            versions = [_version(CATALOGUE_VERSION_KEY)]
+            if pk is not None:
+                versions.append(_version(_room_version_key(pk)))
+            # only the parameters the pages actually read, so junk query strings share entries
+            raw = "|".join([request.path, request.GET.get("room_type", ""), *map(repr, versions)])
+            request._catalogue_page = (hashlib.sha1(raw.encode()).hexdigest(), max(versions))
+    return request._catalogue_page
+
+
+def _etag(request, pk=None):
+    return _page_version(request, pk)[0]
+
+
+def _last_modified(request, pk=None):
+    last_modified = _page_version(request, pk)[1]
+    return datetime.fromtimestamp(int(last_modified), tz=timezone.utc) if last_modified else None
+
+
+def catalogue_page(view):
+    """
+    Serve anonymous GETs of `view` from the cache, answering 304 when the
+    client's ETag / If-Modified-Since still matches the catalogue version.
+    """
+    @condition(etag_func=_etag, last_modified_func=_last_modified)
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        etag = _etag(request, *args, **kwargs)
+        if etag is None:
+            return view(request, *args, **kwargs)
+
+        key = f"catalogue:page:{etag}"
+        response = cache.get(key)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.cookies:
+                cache.set(key, response, CATALOGUE_TIMEOUT)
+        # browsers and CDNs may keep it, but must revalidate (cheap: a 304)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    return wrapper
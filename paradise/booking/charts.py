@@ -0,0 +1,317 @@
+# booking/charts.py
+"""
+Cache-first PNG charts for the admin dashboard and its PDF export.
+
+Each chart is cached as base64 under a key built from the dashboard filters.
+The cache is read before any Matplotlib work, so a hit costs one cache get.
+On a miss the figure is built, encoded and closed in a finally block, so
+long-lived workers don't keep figures around. `manage.py warm_dashboard_charts`
+fills the cache for the usual filter combinations ahead of time, which only
+helps the web workers because settings.CACHES is shared between processes.
+
+The interactive Plotly chart gets the same treatment with its HTML fragment,
+and is fed a weekly histogram grouped in the database rather than raw rows.
+"""
+import base64
+import io
+
+import matplotlib
+matplotlib.use("Agg")   # non-GUI backend
+import matplotlib.pyplot as plt
+import plotly.express as px
+import plotly.io as pio
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncWeek
+
+from .models import Booking
+from .stats import day_bounds
+from .timing import span
+
+CHART_TIMEOUT = 300
+
+
+def chart_key(name, start_date, end_date, room_type=None):
+    return f"chart_{name}:{start_date}:{end_date}:{room_type or 'all'}"
+
+
+def apply_dark_style(ax, fig):
+    """Apply dashboard dark styling to a Matplotlib Axes/Figure."""
+    ax.set_facecolor("#1e3c72")
+    fig.patch.set_facecolor("#1e3c72")
+    for spine in ax.spines.values():
+        spine.set_color("white")
+    ax.tick_params(colors="white")
+    ax.xaxis.label.set_color("white")
+    ax.yaxis.label.set_color("white")
+    ax.title.set_color("white")
+
+
+def fig_to_base64(fig):
+    """Save a Matplotlib figure to base64 PNG and close it, even if saving fails."""
+    buf = io.BytesIO()
+    try:
+        try:
+            fig.tight_layout()
+        except Exception:
+            pass
+        fig.savefig(buf, format="png", transparent=True)
+        return base64.b64encode(buf.getvalue()).decode("utf-8")
+    finally:
+        plt.close(fig)
+        buf.close()
+
+
+def cached_chart(key, build, timeout=CHART_TIMEOUT, refresh=False):
+    """
+    Base64 PNG for `key`. `build` is only called on a cache miss (or always,
+    with refresh=True) and must return a Matplotlib figure (or None for "no chart").
+    """
+    if not refresh:
+        val = cache.get(key)
+        if val is not None:
+            return val
+    with span("chart"):
+        fig = build()
+        if fig is None:
+            if refresh:
+                cache.delete(key)   # the data no longer has a chart: drop the old one
+            return ""
+        val = fig_to_base64(fig)
+    if val:
+        cache.set(key, val, timeout)
+    return val
+
+
+# =========================================
+# SVG fallbacks (no Matplotlib, no cache needed)
+# =========================================
+def svg_bar(labels, values, title="", width=600, height=300, bar_color="#0d6efd"):
+    if not labels:
+        return "<svg></svg>"
+    max_v = max(values) or 1
+    padding = 20
+    inner_w = width - 2 * padding
+    inner_h = height - 2 * padding
+    bar_w = inner_w / (len(values) * 1.5)
+    gap = bar_w / 2
+    svg_parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img" aria-label="{title}">'
+    ]
+    if title:
+        svg_parts.append(f'<title>{title}</title>')
+        svg_parts.append(
+            f'<text x="{width/2}" y="16" text-anchor="middle" font-size="14" fill="#ffffff" style="font-family:Arial">{title}</text>'
+        )
+    svg_parts.append(f'<rect x="0" y="0" width="{width}" height="{height}" fill="none"/>')
+    svg_parts.append(
+        f'<line x1="{padding}" y1="{height-padding}" x2="{width-padding}" y2="{height-padding}" stroke="#ccc" stroke-width="1"/>'
+    )
+
+    cur_x = padding + gap / 2
+    for lab, val in zip(labels, values):
+        h = (val / max_v) * (inner_h - 30)
+        y = (height - padding) - h
+        rect = (
+            f'<g>'
+            f'<rect x="{cur_x}" y="{y}" width="{bar_w}" height="{h}" fill="{bar_color}" '
+            f'style="rx:4; stroke:none;">'
+            f'<animate attributeName="height" from="0" to="{h}" dur="600ms" fill="freeze" />'
+            f'<animate attributeName="y" from="{height-padding}" to="{y}" dur="600ms" fill="freeze" />'
+            f'</rect>'
+            f'<title>{lab}: {val}</title>'
+            f'</g>'
+        )
+        svg_parts.append(rect)
+        svg_parts.append(
+            f'<text x="{cur_x + bar_w/2}" y="{height - padding + 14}" font-size="11" text-anchor="middle" fill="#ffffff" style="font-family:Arial">{lab}</text>'
+        )
+        cur_x += bar_w + gap
+
+    svg_parts.append("</svg>")
+    return "".join(svg_parts)
+
+
+def svg_line(labels, values, title="", width=700, height=300, stroke="#0dcaf0"):
+    if not labels:
+        return "<svg></svg>"
+    max_v = max(values) or 1
+    padding = 30
+    inner_w = width - 2 * padding
+    inner_h = height - 2 * padding
+    pts = []
+    for i, v in enumerate(values):
+        x = padding + (i * (inner_w / max(1, (len(values) - 1))))
+        y = padding + (inner_h - (v / max_v) * inner_h)
+        pts.append((x, y))
+    poly_pts = " ".join(f"{x},{y}" for x, y in pts)
+
+    svg = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img" aria-label="{title}">'
+    ]
+    if title:
+        svg.append(f'<title>{title}</title>')
+        svg.append(
+            f'<text x="{width/2}" y="16" text-anchor="middle" font-size="14" fill="#ffffff" style="font-family:Arial">{title}</text>'
+        )
+    svg.append(f'<rect x="0" y="0" width="{width}" height="{height}" fill="none"/>')
+    svg.append(f'<polyline points="{poly_pts}" fill="none" stroke="{stroke}" stroke-width="2" stroke-linejoin="round" stroke-linecap="round">')
+    svg.append('<animate attributeName="stroke-dashoffset" from="1000" to="0" dur="800ms" fill="freeze" />')
+    svg.append("</polyline>")
+
+    for (x, y), lab, v in zip(pts, labels, values):
+        svg.append(f'<circle cx="{x}" cy="{y}" r="4" fill="{stroke}">')
+        svg.append(f"<title>{lab}: {v}</title>")
+        svg.append("</circle>")
+        svg.append(
+            f'<text x="{x}" y="{height - padding + 14}" text-anchor="middle" font-size="11" fill="#ffffff" style="font-family:Arial">{lab}</text>'
+        )
+    svg.append("</svg>")
+    return "".join(svg)
+
+
+# =========================================
+# Figure builders (only run on a cache miss)
+# =========================================
+def weekly_figure(labels, data):
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.plot(labels, data, marker="o", color="#0dcaf0", linewidth=2)
+    ax.fill_between(labels, data, color="#0dcaf0", alpha=0.25)
+    ax.grid(True, linestyle="--", alpha=0.4)
+    ax.set_title("📈 Weekly Bookings", fontsize=14, fontweight="bold", color="white")
+    ax.set_ylabel("Bookings", color="white")
+    ax.set_xlabel("Date", color="white")
+    apply_dark_style(ax, fig)
+    ax.tick_params(axis="x", labelrotation=30, labelsize=9)
+    ax.tick_params(axis="y", labelsize=9)
+    return fig
+
+
+def room_type_figure(labels, counts):
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.bar(labels, counts, color="#198754")
+    ax.set_title("🏨 Bookings per Room Type", fontsize=14, fontweight="bold", color="white")
+    ax.set_ylabel("Number of Bookings", color="white")
+    ax.set_xlabel("Room Type", color="white")
+    apply_dark_style(ax, fig)
+    ax.tick_params(axis="x", labelrotation=20)
+    return fig
+
+
+def revenue_figure(labels, totals):
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.plot(labels, totals, marker="o", color="#28a745", linewidth=2)
+    ax.fill_between(labels, totals, color="#28a745", alpha=0.25)
+    ax.set_title("💰 Revenue Trend (Daily)", fontsize=14, fontweight="bold", color="white")
+    ax.set_ylabel("Revenue ($)", color="white")
+    apply_dark_style(ax, fig)
+    ax.tick_params(axis="x", labelrotation=30)
+    ax.grid(True, linestyle="--", alpha=0.4)
+    return fig
+
+
+def occupancy_figure(booked, available):
+    fig, ax = plt.subplots(figsize=(5, 5))
+    ax.pie([booked, available], labels=["Booked", "Available"], autopct="%1.1f%%",
+           startangle=140, colors=["#0d6efd", "#6c757d"])
+    fig.patch.set_facecolor("#1e3c72")
+    return fig
+
+
+def source_figure(labels, counts):
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.bar(labels, counts, color="#ffc107")
+    ax.set_title("📊 Bookings by Source", fontsize=14, fontweight="bold", color="white")
+    ax.set_ylabel("Number of Bookings", color="white")
+    apply_dark_style(ax, fig)
+    ax.tick_params(axis="x", labelrotation=15)
+    return fig
+
+
+def dashboard_charts(start_date, end_date, room_type, kpis, occupancy_stats, refresh=False):
+    """
+    All dashboard PNGs for one filter set, keyed like the template context
+    (chart, room_chart, revenue_chart, occupancy_chart, source_chart).
+    `kpis` is a plan_dashboard() result, `occupancy_stats` an occupancy() one.
+    refresh=True re-renders and overwrites every entry (warm_dashboard_charts).
+    """
+    def key(name):
+        return chart_key(name, start_date, end_date, room_type)
+
+    def chart(name, build):
+        return cached_chart(key(name), build, refresh=refresh)
+
+    def when(values, build):
+        return build if any(values) else (lambda: None)
+
+    week = [d.strftime("%b %d") for d in kpis["week"]]
+    weekly = kpis["weekly_counts"]
+    type_labels = [t for t, _ in kpis["by_room_type"]]
+    type_counts = [n for _, n in kpis["by_room_type"]]
+    revenue_labels = [d.strftime("%b %d") for d, _ in kpis["revenue_by_day"]]
+    revenue_totals = [total for _, total in kpis["revenue_by_day"]]
+    source_labels = [s for s, _ in kpis["by_source"]]
+    source_counts = [n for _, n in kpis["by_source"]]
+    booked = occupancy_stats["room_nights"]
+    free = max(occupancy_stats["available_room_nights"] - booked, 0)
+
+    return {
+        "chart": chart("weekly", when(weekly, lambda: weekly_figure(week, weekly))),
+        "room_chart": chart("roomtype", when(type_counts, lambda: room_type_figure(type_labels, type_counts))),
+        "revenue_chart": chart(
+            "revenue", when(revenue_totals, lambda: revenue_figure(revenue_labels, revenue_totals))
+        ),
+        "occupancy_chart": chart("occupancy", when([booked, free], lambda: occupancy_figure(booked, free))),
+        "source_chart": chart("source", when(source_counts, lambda: source_figure(source_labels, source_counts))),
+    }
+
+
+# =========================================
+# Interactive (Plotly) weekly chart
+# =========================================
+def weekly_checkins(start_date, end_date, room_type=None):
+    """[(week start, bookings)] by check-in week, for bookings created in the window."""
+    created_from, created_to = day_bounds(start_date, end_date)
+    qs = Booking.objects.filter(created_at__gte=created_from, created_at__lt=created_to)
+    if room_type:
+        qs = qs.filter(room__room_type=room_type)
+    return list(
+        qs.annotate(week=TruncWeek("check_in"))
+        .values_list("week")
+        .annotate(n=Count("id"))
+        .order_by("week")
+    )
+
+
+def weekly_bookings_html(start_date, end_date, room_type=None, timeout=CHART_TIMEOUT, refresh=False):
+    """Cached Plotly <div> of weekly check-ins for the filter set, or "" if there are none."""
+    key = chart_key("plotly_weekly", start_date, end_date, room_type)
+    if not refresh:
+        html = cache.get(key)
+        if html is not None:
+            return html
+
+    bins = weekly_checkins(start_date, end_date, room_type)
+    html = ""
+    if bins:
+        with span("chart"):
+            html = _weekly_plotly(bins)
+    cache.set(key, html, timeout)
+    return html
+
+
+def _weekly_plotly(bins):
+    fig = px.bar(
+        x=[week for week, _ in bins],
+        y=[n for _, n in bins],
+        title="Weekly Bookings",
+        labels={"x": "Check-in Week", "y": "Bookings"},
+    )
+    fig.update_layout(
+        template="plotly_white",
+        margin=dict(l=10, r=10, t=30, b=10),
+        height=400,
+    )
+    # Export as full HTML div (with tooltips!)
+    return pio.to_html(fig, full_html=False, include_plotlyjs="cdn")
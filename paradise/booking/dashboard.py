@@ -0,0 +1,122 @@
+# booking/dashboard.py
+"""
+Query planner for the admin dashboard and the staff finance page.
+
+Every KPI for a filter set comes out of a small, fixed number of queries,
+whatever the date range:
+
+  plan_dashboard()  1. the rollup rows for the range (booking/stats.py),
+                       folded into every series/total in Python
+                    2. one conditional aggregate for today's check-ins/outs
+                    3. the room count
+  plan_finance()    1. the rollup rows for the range
+                    2. paid revenue per payment day (DailyPaymentStat)
+"""
+import datetime
+from collections import defaultdict
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Booking, Room
+from .stats import day_bounds, payments_between, stats_between
+
+PAYMENT_STATUSES = ("unpaid", "paid", "refunded")
+
+
+def _ranked(totals):
+    """[(key, value)] sorted by value, largest first."""
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def plan_dashboard(start_date, end_date, room_type=None, today=None):
+    """All dashboard numbers for one filter set, as a dict."""
+    today = today or timezone.localdate()
+    week = [end_date - datetime.timedelta(days=i) for i in range(6, -1, -1)]
+
+    bookings = nights = 0
+    per_day = defaultdict(int)
+    per_type = defaultdict(int)
+    revenue_per_type = defaultdict(int)
+    revenue_per_day = defaultdict(int)
+    per_source = defaultdict(int)
+    per_payment_status = dict.fromkeys(PAYMENT_STATUSES, 0)
+
+    # (1) rollup rows: days x room types x sources x payment statuses, never raw bookings
+    rows = stats_between(start_date, end_date, room_type=room_type).values_list(
+        "date", "room_type", "source", "payment_status", "bookings", "nights", "room_revenue"
+    )
+    for day, rtype, source, payment_status, n, stay_nights, revenue in rows:
+        bookings += n
+        nights += stay_nights
+        per_day[day] += n
+        per_type[rtype] += n
+        revenue_per_type[rtype] += revenue
+        revenue_per_day[day] += revenue
+        per_source[source] += n
+        per_payment_status[payment_status] = per_payment_status.get(payment_status, 0) + n
+
+    # (2) today's arrivals/departures among the filtered bookings, in one pass
+    created_from, created_to = day_bounds(start_date, end_date)
+    movements = Booking.objects.filter(
+        Q(check_in=today) | Q(check_out=today),
+        created_at__gte=created_from,
+        created_at__lt=created_to,
+    )
+    if room_type:
+        movements = movements.filter(room__room_type=room_type)
+    movements = movements.aggregate(
+        checkins=Count("id", filter=Q(check_in=today)),
+        checkouts=Count("id", filter=Q(check_out=today)),
+    )
+
+    return {
+        # (3)
+        "total_rooms": Room.objects.count(),
+        "total_bookings": bookings,
+        "total_nights": nights,
+        "avg_stay_days": nights // bookings if bookings else 0,
+        "today_checkins": movements["checkins"],
+        "today_checkouts": movements["checkouts"],
+        "week": week,
+        "weekly_counts": [per_day.get(d, 0) for d in week],
+        "by_room_type": _ranked(per_type),
+        "revenue_per_type": [
+            {"room__room_type": rtype, "total_revenue": total}
+            for rtype, total in _ranked(revenue_per_type)
+        ],
+        "revenue_by_day": sorted(revenue_per_day.items()),
+        "by_source": _ranked(per_source),
+        "by_payment_status": per_payment_status,
+    }
+
+
+def plan_finance(start_date, end_date, payment_status=None):
+    """staff_finance totals and daily paid revenue (by payment day) from the rollups."""
+    counts = dict.fromkeys(PAYMENT_STATUSES, 0)
+    total_paid = 0
+
+    rows = stats_between(start_date, end_date, payment_status=payment_status).values_list(
+        "payment_status", "bookings", "amount_paid"
+    )
+    for status, n, paid in rows:
+        counts[status] = counts.get(status, 0) + n
+        if status == "paid":
+            total_paid += paid
+
+    daily = []
+    if payment_status in (None, "paid"):
+        daily = list(
+            payments_between(start_date, end_date)
+            .values(payment_date=F("paid_on"))
+            .annotate(count=Sum("bookings"), amount=Sum("amount_paid"))
+            .order_by("payment_date")
+        )
+
+    return {
+        "total_paid": total_paid,
+        "total_paid_count": counts["paid"],
+        "total_unpaid_count": counts["unpaid"],
+        "total_refunded_count": counts["refunded"],
+        "daily": daily,
+    }
@@ -0,0 +1,176 @@
+# booking/exports.py
+"""
+Streaming CSV exports.
+
+Rows are read with values_list().iterator(), so no model instances are built
+and the queryset result cache is never filled. They are written through a
+csv.writer that returns each line instead of buffering it, and sent as a
+StreamingHttpResponse. The header goes out first, followed by chunks of
+roughly EXPORT_CHUNK_BYTES. With ?gzip=1 the stream is compressed on the fly
+into a .csv.gz download. Memory stays flat however many rows are exported.
+
+stream_parquet() exports the same querysets as typed Parquet (pyarrow is
+imported lazily, like WeasyPrint in booking/pdf.py). Each row group is
+built from one batch of cursor rows and flushed as soon as it is written,
+so memory stays bounded by PARQUET_ROW_GROUP_ROWS.
+"""
+import csv
+import zlib
+
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_ROWS = 2000      # rows fetched per database round trip
+EXPORT_CHUNK_BYTES = 64 * 1024  # flush to the client about this often
+PARQUET_ROW_GROUP_ROWS = 50_000
+
+
+class ExportUnavailable(Exception):
+    """Raised when an export format's optional dependency isn't installed."""
+
+
+class Echo:
+    """File-like object for csv.writer: write() hands the line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    """Encoded CSV, header first, then batches of roughly EXPORT_CHUNK_BYTES."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header).encode("utf-8")
+    buf, size = [], 0
+    for row in rows:
+        line = writer.writerow(row)
+        buf.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+def gzip_chunks(chunks):
+    """Gzip a byte stream incrementally; the first chunk is flushed right away."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def queryset_rows(queryset, fields, row=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """values_list tuples for `fields`, optionally mapped through `row()`."""
+    values = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    return values if row is None else map(row, values)
+
+
+def stream_csv(request, filename, header, queryset, fields, row=None):
+    """
+    StreamingHttpResponse with `header` and one line per queryset row.
+    `fields` go to values_list(); `row` maps each tuple to the CSV columns.
+    """
+    chunks = csv_lines(header, queryset_rows(queryset, fields, row))
+    if request.GET.get("gzip") in {"1", "true", "yes"}:
+        response = StreamingHttpResponse(gzip_chunks(chunks), content_type="application/gzip")
+        filename += ".gz"
+    else:
+        response = StreamingHttpResponse(chunks, content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+# =========================================
+# Parquet
+# =========================================
+# column kinds -> Arrow types, resolved once pyarrow is imported
+def _arrow_type(pa, kind):
+    return {
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "decimal": pa.decimal128(10, 2),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }[kind]
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter; the bytes are taken out with drain() after each row group."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ExportUnavailable("Parquet export needs pyarrow installed.") from exc
+    return pa, pq
+
+
+def parquet_chunks(columns, rows, row_group_rows=PARQUET_ROW_GROUP_ROWS):
+    """
+    Parquet bytes for `rows` (tuples in `columns` order). `columns` is a list
+    of (name, kind) with kind in string/category/decimal/date/timestamp.
+    """
+    pa, pq = _pyarrow()
+    schema = pa.schema([(name, _arrow_type(pa, kind)) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, row_group_rows))
+            if not batch:
+                break
+            arrays = [
+                pa.array(list(values), type=field.type)
+                for values, field in zip(zip(*batch), schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_parquet(filename, columns, queryset, fields, row=None):
+    """StreamingHttpResponse of a Parquet file, one row group per PARQUET_ROW_GROUP_ROWS rows."""
+    _pyarrow()  # fail before the response starts if pyarrow is missing
+    chunks = parquet_chunks(columns, queryset_rows(queryset, fields, row))
+    response = StreamingHttpResponse(chunks, content_type="application/vnd.apache.parquet")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
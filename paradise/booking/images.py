@@ -0,0 +1,139 @@
+# booking/images.py
+"""
+Resized JPEG/WebP variants of Room.image, stored next to the original:
+
+  rooms/sea-view.jpg  ->  rooms/sea-view.160w.jpg, rooms/sea-view.160w.webp,
+                          rooms/sea-view.320w.jpg, ...
+
+Variants are built when a room is saved with a new image (booking/signals.py),
+which also removes the replaced image's variants, or lazily the first time a page asks for an older upload's variants. The
+list of variants per image is cached, so rendering a srcset costs one cache
+get. Templates use the {% room_picture %} tag (booking/templatetags/room_images.py).
+"""
+import logging
+import os
+import re
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger("booking.images")
+
+IMAGE_WIDTHS = (160, 320, 640, 1024)
+IMAGE_FORMATS = {
+    # format: (Pillow format, save options)
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+JPEG_BACKGROUND = "white"   # what transparent PNG areas turn into in the .jpg variants
+VARIANTS_TIMEOUT = 60 * 60 * 24
+
+
+def _split(name):
+    root, _ = os.path.splitext(name)
+    return root
+
+
+def variant_name(name, width, ext):
+    """Storage name of one variant of the image stored as `name`."""
+    return f"{_split(name)}.{width}w.{ext}"
+
+
+def _cache_key(name):
+    return f"room-image-variants:{name}"
+
+
+def _open(field_file):
+    from PIL import Image, ImageOps
+
+    with field_file.storage.open(field_file.name, "rb") as fh:
+        img = Image.open(fh)
+        img = ImageOps.exif_transpose(img)   # phone photos: apply the rotation before resizing
+        img.load()
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        return img.convert("RGBA")   # WebP keeps the alpha; JPEG gets it flattened (_for_format)
+    return img.convert("RGB")
+
+
+def _for_format(img, fmt):
+    """`img` as `fmt` can store it: JPEG has no alpha, so transparent areas become white."""
+    from PIL import Image
+
+    if img.mode != "RGBA" or fmt != "JPEG":
+        return img
+    flat = Image.new("RGB", img.size, JPEG_BACKGROUND)
+    flat.paste(img, mask=img.getchannel("A"))
+    return flat
+
+
+def build_variants(field_file):
+    """
+    (Re)write every variant of `field_file` and return {ext: [(width, name)]}.
+    Widths above the original's are clamped to it, so small uploads get one size.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    storage = field_file.storage
+    try:
+        original = _open(field_file)
+    except (OSError, UnidentifiedImageError) as exc:
+        logger.warning("Could not read room image %s: %s", field_file.name, exc)
+        cache.set(_cache_key(field_file.name), {}, VARIANTS_TIMEOUT)
+        return {}
+
+    variants = {ext: [] for ext in IMAGE_FORMATS}
+    for width in sorted({min(w, original.width) for w in IMAGE_WIDTHS}):
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.LANCZOS) if width != original.width else original
+        for ext, (fmt, options) in IMAGE_FORMATS.items():
+            buf = BytesIO()
+            _for_format(resized, fmt).save(buf, fmt, **options)
+            name = variant_name(field_file.name, width, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            variants[ext].append((width, storage.save(name, ContentFile(buf.getvalue()))))
+
+    cache.set(_cache_key(field_file.name), variants, VARIANTS_TIMEOUT)
+    return variants
+
+
+def _stored_variants(field_file):
+    """Variants already on disk, found with one directory listing."""
+    storage = field_file.storage
+    directory, filename = os.path.split(field_file.name)
+    pattern = re.compile(re.escape(_split(filename)) + r"\.(\d+)w\.(" + "|".join(IMAGE_FORMATS) + r")$")
+    try:
+        _, files = storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        return {}
+    variants = {ext: [] for ext in IMAGE_FORMATS}
+    for file in files:
+        match = pattern.match(file)
+        if match:
+            variants[match[2]].append((int(match[1]), os.path.join(directory, file)))
+    return {ext: sorted(found) for ext, found in variants.items()} if any(variants.values()) else {}
+
+
+def image_variants(field_file):
+    """{ext: [(width, url)]} for an ImageField value, building the variants on first use."""
+    if not field_file:
+        return {}
+    variants = cache.get(_cache_key(field_file.name))
+    if variants is None:
+        variants = _stored_variants(field_file)
+        if not variants and field_file.storage.exists(field_file.name):
+            variants = build_variants(field_file)
+        cache.set(_cache_key(field_file.name), variants, VARIANTS_TIMEOUT)
+    storage = field_file.storage
+    return {ext: [(width, storage.url(name)) for width, name in found] for ext, found in variants.items()}
+
+
+def delete_variants(field_file):
+    """Remove the stored variants of an image (the original is left alone)."""
+    if not field_file:
+        return
+    for found in _stored_variants(field_file).values():
+        for _, name in found:
+            field_file.storage.delete(name)
+    cache.delete(_cache_key(field_file.name))
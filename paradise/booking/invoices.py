@@ -0,0 +1,96 @@
+# booking/invoices.py
+"""
+Content-addressed invoice PDF cache.
+
+A rendered invoice is stored on disk as
+    INVOICE_CACHE_DIR/<booking id>/<digest>.pdf
+where the digest hashes every booking/room field booking/invoice.html reads
+plus the template version. Repeat downloads and email resends are a file
+read; any change to those fields gives a new digest, and Booking.save()
+drops the booking's old files when it sees one of them change.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+
+from .pdf import render_pdf
+
+INVOICE_TEMPLATE = "booking/invoice.html"
+
+# Booking attributes (attnames) and Room fields the invoice template uses.
+INVOICE_FIELDS = (
+    "invoice_number", "customer_name", "customer_email", "status", "payment_status",
+    "amount_paid", "payment_date", "check_in", "check_out", "room_id",
+)
+INVOICE_ROOM_FIELDS = ("room_number", "room_type", "price")
+
+
+def cache_dir():
+    return Path(getattr(settings, "INVOICE_CACHE_DIR", Path(settings.BASE_DIR) / "var" / "invoices"))
+
+
+@lru_cache(maxsize=1)
+def template_version():
+    """INVOICE_TEMPLATE_VERSION if set, else a hash of the template source."""
+    version = getattr(settings, "INVOICE_TEMPLATE_VERSION", None)
+    if version:
+        return str(version)
+    source = get_template(INVOICE_TEMPLATE).template.source
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+
+
+def invoice_snapshot(booking):
+    """The invoice-relevant booking values, without touching the DB (deferred fields read as None)."""
+    return tuple(booking.__dict__.get(name) for name in INVOICE_FIELDS)
+
+
+def invoice_digest(booking):
+    payload = [str(v) for v in invoice_snapshot(booking)]
+    payload += [str(getattr(booking.room, name)) for name in INVOICE_ROOM_FIELDS]
+    payload.append(template_version())
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def invoice_path(booking):
+    """Path of the cached invoice PDF for the booking, rendering it first on a miss."""
+    path = cache_dir() / str(booking.pk) / f"{invoice_digest(booking)}.pdf"
+    if path.exists():
+        return path
+
+    html = render_to_string(INVOICE_TEMPLATE, {"booking": booking})
+    pdf = render_pdf(html)
+
+    # write-then-rename so a concurrent reader never sees a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(pdf)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return path
+
+
+def get_invoice_pdf(booking):
+    """Invoice PDF bytes for the booking (cached on disk)."""
+    return invoice_path(booking).read_bytes()
+
+
+def invalidate_invoice(booking_id):
+    """Drop every cached invoice for a booking."""
+    shutil.rmtree(cache_dir() / str(booking_id), ignore_errors=True)
+
+
+def invalidate_invoices(booking_ids):
+    for booking_id in booking_ids:
+        invalidate_invoice(booking_id)
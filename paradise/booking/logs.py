@@ -0,0 +1,16 @@
+# booking/logs.py
+"""Logging handlers referenced from settings.LOGGING."""
+import os
+from logging.handlers import RotatingFileHandler
+
+
+class LazyDirRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that creates the log file's directory on first write,
+    so loading settings (collectstatic, read-only deploys) never touches disk.
+    Use with delay=True.
+    """
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
@@ -1,54 +1,120 @@
 # booking/management/commands/billing_maintenance.py
+import time
 from datetime import timedelta
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
 from django.utils.timezone import now
-from django.core.mail import send_mail
+
+from booking.availability import release_bookings
+from booking.catalogue import bump_catalogue
+from booking.invoices import invalidate_invoices
 from booking.models import Booking
+from booking.outbox import build_outbound, enqueue_many
 
 REMIND_AFTER_DAYS = 2
+REMIND_EVERY_DAYS = 2        # a booking gets at most one reminder per window
 AUTO_CANCEL_AFTER_DAYS = 5
 
+
+def id_chunks(queryset, batch_size, fields=("id",)):
+    """
+    Walk a queryset in primary-key order, batch_size rows at a time.
+
+    Each chunk is its own short indexed query (WHERE id > last ORDER BY id
+    LIMIT n) instead of one long-lived cursor, so the command can update the
+    rows it is scanning without tripping over SQLite's lack of isolation
+    between a cursor and writes on the same connection.
+    """
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id).order_by("id").values_list(*fields)[:batch_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def reminder_message(booking_id, invoice_number, customer_name, customer_email):
+    return build_outbound(
+        subject=f"Payment Reminder — {invoice_number}",
+        body=(
+            f"Dear {customer_name},\n\n"
+            f"This is a friendly reminder to complete payment for your booking "
+            f"(Invoice {invoice_number}). You can pay from your portal or contact us.\n\n"
+            f"Thank you."
+        ),
+        from_email="noreply@paradisehotel.com",
+        to=[customer_email],
+        booking=booking_id,
+    )
+
+
 class Command(BaseCommand):
     help = "Send payment reminder emails and auto-cancel very overdue unpaid bookings."
 
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would happen without writing.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per chunk (default 1000).")
+
     def handle(self, *args, **options):
         today = now()
-        reminded = 0
-        cancelled = 0
+        dry_run = options["dry_run"]
+        batch_size = options["batch_size"]
+        timings = {}
 
-        # Remind unpaid bookings older than REMIND_AFTER_DAYS
-        remind_cutoff = today - timedelta(days=REMIND_AFTER_DAYS)
-        to_remind = Booking.objects.filter(
-            payment_status="unpaid",
-            created_at__lte=remind_cutoff
-        )
-        for b in to_remind:
-            if b.customer_email:
-                send_mail(
-                    subject=f"Payment Reminder — {b.invoice_number}",
-                    message=(
-                        f"Dear {b.customer_name},\n\n"
-                        f"This is a friendly reminder to complete payment for your booking "
-                        f"(Invoice {b.invoice_number}). You can pay from your portal or contact us.\n\n"
-                        f"Thank you."
-                    ),
-                    from_email="noreply@paradisehotel.com",
-                    recipient_list=[b.customer_email],
-                    fail_silently=True,
-                )
-                reminded += 1
-
-        # Auto-cancel unpaid bookings older than AUTO_CANCEL_AFTER_DAYS
+        # Auto-cancel first, so bookings about to be cancelled don't get a reminder too.
+        started = time.perf_counter()
         cancel_cutoff = today - timedelta(days=AUTO_CANCEL_AFTER_DAYS)
         to_cancel = Booking.objects.filter(
             payment_status="unpaid",
-            created_at__lte=cancel_cutoff
+            created_at__lte=cancel_cutoff,
+        ).exclude(status="cancelled")
+        if dry_run:
+            cancelled = to_cancel.count()
+        else:
+            cancelled = 0
+            for chunk in id_chunks(to_cancel, batch_size):
+                ids = [row[0] for row in chunk]
+                with transaction.atomic():
+                    cancelled += Booking.objects.filter(id__in=ids).update(status="cancelled")
+                    # update() skips Booking.save()/signals: free the nights and stale invoices here
+                    release_bookings(ids)
+                invalidate_invoices(ids)
+            if cancelled:
+                bump_catalogue()   # room pages list booking statuses
+        timings["cancel"] = time.perf_counter() - started
+
+        # Remind unpaid bookings older than REMIND_AFTER_DAYS, once per REMIND_EVERY_DAYS window
+        started = time.perf_counter()
+        remind_cutoff = today - timedelta(days=REMIND_AFTER_DAYS)
+        window_start = today - timedelta(days=REMIND_EVERY_DAYS)
+        to_remind = (
+            Booking.objects.filter(payment_status="unpaid", created_at__lte=remind_cutoff)
+            .exclude(status="cancelled")
+            .exclude(customer_email__isnull=True)
+            .exclude(customer_email="")
+            .filter(Q(last_reminded_at__isnull=True) | Q(last_reminded_at__lte=window_start))
         )
-        for b in to_cancel:
-            b.status = "cancelled"
-            b.save(update_fields=["status"])
-            cancelled += 1
+        if dry_run:
+            # nothing was really cancelled above, so leave out what would have been
+            reminded = to_remind.exclude(created_at__lte=cancel_cutoff).count()
+        else:
+            reminded = 0
+            fields = ("id", "invoice_number", "customer_name", "customer_email")
+            for chunk in id_chunks(to_remind, batch_size, fields):
+                with transaction.atomic():
+                    reminded += enqueue_many(reminder_message(*row) for row in chunk)
+                    Booking.objects.filter(id__in=[row[0] for row in chunk]).update(last_reminded_at=today)
+        timings["remind"] = time.perf_counter() - started
 
+        prefix = "[dry run] " if dry_run else ""
         self.stdout.write(self.style.SUCCESS(
-            f"Reminded: {reminded}, Auto-cancelled: {cancelled}"
+            f"{prefix}Reminded: {reminded}, Auto-cancelled: {cancelled}"
         ))
+        self.stdout.write(
+            "Timings: " + ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in timings.items())
+        )
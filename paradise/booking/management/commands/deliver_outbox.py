@@ -0,0 +1,31 @@
+# booking/management/commands/deliver_outbox.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from booking.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued transactional emails in batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 100))
+        parser.add_argument("--max-attempts", type=int, default=getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when the outbox is empty.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, retried, failed = deliver_pending(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            if sent or retried or failed or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent: {sent}, Retrying: {retried}, Failed: {failed}"
+                ))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,17 @@
+# booking/management/commands/rebuild_booking_search.py
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the booking full-text search index. Saves keep it current on their own; "
+        "run this after bulk imports or raw SQL changes to bookings, rooms or users."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_search_index()
+        if rows is None:
+            raise CommandError("No full-text index on this database (SQLite with FTS5 only).")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} bookings"))
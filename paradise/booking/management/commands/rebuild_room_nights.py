@@ -0,0 +1,14 @@
+# booking/management/commands/rebuild_room_nights.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from booking.availability import rebuild_room_nights
+
+
+class Command(BaseCommand):
+    help = "Rebuild the room-night occupancy index from the Booking table."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            nights = rebuild_room_nights()
+        self.stdout.write(self.style.SUCCESS(f"Indexed nights: {nights}"))
@@ -0,0 +1,39 @@
+# booking/management/commands/refresh_booking_stats.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
+
+from booking.stats import refresh_all, refresh_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily booking/revenue rollup. Saves keep it current on their own; "
+        "run this after bulk updates, imports or room type/price changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="Refresh the last N days (default 2).")
+        parser.add_argument("--start", help="YYYY-MM-DD (with --end)")
+        parser.add_argument("--end", help="YYYY-MM-DD (with --start)")
+        parser.add_argument("--all", action="store_true", help="Rebuild the whole table.")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            rows = refresh_all()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt rollup: {rows} rows"))
+            return
+
+        if options["start"] or options["end"]:
+            start = parse_date(options["start"] or "")
+            end = parse_date(options["end"] or "")
+            if not start or not end:
+                raise CommandError("--start and --end must both be YYYY-MM-DD dates.")
+        else:
+            end = localdate()
+            start = end - timedelta(days=max(options["days"], 1) - 1)
+
+        rows = refresh_range(min(start, end), max(start, end))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {start} → {end}: {rows} rows"))
@@ -0,0 +1,156 @@
+# booking/management/commands/run_benchmarks.py
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from booking.models import Booking, Room
+
+BENCH_USER = "benchmark"
+TARGETS = ("dashboard", "staff_finance", "finance_csv", "download_invoice", "billing_maintenance")
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _consume(response):
+    """Read the whole body, streaming or not, and return its size."""
+    if response.status_code >= 400:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot pages and jobs against the current database (see seed_bookings) and print "
+        "p50/p95 latency, query counts and peak Python memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=10, help="Timed runs per target (default 10).")
+        parser.add_argument("--warmup", type=int, default=1, help="Untimed runs first (default 1).")
+        parser.add_argument("--days", type=int, default=365, help="Report period ending today (default 365).")
+        parser.add_argument("--only", nargs="+", choices=TARGETS, help="Run just these targets.")
+        parser.add_argument("--output", help="Also write the JSON to this file.")
+
+    def handle(self, *args, **options):
+        if not Booking.objects.exists():
+            raise CommandError("No bookings to benchmark; run `manage.py seed_bookings` first.")
+
+        # allows the test Client's host and keeps outgoing email in memory
+        try:
+            setup_test_environment()
+            owns_test_environment = True
+        except RuntimeError:  # already set up (running under the test runner)
+            owns_test_environment = False
+        try:
+            with self._bench_user() as user:
+                client = Client()
+                client.force_login(user)
+                try:
+                    results = self._run(client, options)
+                finally:
+                    client.logout()   # drops the session row along with the user
+        finally:
+            if owns_test_environment:
+                teardown_test_environment()
+
+        report = {
+            "timestamp": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "dataset": {"rooms": Room.objects.count(), "bookings": Booking.objects.count()},
+            "iterations": options["iterations"],
+            "period_days": options["days"],
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+        self.stdout.write(output)
+
+    @contextmanager
+    def _bench_user(self):
+        """
+        A superuser for this run only: unusable password and deleted afterwards,
+        so benchmarking never leaves an admin account behind.
+        """
+        User = get_user_model()
+        if User.objects.filter(username=BENCH_USER).exists():
+            raise CommandError(f"User {BENCH_USER!r} already exists; remove it before benchmarking.")
+        user = User.objects.create_superuser(BENCH_USER, email="", password=None)
+        try:
+            yield user
+        finally:
+            user.delete()
+
+    def _run(self, client, options):
+        today = timezone.localdate()
+        period = f"start={today - timedelta(days=options['days'])}&end={today}"
+        booking_id = Booking.objects.order_by("-id").values_list("id", flat=True).first()
+
+        targets = {
+            "dashboard": lambda: _consume(client.get(f"/admin/?{period}")),
+            "staff_finance": lambda: _consume(client.get(f"/staff/finance/?{period}")),
+            "finance_csv": lambda: _consume(client.get(f"/staff/finance/export/csv/?{period}")),
+            "download_invoice": lambda: _consume(client.get(f"/booking/{booking_id}/invoice/")),
+            "billing_maintenance": lambda: call_command("billing_maintenance", "--dry-run", stdout=StringIO()),
+        }
+        return {
+            name: self._measure(name, fn, options["iterations"], options["warmup"])
+            for name, fn in targets.items()
+            if not options["only"] or name in options["only"]
+        }
+
+    def _measure(self, name, fn, iterations, warmup):
+        try:
+            for _ in range(warmup):
+                fn()
+
+            timings, queries = [], []
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    fn()
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries.append(len(captured))
+
+            # separate run: tracemalloc slows everything down, so it's kept out of the timings
+            tracemalloc.start()
+            try:
+                fn()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        except Exception as exc:
+            self.stderr.write(f"{name} failed: {exc}")
+            return {"error": f"{type(exc).__name__}: {exc}"}
+
+        return {
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "max_ms": round(max(timings), 2),
+            "queries": max(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
@@ -0,0 +1,24 @@
+# booking/management/commands/run_report_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from booking.reports import run_pending
+
+
+class Command(BaseCommand):
+    help = "Render queued dashboard PDF reports to disk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-jobs", type=int, default=None, help="Stop after this many jobs.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when the queue is empty.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending(max_jobs=options["max_jobs"])
+            if processed or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Reports rendered: {processed}"))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,189 @@
+# booking/management/commands/seed_bookings.py
+import random
+import time
+from datetime import datetime, time as dtime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from booking.availability import OCCUPYING_STATUSES, rebuild_room_nights
+from booking.catalogue import bump_catalogue
+from booking.invoices import invalidate_invoices
+from booking.search import rebuild_search_index
+from booking.models import Booking, OutboundEmail, Payment, Room, RoomNight
+from booking.sequences import assign_invoice_numbers
+from booking.stats import refresh_all
+
+SEED_ROOM_PREFIX = "SEED"
+FLUSH_BATCH_SIZE = 500   # bookings per DELETE (well under SQLite's bound-parameter limit)
+
+ROOM_TYPES = [  # (room type, nightly price, share of rooms)
+    ("Single", Decimal("90.00"), 35),
+    ("Double", Decimal("140.00"), 35),
+    ("Deluxe", Decimal("220.00"), 20),
+    ("Suite", Decimal("350.00"), 10),
+]
+SOURCES = [("website", 50), ("agent", 25), ("walk_in", 10), ("corporate", 15)]
+STATUSES = [("confirmed", 60), ("pending", 20), ("cancelled", 15), ("refunded", 5)]
+STAY_NIGHTS = [(1, 20), (2, 30), (3, 20), (4, 12), (5, 8), (7, 10)]
+FIRST_NAMES = ["Alice", "Bob", "Chen", "Dina", "Emeka", "Fatima", "Goran", "Hana", "Ivan", "Jo", "Kofi", "Lena"]
+LAST_NAMES = ["Smith", "Garcia", "Nguyen", "Okafor", "Rossi", "Kim", "Novak", "Haddad", "Silva", "Ahmed"]
+
+
+def _weighted(rng, options):
+    values, weights = zip(*options)
+    return rng.choices(values, weights)[0]
+
+
+def _bulk_create_backdated(model, objs):
+    """
+    bulk_create `objs`, then write back the created_at values we generated:
+    auto_now_add stamps now() on insert, and the seed's history is in the past.
+    """
+    stamps = [obj.created_at for obj in objs]
+    model.objects.bulk_create(objs)
+    for obj, stamp in zip(objs, stamps):
+        obj.created_at = stamp
+    model.objects.bulk_update(objs, ["created_at"])
+
+
+def flush_seeded():
+    """Remove everything a previous seed created (rooms prefixed SEED_ROOM_PREFIX and their bookings)."""
+    booking_ids = list(
+        Booking.objects.filter(room__room_number__startswith=SEED_ROOM_PREFIX).values_list("id", flat=True)
+    )
+    table = connection.ops.quote_name(Booking._meta.db_table)
+    with transaction.atomic():
+        RoomNight.objects.filter(room__room_number__startswith=SEED_ROOM_PREFIX).delete()
+        for start in range(0, len(booking_ids), FLUSH_BATCH_SIZE):
+            ids = booking_ids[start:start + FLUSH_BATCH_SIZE]
+            Payment.objects.filter(booking_id__in=ids).delete()
+            OutboundEmail.objects.filter(booking_id__in=ids).update(booking=None)
+            # plain DELETE, no per-row Booking signals: the rollup, search index and
+            # catalogue are rebuilt once after seeding instead
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+        Room.objects.filter(room_number__startswith=SEED_ROOM_PREFIX).delete()
+    invalidate_invoices(booking_ids)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset (rooms, bookings, payments) for benchmarks. "
+        "Seeded rooms are numbered SEED00001…; --flush removes a previous seed first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=10_000, help="Bookings to create (default 10000).")
+        parser.add_argument("--rooms", type=int, default=None, help="Rooms to create (default bookings/250, at least 10).")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same data.")
+        parser.add_argument("--until", help="YYYY-MM-DD the schedule runs up to (default: 60 days from today).")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--flush", action="store_true", help="Delete previously seeded data first.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        total = options["bookings"]
+        room_count = options["rooms"] or max(10, total // 250)
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        if options["flush"]:
+            flush_seeded()
+        elif Room.objects.filter(room_number__startswith=SEED_ROOM_PREFIX).exists():
+            raise CommandError("Seeded data already exists; rerun with --flush to replace it.")
+
+        rooms = self._create_rooms(rng, room_count)
+        per_room = [total // room_count + (1 if i < total % room_count else 0) for i in range(room_count)]
+
+        # ~3.5 nights per stay + ~2.5 empty nights between stays; end the schedule at --until
+        until = (
+            datetime.strptime(options["until"], "%Y-%m-%d").date()
+            if options["until"] else timezone.localdate() + timedelta(days=60)
+        )
+        span = int(max(per_room) * 6) + 7
+        first_day = until - timedelta(days=span)
+
+        created = 0
+        batch = []
+        for room, count in zip(rooms, per_room):
+            day = first_day + timedelta(days=rng.randint(0, 6))
+            for _ in range(count):
+                nights = _weighted(rng, STAY_NIGHTS)
+                batch.append(self._booking(rng, room, day, nights, created + len(batch)))
+                day += timedelta(days=nights + rng.randint(0, 5))
+                if len(batch) >= batch_size:
+                    created += self._flush(batch)
+                    batch = []
+                    self.stdout.write(f"  {created}/{total} bookings")
+        if batch:
+            created += self._flush(batch)
+
+        seeded = Booking.objects.filter(room__room_number__startswith=SEED_ROOM_PREFIX, status__in=OCCUPYING_STATUSES)
+        nights = rebuild_room_nights(seeded)
+        refresh_all()
+        bump_catalogue()   # bulk_create and the flush's DELETEs send no Room signals
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(rooms)} rooms, {created} bookings, {nights} room-nights "
+            f"({first_day} → {until}) in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def _create_rooms(self, rng, count):
+        rooms = []
+        for i in range(count):
+            room_type, price, _ = rng.choices(ROOM_TYPES, [share for *_, share in ROOM_TYPES])[0]
+            rooms.append(Room(room_number=f"{SEED_ROOM_PREFIX}{i + 1:05d}", room_type=room_type, price=price))
+        return Room.objects.bulk_create(rooms)
+
+    def _booking(self, rng, room, check_in, nights, n):
+        status = _weighted(rng, STATUSES)
+        if status == "refunded":
+            payment_status = "refunded"
+        elif status == "confirmed" and rng.random() < 0.9:
+            payment_status = "paid"
+        else:
+            payment_status = "unpaid"
+
+        created_at = timezone.make_aware(datetime.combine(
+            check_in - timedelta(days=rng.randint(0, 90)),
+            dtime(rng.randint(0, 23), rng.randint(0, 59)),
+        ))
+        amount = room.price * nights if payment_status != "unpaid" else Decimal("0.00")
+        paid_at = created_at + timedelta(hours=rng.randint(0, 48)) if amount else None
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        return Booking(
+            room=room,
+            customer_name=f"{first} {last}",
+            customer_email=f"{first.lower()}.{last.lower()}{n}@example.com",
+            check_in=check_in,
+            check_out=check_in + timedelta(days=nights),
+            created_at=created_at,
+            status=status,
+            source=_weighted(rng, SOURCES),
+            payment_status=payment_status,
+            amount_paid=amount,
+            payment_date=paid_at,
+            refund_requested=status == "refunded",
+            refund_amount=amount if status == "refunded" else None,
+            refund_date=paid_at + timedelta(days=1) if status == "refunded" else None,
+        )
+
+    def _flush(self, batch):
+        with transaction.atomic():
+            for year in sorted({b.created_at.year for b in batch}):
+                assign_invoice_numbers([b for b in batch if b.created_at.year == year], year)
+            _bulk_create_backdated(Booking, batch)
+            _bulk_create_backdated(Payment, [
+                Payment(
+                    booking=b,
+                    amount=b.amount_paid,
+                    transaction_id=f"SEED-{b.invoice_number}",
+                    status="success",
+                    created_at=b.payment_date,
+                )
+                for b in batch if b.payment_date
+            ])
+        return len(batch)
@@ -0,0 +1,55 @@
+# booking/management/commands/warm_dashboard_charts.py
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from booking.charts import dashboard_charts, weekly_bookings_html
+from booking.dashboard import plan_dashboard
+from booking.models import Room
+from booking.occupancy import occupancy
+
+# the dashboard's quick filters: today, last 7 days, last 30 days (the default view)
+DEFAULT_WINDOWS = (0, 7, 30)
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the dashboard charts for the common filter combinations into the shared cache "
+        "(settings.CACHES; a per-process LocMemCache is refused, as the web workers would never see it)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, nargs="+", default=list(DEFAULT_WINDOWS),
+            help="Windows ending today, in days back (default: 0 7 30).",
+        )
+        parser.add_argument("--no-room-types", action="store_true", help="Only warm the unfiltered view.")
+
+    def handle(self, *args, **options):
+        if isinstance(caches["default"], LocMemCache):
+            raise CommandError(
+                "The default cache is a per-process LocMemCache, so warmed charts would die with this "
+                "command. Configure a shared backend in settings.CACHES (file, database, Redis or Memcached)."
+            )
+        today = timezone.now().date()
+        room_types = [None]
+        if not options["no_room_types"]:
+            room_types += list(Room.objects.values_list("room_type", flat=True).distinct().order_by("room_type"))
+
+        warmed = 0
+        for days in options["days"]:
+            start = today - timedelta(days=days)
+            for room_type in room_types:
+                kpis = plan_dashboard(start, today, room_type=room_type, today=today)
+                # re-render even when an entry is still live: it may predate the latest bookings
+                charts = dashboard_charts(
+                    start, today, room_type, kpis, occupancy(start, today, room_type), refresh=True
+                )
+                warmed += sum(1 for png in charts.values() if png)
+                warmed += bool(weekly_bookings_html(start, today, room_type, refresh=True))
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {warmed} charts for {len(options['days'])} windows x {len(room_types)} room type filters"
+        ))
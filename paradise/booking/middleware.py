@@ -0,0 +1,69 @@
+# booking/middleware.py
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .timing import collect, current_timings, span
+
+logger = logging.getLogger("booking.timing")
+
+
+class RequestTimingMiddleware:
+    """
+    Records query count, SQL time and named spans (booking/timing.py) for each
+    request. Writes one JSON log line per request on the "booking.timing" logger.
+    Staff users, or anyone when DEBUG is on, also get a Server-Timing header.
+    Streaming responses are measured up to the point their headers are ready.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect() as timings, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+
+        total_ms = timings.total_ms()
+        over_budget = timings.query_budget is not None and timings.queries > timings.query_budget
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "view": timings.view,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 1),
+            "sql_ms": round(timings.sql_ms, 1),
+            "queries": timings.queries,
+            "spans": {name: round(ms, 1) for name, ms in timings.spans.items()},
+        }
+        if over_budget:
+            entry["query_budget"] = timings.query_budget
+        (logger.warning if over_budget else logger.info)(json.dumps(entry))
+
+        user = getattr(request, "user", None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            metrics = [f'sql;dur={timings.sql_ms:.1f};desc="{timings.queries} queries"']
+            metrics += [f"{name};dur={ms:.1f}" for name, ms in timings.spans.items()]
+            metrics.append(f"total;dur={total_ms:.1f}")
+            response["Server-Timing"] = ", ".join(metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings()
+        if timings is not None:
+            timings.view = f"{view_func.__module__}.{getattr(view_func, '__qualname__', view_func.__name__)}"
+            timings.query_budget = getattr(view_func, "query_budget", None)
+
+    def process_template_response(self, request, response):
+        render = response.render
+
+        def timed_render():
+            with span("template"):
+                return render()
+
+        response.render = timed_render
+        return response
@@ -0,0 +1,84 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:46
+
+import django.db.models.deletion
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_room_nights(apps, schema_editor):
+    """Index the nights of existing active bookings (overlaps already in the data keep the first)."""
+    Booking = apps.get_model("booking", "Booking")
+    RoomNight = apps.get_model("booking", "RoomNight")
+    batch = []
+    for b in Booking.objects.filter(status__in=("pending", "confirmed")).order_by("id").iterator():
+        night = b.check_in
+        while night < b.check_out:
+            batch.append(RoomNight(room_id=b.room_id, booking_id=b.id, night=night))
+            night += timedelta(days=1)
+    RoomNight.objects.bulk_create(batch, batch_size=2000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='payment_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='payment_status',
+            field=models.CharField(choices=[('unpaid', 'Unpaid'), ('paid', 'Paid'), ('refunded', 'Refunded')], default='unpaid', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='refund_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='refund_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='refund_requested',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transaction_id', models.CharField(blank=True, max_length=200, null=True)),
+                ('status', models.CharField(default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='payment', to='booking.booking')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='booking.booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='booking.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['night', 'room'], name='roomnight_night_room_idx')],
+                'constraints': [models.UniqueConstraint(fields=('room', 'night'), name='uniq_room_night')],
+            },
+        ),
+        migrations.RunPython(backfill_room_nights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='last_reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_booking_last_reminded_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('year', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
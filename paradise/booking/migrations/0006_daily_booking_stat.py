@@ -0,0 +1,65 @@
+# Generated by Django 5.1.2 on 2026-10-17 23:53
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    """Same aggregation as booking.stats.refresh_range, over the whole table."""
+    Booking = apps.get_model("booking", "Booking")
+    DailyBookingStat = apps.get_model("booking", "DailyBookingStat")
+    stay = ExpressionWrapper(F("check_out") - F("check_in"), output_field=DurationField())
+    groups = (
+        Booking.objects.annotate(day=TruncDate("created_at"))
+        .values("day", "room__room_type", "source", "payment_status")
+        .annotate(n=Count("id"), stay=Sum(stay), room_revenue=Sum("room__price"), paid=Sum("amount_paid"))
+        .order_by()
+    )
+    DailyBookingStat.objects.bulk_create(
+        (
+            DailyBookingStat(
+                date=g["day"], room_type=g["room__room_type"], source=g["source"],
+                payment_status=g["payment_status"], bookings=g["n"],
+                nights=g["stay"].days if g["stay"] else 0,
+                room_revenue=g["room_revenue"] or 0, amount_paid=g["paid"] or 0,
+            )
+            for g in groups
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_invoice_sequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('room_type', models.CharField(max_length=50)),
+                ('source', models.CharField(max_length=20)),
+                ('payment_status', models.CharField(max_length=20)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('nights', models.PositiveIntegerField(default=0)),
+                ('room_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at'], name='booking_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailybookingstat',
+            constraint=models.UniqueConstraint(fields=('date', 'room_type', 'source', 'payment_status'), name='uniq_daily_booking_stat'),
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_report_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['payment_status', 'created_at'], name='booking_pay_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['check_in'], name='booking_check_in_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['check_out'], name='booking_check_out_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['room_type'], name='room_type_idx'),
+        ),
+    ]
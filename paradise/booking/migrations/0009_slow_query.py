@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_booking_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('normalized_sql', models.TextField()),
+                ('sql', models.TextField()),
+                ('params', models.TextField(blank=True)),
+                ('duration_ms', models.FloatField()),
+                ('source', models.CharField(blank=True, max_length=200)),
+                ('plan', models.TextField(blank=True)),
+                ('full_scan', models.BooleanField(default=False)),
+                ('reason', models.CharField(choices=[('slow', 'Over threshold'), ('full_scan', 'Full table scan')], default='slow', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fingerprint', 'created_at'], name='slowquery_fp_idx'), models.Index(fields=['created_at'], name='slowquery_created_idx')],
+            },
+        ),
+    ]
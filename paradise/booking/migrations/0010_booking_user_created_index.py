@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_slow_query'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'created_at'], name='booking_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_booking_user_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['customer_name'], name='booking_customer_name_idx'),
+        ),
+    ]
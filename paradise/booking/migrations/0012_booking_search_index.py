@@ -0,0 +1,50 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:40
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# FTS5 index of bookings (booking/search.py); SQLite only, other backends
+# keep the ORM lookups in BookingAdmin.get_search_results.
+CREATE_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS booking_search USING fts5(
+    invoice_number, customer_name, customer_email, room_number, username, user_email,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+BACKFILL_SQL = """
+INSERT INTO booking_search(rowid, invoice_number, customer_name, customer_email, room_number, username, user_email)
+SELECT b.id, b.invoice_number, b.customer_name, COALESCE(b.customer_email, ''),
+       r.room_number, COALESCE(u.username, ''), COALESCE(u.email, '')
+FROM booking_booking b
+JOIN booking_room r ON r.id = b.room_id
+LEFT JOIN auth_user u ON u.id = b.user_id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL)
+        except OperationalError:
+            return   # SQLite built without FTS5
+        cursor.execute(BACKFILL_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS booking_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_booking_customer_name_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_booking_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'check_in'], name='booking_room_check_in_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:01
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_payment_stats(apps, schema_editor):
+    """Same aggregation as booking.stats.refresh_range, over the whole table."""
+    Booking = apps.get_model("booking", "Booking")
+    DailyPaymentStat = apps.get_model("booking", "DailyPaymentStat")
+    groups = (
+        Booking.objects.filter(payment_status="paid", payment_date__isnull=False)
+        .annotate(day=TruncDate("created_at"), paid_on=TruncDate("payment_date"))
+        .values("day", "paid_on")
+        .annotate(n=Count("id"), paid=Sum("amount_paid"))
+        .order_by()
+    )
+    DailyPaymentStat.objects.bulk_create(
+        (
+            DailyPaymentStat(date=g["day"], paid_on=g["paid_on"], bookings=g["n"], amount_paid=g["paid"] or 0)
+            for g in groups
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_booking_room_check_in_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPaymentStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('paid_on', models.DateField()),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'paid_on'), name='uniq_daily_payment_stat')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_payment_stats, migrations.RunPython.noop),
+    ]
@@ -1,28 +1,23 @@
-import tempfile
-
-import weasyprint
-from django.core.mail import EmailMessage
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.template.loader import render_to_string
 from django.utils.timezone import now
 
+from .invoices import invalidate_invoice, invoice_snapshot
 
 
 
 def send_invoice_email(booking):
-    html = render_to_string("booking/invoice.html", {"booking": booking})
-    pdf_file = tempfile.NamedTemporaryFile(delete=True, suffix=".pdf")
-    weasyprint.HTML(string=html).write_pdf(pdf_file.name)
+    from .outbox import enqueue_email
 
-    email = EmailMessage(
+    # delivered (with the cached invoice PDF attached) by `manage.py deliver_outbox`
+    return enqueue_email(
         subject=f"Paradise Hotel - Invoice {booking.invoice_number}",
         body="Please find your updated invoice attached.",
         from_email="no-reply@paradisehotel.com",
         to=[booking.customer_email],
+        booking=booking,
+        attach_invoice=True,
     )
-    email.attach_file(pdf_file.name)
-    email.send()
 
 
 
@@ -48,9 +43,23 @@ class Room(models.Model):
         default="available"
     )
 
+    class Meta:
+        indexes = [
+            # room_type filters on the dashboard, exports and availability search
+            models.Index(fields=["room_type"], name="room_type_idx"),
+        ]
+
     def __str__(self):
         return f"Room {self.room_number} ({self.room_type})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored image, so a replaced upload's variants can be removed on save
+        image = instance.__dict__.get("image")
+        instance._loaded_image_name = getattr(image, "name", image)
+        return instance
+
 
 # ========================
 # Booking Model
@@ -110,13 +119,62 @@ class Booking(models.Model):
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     payment_date = models.DateTimeField(null=True, blank=True)
 
+    # ✅ Billing maintenance: when the last payment reminder was queued
+    last_reminded_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember what the invoice looked like, so save() can tell if the cached PDF is stale
+        instance._loaded_invoice_snapshot = invoice_snapshot(instance)
+        return instance
+
     def save(self, *args, **kwargs):
-        # auto-generate invoice number if not set
-        if not self.invoice_number:
-            year = now().year
-            count = Booking.objects.filter(created_at__year=year).count() + 1
-            self.invoice_number = f"INV-{year}-{count:03d}"
-        super().save(*args, **kwargs)
+        from .availability import check_booking_nights, sync_booking_nights
+
+        # ✅ room-night index (booking/availability.py) is written in the same transaction,
+        #    so a stay that overlaps another booking raises RoomUnavailable and leaves no row behind
+        reserved_number = False
+        try:
+            with transaction.atomic():
+                if not self.invoice_number:
+                    # reserve the number only once the stay is known to fit, and inside this
+                    # transaction, so a rejected booking doesn't leave a gap in the series
+                    check_booking_nights(self)
+                    from .sequences import next_invoice_number
+                    self.invoice_number = next_invoice_number()
+                    reserved_number = True
+
+                # ✅ cached invoice PDFs (booking/invoices.py) go stale when an invoice field changes
+                snapshot = invoice_snapshot(self)
+                invoice_changed = self.pk is not None and snapshot != getattr(self, "_loaded_invoice_snapshot", None)
+                super().save(*args, **kwargs)
+                sync_booking_nights(self)
+        except Exception:
+            if reserved_number:
+                self.invoice_number = ""   # rolled back with the sequence bump
+            raise
+        if invoice_changed:
+            invalidate_invoice(self.pk)
+        self._loaded_invoice_snapshot = snapshot
+
+    class Meta:
+        indexes = [
+            # daily rollup refresh (booking/stats.py), dashboard and finance periods:
+            # created_at >= start AND created_at < end (never created_at__date, which can't use it)
+            models.Index(fields=["created_at"], name="booking_created_idx"),
+            # finance filtered by payment status; billing_maintenance's unpaid-and-older-than scans
+            models.Index(fields=["payment_status", "created_at"], name="booking_pay_created_idx"),
+            # today's arrivals / departures
+            models.Index(fields=["check_in"], name="booking_check_in_idx"),
+            models.Index(fields=["check_out"], name="booking_check_out_idx"),
+            # customer portal / my bookings: keyset pages on (created_at, id), newest first
+            models.Index(fields=["user", "created_at"], name="booking_user_created_idx"),
+            # admin search: prefix ranges on the guest name
+            models.Index(fields=["customer_name"], name="booking_customer_name_idx"),
+            # room change page: the room's bookings, latest check-in first, a page at a time
+            models.Index(fields=["room", "check_in"], name="booking_room_check_in_idx"),
+        ]
 
     def __str__(self):
         return f"{self.invoice_number} - {self.customer_name} ({self.status}, {self.payment_status})"
@@ -133,5 +191,195 @@ class Payment(models.Model):
         return f"Payment {self.transaction_id or 'N/A'} - {self.status}"
 
 
+# ========================
+# Invoice number sequence
+# ========================
+class InvoiceSequence(models.Model):
+    """Last invoice number handed out per year; see booking/sequences.py."""
+    year = models.PositiveSmallIntegerField(primary_key=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}: {self.last_number}"
+
+
+# ========================
+# Daily booking/revenue rollup
+# ========================
+class DailyBookingStat(models.Model):
+    """
+    Bookings created on one day, per room type / source / payment status.
+    Maintained by booking/stats.py; the admin dashboard and staff finance
+    page read these rows instead of aggregating Booking on every load.
+    """
+    date = models.DateField()
+    room_type = models.CharField(max_length=50)
+    source = models.CharField(max_length=20)
+    payment_status = models.CharField(max_length=20)
+
+    bookings = models.PositiveIntegerField(default=0)
+    nights = models.PositiveIntegerField(default=0)
+    room_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # sum of room prices
+    amount_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "room_type", "source", "payment_status"], name="uniq_daily_booking_stat"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.room_type}/{self.source}/{self.payment_status}: {self.bookings}"
+
+
+class DailyPaymentStat(models.Model):
+    """
+    Paid bookings created on one day, per day they were paid on (payment_date).
+    Refreshed with DailyBookingStat; staff finance's daily paid revenue reads it.
+    """
+    date = models.DateField()   # created day, as in DailyBookingStat
+    paid_on = models.DateField()
+
+    bookings = models.PositiveIntegerField(default=0)
+    amount_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "paid_on"], name="uniq_daily_payment_stat"),
+        ]
 
+    def __str__(self):
+        return f"{self.date} paid {self.paid_on}: {self.bookings}"
+
+
+# ========================
+# Room-night occupancy index
+# ========================
+class RoomNight(models.Model):
+    """
+    One row per room per occupied night, kept in step with Booking by
+    Booking.save(). The unique (room, night) pair is what makes
+    double-booking impossible at the database level.
+    """
+    room = models.ForeignKey("Room", on_delete=models.CASCADE, related_name="nights")
+    booking = models.ForeignKey("Booking", on_delete=models.CASCADE, related_name="nights")
+    night = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["room", "night"], name="uniq_room_night"),
+        ]
+        indexes = [
+            # availability search: "which rooms are taken between these nights"
+            models.Index(fields=["night", "room"], name="roomnight_night_room_idx"),
+        ]
+
+    def __str__(self):
+        return f"Room {self.room_id} on {self.night} (booking {self.booking_id})"
+
+
+# ========================
+# Email outbox
+# ========================
+class OutboundEmail(models.Model):
+    """
+    A transactional email waiting for (or done with) delivery. Views only
+    enqueue rows (booking/outbox.py); `manage.py deliver_outbox` sends them
+    in batches over one SMTP connection, retrying with backoff.
+    """
+    STATUS = [
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+
+    # optional: attach the booking's (cached) invoice PDF at delivery time
+    booking = models.ForeignKey(
+        "Booking", on_delete=models.SET_NULL, null=True, blank=True, related_name="emails"
+    )
+    attach_invoice = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=10, choices=STATUS, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the delivery worker's "what is due" scan
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
+
+
+class ReportJob(models.Model):
+    """
+    A dashboard PDF report rendered in the background (booking/reports.py).
+    The admin submits the filters and polls the job; `manage.py run_report_jobs`
+    renders it to REPORT_DIR.
+    """
+    STATUS = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    params = models.JSONField(default=dict)   # start/end (ISO dates) and room_type
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS, default="queued")
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    file_path = models.CharField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="reportjob_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"Report #{self.pk} {self.params.get('start')} → {self.params.get('end')} ({self.status})"
+
+
+class SlowQuery(models.Model):
+    """
+    A query that ran over SLOW_QUERY_MS, or whose plan full-scans a watched
+    table (booking/slow_queries.py). Grouped by fingerprint in the admin.
+    """
+    REASONS = [
+        ("slow", "Over threshold"),
+        ("full_scan", "Full table scan"),
+    ]
+
+    fingerprint = models.CharField(max_length=40)   # sha1 of the normalized SQL
+    normalized_sql = models.TextField()
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    duration_ms = models.FloatField()
+    source = models.CharField(max_length=200, blank=True)   # view or management command
+    plan = models.TextField(blank=True)
+    full_scan = models.BooleanField(default=False)
+    reason = models.CharField(max_length=10, choices=REASONS, default="slow")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["fingerprint", "created_at"], name="slowquery_fp_idx"),
+            models.Index(fields=["created_at"], name="slowquery_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms {self.normalized_sql[:80]}"
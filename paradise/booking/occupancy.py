@@ -0,0 +1,78 @@
+# booking/occupancy.py
+"""
+Occupancy computed from the RoomNight index (booking/availability.py).
+
+A RoomNight row is one night a room is held by an active booking, so the
+room-nights sold in a window are a COUNT over `night BETWEEN start AND end`:
+stays are clipped to the window for free, cancelled bookings don't count,
+and no Booking instance is ever loaded.
+"""
+from django.db.models import Count, Q
+
+from .models import Room, RoomNight
+
+
+def window_days(start_date, end_date):
+    """Nights in the inclusive window [start_date, end_date]."""
+    return max((end_date - start_date).days + 1, 0)
+
+
+def _rate(sold, available):
+    return round(sold * 100 / available, 2) if available else 0
+
+
+def _nights_in(start_date, end_date, prefix=""):
+    return Q(**{f"{prefix}night__gte": start_date, f"{prefix}night__lte": end_date})
+
+
+def occupancy(start_date, end_date, room_type=None):
+    """
+    Overall occupancy for the window:
+    {"room_nights", "available_room_nights", "rate"} (rate in percent).
+    """
+    rooms = Room.objects.all()
+    nights = RoomNight.objects.filter(_nights_in(start_date, end_date))
+    if room_type:
+        rooms = rooms.filter(room_type=room_type)
+        nights = nights.filter(room__room_type=room_type)
+    available = rooms.count() * window_days(start_date, end_date)
+    sold = nights.count()
+    return {"room_nights": sold, "available_room_nights": available, "rate": _rate(sold, available)}
+
+
+def occupancy_by_room(start_date, end_date, room_type=None):
+    """One dict per room (rooms with no nights included), busiest first."""
+    days = window_days(start_date, end_date)
+    rooms = Room.objects.all()
+    nights = RoomNight.objects.filter(_nights_in(start_date, end_date))
+    if room_type:
+        rooms = rooms.filter(room_type=room_type)
+        nights = nights.filter(room__room_type=room_type)
+    # the window goes in WHERE (a range on roomnight_night_room_idx); the rooms are a
+    # second, small query rather than a LEFT JOIN over every RoomNight row
+    sold = dict(nights.values("room_id").annotate(n=Count("id")).values_list("room_id", "n"))
+    rows = [
+        {**room, "room_nights": sold.get(room["id"], 0)}
+        for room in rooms.values("id", "room_number", "room_type")
+    ]
+    rows.sort(key=lambda row: (-row["room_nights"], row["room_number"]))
+    return [{**row, "rate": _rate(row["room_nights"], days)} for row in rows]
+
+
+def occupancy_by_room_type(start_date, end_date):
+    """One dict per room type: rooms, room_nights, available_room_nights, rate."""
+    days = window_days(start_date, end_date)
+    sold = dict(
+        RoomNight.objects.filter(_nights_in(start_date, end_date))
+        .values("room__room_type").annotate(n=Count("id")).values_list("room__room_type", "n")
+    )
+    rows = Room.objects.values("room_type").annotate(rooms=Count("id")).order_by("room_type")
+    return [
+        {
+            **row,
+            "room_nights": sold.get(row["room_type"], 0),
+            "available_room_nights": row["rooms"] * days,
+            "rate": _rate(sold.get(row["room_type"], 0), row["rooms"] * days),
+        }
+        for row in rows
+    ]
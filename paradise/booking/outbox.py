@@ -0,0 +1,197 @@
+# booking/outbox.py
+"""
+Transactional email outbox.
+
+Request handlers call enqueue_email(), which is a single INSERT. The
+`deliver_outbox` management command drains due messages in batches over one
+reused SMTP connection; failures are recorded on the row and retried with
+exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils.timezone import now
+
+from .invoices import get_invoice_pdf
+from .models import OutboundEmail
+from .timing import span
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 60 * 60
+# how long a claimed batch is hidden from other workers while it is being sent
+CLAIM_LEASE_SECONDS = 5 * 60
+
+
+def _clean_recipients(to):
+    return [addr for addr in to if addr]
+
+
+def build_outbound(subject, body, to, from_email=None, booking=None, attach_invoice=False):
+    """
+    Unsaved OutboundEmail (for bulk_create), or None if there is nobody to
+    send to. `booking` may be a Booking or just its id.
+    """
+    recipients = _clean_recipients(to)
+    if not recipients:
+        return None
+    booking_id = getattr(booking, "pk", booking)
+    return OutboundEmail(
+        subject=subject,
+        body=body,
+        to=recipients,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        booking_id=booking_id,
+        attach_invoice=attach_invoice and booking_id is not None,
+    )
+
+
+def enqueue_email(subject, body, to, from_email=None, booking=None, attach_invoice=False):
+    """Queue one message for delivery. Returns the OutboundEmail, or None if `to` is empty."""
+    message = build_outbound(subject, body, to, from_email, booking, attach_invoice)
+    if message is not None:
+        with span("email"):
+            message.save()
+    return message
+
+
+def enqueue_many(messages, batch_size=500):
+    """bulk_create a list of build_outbound() results (Nones are skipped). Returns rows queued."""
+    rows = [m for m in messages if m is not None]
+    OutboundEmail.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try after `attempts` failed ones."""
+    return min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+
+
+def _to_email_message(row, connection):
+    message = EmailMessage(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=row.to,
+        connection=connection,
+    )
+    if row.attach_invoice and row.booking is not None:
+        message.attach(
+            f"Invoice-{row.booking.invoice_number}.pdf",
+            get_invoice_pdf(row.booking),
+            "application/pdf",
+        )
+    return message
+
+
+def claim_batch(batch_size):
+    """
+    Pick up to batch_size due messages and push their next_attempt_at past
+    the lease, so a second worker running at the same time skips them.
+    """
+    current = now()
+    ids = list(
+        OutboundEmail.objects.filter(status="pending", next_attempt_at__lte=current)
+        .order_by("next_attempt_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    lease_until = current + timedelta(seconds=CLAIM_LEASE_SECONDS)
+    # only rows nobody else claimed in between
+    OutboundEmail.objects.filter(id__in=ids, status="pending", next_attempt_at__lte=current).update(
+        next_attempt_at=lease_until
+    )
+    return list(
+        OutboundEmail.objects.filter(id__in=ids, next_attempt_at=lease_until)
+        .select_related("booking__room")
+        .order_by("id")
+    )
+
+
+def _record_failure(row, exc, max_attempts):
+    """Back the row off (or give up on it). Returns True if it was given up."""
+    attempts = row.attempts + 1
+    give_up = attempts >= max_attempts
+    OutboundEmail.objects.filter(pk=row.pk).update(
+        attempts=attempts,
+        status="failed" if give_up else "pending",
+        next_attempt_at=now() + timedelta(seconds=retry_delay(attempts)),
+        last_error=f"{type(exc).__name__}: {exc}"[:2000],
+    )
+    logger.warning("Outbox message %s failed (attempt %s): %s", row.pk, attempts, exc)
+    return give_up
+
+
+def deliver_batch(connection, batch_size=100, max_attempts=None):
+    """
+    Send one claimed batch. The connection is opened when the first message
+    is ready to go, and dropped (to reopen on the next send) only after a
+    transport error. Returns (sent, retried, failed).
+    """
+    max_attempts = max_attempts or getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+    rows = claim_batch(batch_size)
+    sent_ids = []
+    gave_up = []   # one bool per failed row
+
+    for row in rows:
+        try:
+            # the invoice PDF is rendered here; a render failure says nothing about the SMTP session
+            message = _to_email_message(row, connection)
+        except Exception as exc:
+            gave_up.append(_record_failure(row, exc, max_attempts))
+            continue
+
+        try:
+            connection.open()   # no-op while the session is up
+        except Exception as exc:
+            # server unreachable: the rest of the batch is retried once its lease expires
+            gave_up.append(_record_failure(row, exc, max_attempts))
+            break
+
+        try:
+            with span("email"):
+                connection.send_messages([message])
+        except Exception as exc:
+            gave_up.append(_record_failure(row, exc, max_attempts))
+            # a dropped SMTP session would fail the rest of the batch; the next send reconnects
+            try:
+                connection.close()
+            except Exception:
+                pass
+        else:
+            sent_ids.append(row.pk)
+
+    if sent_ids:
+        OutboundEmail.objects.filter(pk__in=sent_ids).update(
+            status="sent", sent_at=now(), attempts=F("attempts") + 1, last_error=""
+        )
+    failed = sum(gave_up)
+    return len(sent_ids), len(gave_up) - failed, failed
+
+
+def deliver_pending(batch_size=100, max_attempts=None, max_batches=None):
+    """
+    Drain everything that is due, batch after batch, over a single reused
+    connection. Nothing connects to the mail server unless a message is due.
+    Returns totals as (sent, retried, failed).
+    """
+    totals = [0, 0, 0]
+    connection = get_connection(fail_silently=False)
+    try:
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            sent, retried, failed = deliver_batch(connection, batch_size, max_attempts)
+            if not (sent or retried or failed):
+                break
+            totals[0] += sent
+            totals[1] += retried
+            totals[2] += failed
+            batches += 1
+    finally:
+        connection.close()
+    return tuple(totals)
@@ -0,0 +1,122 @@
+# booking/pagination.py
+"""
+Keyset ("cursor") pagination, newest first, on (created_at, id) or another
+(date/datetime column, id) pair.
+
+Each page is one indexed range query of PORTAL_PAGE_SIZE + 1 rows, whatever
+page the visitor is on; no OFFSET and no COUNT(*). Cursors are opaque
+strings in the ?after= (older) / ?before= (newer) query parameters; an
+unreadable cursor just gives the first page.
+
+EstimatedCountPaginator is the admin's counterpart for tables too big to
+COUNT(*) on every changelist page.
+"""
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+PORTAL_PAGE_SIZE = 25
+
+
+def encode_cursor(obj, key="created_at"):
+    raw = f"{getattr(obj, key).isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, field):
+    """(value of `field`, id) from a cursor, or None if it isn't one of ours."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        value, pk = raw.split("|")
+        value = field.to_python(value)
+        return (value, int(pk)) if value else None
+    except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError):
+        return None
+
+
+def keyset_page(queryset, params, per_page=PORTAL_PAGE_SIZE, key="created_at"):
+    """
+    One page of `queryset`, newest `key` first (ties by id), for request.GET
+    `params`: {"items", "newer", "older"} where newer/older are cursors or None.
+    """
+    field = queryset.model._meta.get_field(key)
+    after = decode_cursor(params.get("after"), field)
+    before = None if after else decode_cursor(params.get("before"), field)
+
+    if before:
+        # walk forward from the cursor, then flip back to newest first
+        value, pk = before
+        rows = list(
+            queryset.filter(Q(**{f"{key}__gt": value}) | Q(**{key: value, "id__gt": pk}))
+            .order_by(key, "id")[:per_page + 1]
+        )
+        has_more_newer = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        return {
+            "items": items,
+            "newer": encode_cursor(items[0], key) if items and has_more_newer else None,
+            "older": encode_cursor(items[-1], key) if items else None,
+        }
+
+    if after:
+        value, pk = after
+        queryset = queryset.filter(Q(**{f"{key}__lt": value}) | Q(**{key: value, "id__lt": pk}))
+    rows = list(queryset.order_by(f"-{key}", "-id")[:per_page + 1])
+    items = rows[:per_page]
+    return {
+        "items": items,
+        "newer": encode_cursor(items[0], key) if items and after else None,
+        "older": encode_cursor(items[-1], key) if len(rows) > per_page else None,
+    }
+
+
+# ========================
+# Admin changelists over very large tables
+# ========================
+def estimated_row_count(model, using="default"):
+    """
+    Row count from the database's own bookkeeping instead of COUNT(*), or None
+    when it has none (e.g. a Postgres table that was never ANALYZEd).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        elif connection.vendor == "sqlite":
+            # ids only grow, so deleted rows make this an over-estimate; it is one index seek
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs a full COUNT(*): an unfiltered list uses
+    estimated_row_count(), a filtered one counts at most COUNT_CAP rows
+    (so a broad filter shows "10000" and pages up to there).
+    """
+    COUNT_CAP = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.COUNT_CAP:
+                return estimate
+        return queryset.order_by()[:self.COUNT_CAP].count()
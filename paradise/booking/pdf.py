@@ -0,0 +1,148 @@
+# booking/pdf.py
+"""
+Off-request PDF rendering.
+
+WeasyPrint holds the CPU for hundreds of milliseconds per document, so every
+render goes through a small process pool instead of running inside the
+WSGI/ASGI worker. Submissions are bounded: once PDF_RENDER_QUEUE_SIZE jobs
+are pending, new ones wait up to PDF_RENDER_SUBMIT_TIMEOUT seconds and then
+fail fast with RenderQueueFull, so a burst of payment callbacks degrades to
+quick 503s instead of starving the request workers.
+
+Settings (all optional):
+    PDF_RENDER_WORKERS         processes in the pool (0 = render inline, e.g. tests)
+    PDF_RENDER_QUEUE_SIZE      max jobs queued or running at once
+    PDF_RENDER_TIMEOUT         default per-job timeout in seconds
+    PDF_RENDER_SUBMIT_TIMEOUT  how long submit() waits for a free queue slot
+"""
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+
+from .timing import span
+
+
+class PDFRenderError(Exception):
+    """Base class for rendering-pool failures."""
+
+
+class RenderQueueFull(PDFRenderError):
+    """No queue slot became free within PDF_RENDER_SUBMIT_TIMEOUT."""
+
+
+class RenderTimeout(PDFRenderError):
+    """The job did not finish within its timeout."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def write_pdf(html, base_url=None):
+    """Render HTML to PDF bytes in the current process (what the pool workers run)."""
+    # imported here so web processes never load WeasyPrint/Pango themselves
+    import weasyprint
+
+    return weasyprint.HTML(string=html, base_url=base_url).write_pdf()
+
+
+class RenderPool:
+    """Process pool + bounded queue for PDF jobs. Use the module-level helpers below."""
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # created lazily so each (pre-forked) web worker gets its own pool
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn: never fork a process that may hold DB connections/threads
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def submit(self, html, base_url=None, wait=None):
+        """Queue a render and return a concurrent.futures.Future of the PDF bytes."""
+        wait = _setting("PDF_RENDER_SUBMIT_TIMEOUT", 2) if wait is None else wait
+        if not self._slots.acquire(timeout=wait):
+            raise RenderQueueFull("PDF render queue is full, try again shortly.")
+
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(write_pdf(html, base_url))
+            except Exception as exc:
+                future.set_exception(exc)
+            finally:
+                self._slots.release()
+            return future
+
+        try:
+            future = self._get_executor().submit(write_pdf, html, base_url)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _f: self._slots.release())
+        return future
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool(
+                workers=_setting("PDF_RENDER_WORKERS", 2),
+                queue_size=_setting("PDF_RENDER_QUEUE_SIZE", 16),
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def submit_pdf(html, base_url=None):
+    """Queue a render without waiting for it. Returns a Future of the PDF bytes."""
+    return get_pool().submit(html, base_url)
+
+
+def render_pdf(html, base_url=None, timeout=None):
+    """Render HTML to PDF bytes through the pool, blocking up to `timeout` seconds."""
+    timeout = _setting("PDF_RENDER_TIMEOUT", 30) if timeout is None else timeout
+    with span("pdf"):
+        future = submit_pdf(html, base_url)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout as exc:
+            # a job already running in a worker can't be interrupted; it just stops mattering
+            future.cancel()
+            raise RenderTimeout(f"PDF render exceeded {timeout}s.") from exc
+
+
+async def arender_pdf(html, base_url=None, timeout=None):
+    """Async variant of render_pdf for ASGI views: awaits the pool without blocking the loop."""
+    timeout = _setting("PDF_RENDER_TIMEOUT", 30) if timeout is None else timeout
+    # submit() may briefly wait for a queue slot, keep that off the event loop
+    loop = asyncio.get_running_loop()
+    future = await loop.run_in_executor(None, submit_pdf, html, base_url)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError as exc:
+        future.cancel()
+        raise RenderTimeout(f"PDF render exceeded {timeout}s.") from exc
@@ -0,0 +1,208 @@
+# booking/reports.py
+"""
+Background PDF reports for the admin dashboard.
+
+The dashboard's "Export PDF" only creates a ReportJob and redirects to its
+status page. `manage.py run_report_jobs` claims queued jobs and renders the
+report in batches of REPORT_BATCH_ROWS bookings: each batch is its own HTML
+document and its own render_pdf() call (the first one also carries the KPIs
+and charts), so WeasyPrint never lays out more than one batch at a time.
+The job's progress moves after every rendered batch, and each batch PDF is
+appended (pypdf) as soon as it arrives, so only the merged document is held,
+never every batch's bytes; it's written to REPORT_DIR/<job id>.pdf for the
+admin to download.
+"""
+import datetime
+import logging
+import math
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .charts import dashboard_charts, svg_bar, svg_line
+from .dashboard import plan_dashboard
+from .models import Booking, ReportJob
+from .occupancy import occupancy
+from .pdf import render_pdf
+from .stats import day_bounds
+
+logger = logging.getLogger(__name__)
+
+REPORT_TEMPLATE = "admin/pdf_report.html"
+REPORT_ROWS_TEMPLATE = "admin/pdf_report_rows.html"
+REPORT_CHUNK_SIZE = 500      # rows per query
+REPORT_BATCH_ROWS = 2000     # rows per rendered PDF
+# a job still "running" after this long lost its worker and is picked up again
+REPORT_STALE_SECONDS = 30 * 60
+
+
+def reports_dir():
+    return Path(getattr(settings, "REPORT_DIR", Path(settings.BASE_DIR) / "var" / "reports"))
+
+
+def submit_report(start_date, end_date, room_type=None, user=None):
+    """Queue a dashboard PDF for the filters. Returns the ReportJob."""
+    return ReportJob.objects.create(
+        params={"start": start_date.isoformat(), "end": end_date.isoformat(), "room_type": room_type or ""},
+        requested_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_next_job():
+    """Mark the oldest queued (or abandoned) job as running and return it, or None."""
+    stale = timezone.now() - datetime.timedelta(seconds=REPORT_STALE_SECONDS)
+    claimable = ReportJob.objects.filter(Q(status="queued") | Q(status="running", started_at__lt=stale))
+    for job_id in claimable.order_by("created_at").values_list("id", flat=True)[:5]:
+        started = timezone.now()
+        # only one worker wins the UPDATE for a given row
+        if claimable.filter(id=job_id).update(status="running", started_at=started, progress=0, error=""):
+            return ReportJob.objects.get(id=job_id)
+    return None
+
+
+def _set_progress(job, percent):
+    job.progress = percent
+    ReportJob.objects.filter(id=job.id).update(progress=percent)
+
+
+def _report_bookings(start_date, end_date, room_type):
+    created_from, created_to = day_bounds(start_date, end_date)
+    qs = Booking.objects.filter(created_at__gte=created_from, created_at__lt=created_to)
+    if room_type:
+        qs = qs.filter(room__room_type=room_type)
+    return qs
+
+
+def booking_row_batches(bookings):
+    """
+    The bookings table body as HTML, one string per REPORT_BATCH_ROWS rows
+    (read REPORT_CHUNK_SIZE at a time). Always yields at least one batch.
+    """
+    parts, rows, last_id = [], 0, 0
+    while True:
+        size = min(REPORT_CHUNK_SIZE, REPORT_BATCH_ROWS - rows)
+        chunk = list(bookings.filter(id__gt=last_id).select_related("room").order_by("id")[:size])
+        if not chunk:
+            break
+        parts.append(render_to_string(REPORT_ROWS_TEMPLATE, {"bookings": chunk}))
+        rows += len(chunk)
+        last_id = chunk[-1].id
+        if rows >= REPORT_BATCH_ROWS:
+            yield "".join(parts)
+            parts, rows = [], 0
+    if parts or not last_id:
+        yield "".join(parts)
+
+
+def pdf_writer():
+    """An empty pypdf writer; batch PDFs are appended to it one by one."""
+    from pypdf import PdfWriter
+
+    return PdfWriter()
+
+
+def report_context(start_date, end_date, room_type=None):
+    """KPIs and charts for the report header (same numbers as the dashboard)."""
+    kpis = plan_dashboard(start_date, end_date, room_type=room_type)
+    occupancy_stats = occupancy(start_date, end_date, room_type=room_type)
+    charts = dashboard_charts(start_date, end_date, room_type, kpis, occupancy_stats)
+
+    week = [d.strftime("%b %d") for d in kpis["week"]]
+    type_labels = [t for t, _ in kpis["by_room_type"]]
+    type_counts = [n for _, n in kpis["by_room_type"]]
+    return {
+        "total_rooms": kpis["total_rooms"],
+        "total_bookings": kpis["total_bookings"],
+        "today_checkins": kpis["today_checkins"],
+        "today_checkouts": kpis["today_checkouts"],
+        "revenue_per_type": kpis["revenue_per_type"],
+        "avg_stay_days": kpis["avg_stay_days"],
+        "occupancy_rate": occupancy_stats["rate"],
+        "chart_svg": svg_line(week, kpis["weekly_counts"], title="Weekly Bookings") if any(kpis["weekly_counts"]) else "",
+        "room_chart_svg": svg_bar(type_labels, type_counts, title="Bookings per Room Type") if any(type_counts) else "",
+        "filter_start": start_date,
+        "filter_end": end_date,
+        **charts,
+    }
+
+
+def _write_atomic(path, write):
+    """Call write(fh) on a temp file next to `path`, then move it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            write(fh)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def run_job(job):
+    """Render one claimed job to disk. Failures are recorded on the job, not raised."""
+    try:
+        start_date = datetime.date.fromisoformat(job.params["start"])
+        end_date = datetime.date.fromisoformat(job.params["end"])
+        room_type = job.params.get("room_type") or None
+
+        context = report_context(start_date, end_date, room_type)
+        bookings = _report_bookings(start_date, end_date, room_type)
+        batches = max(1, math.ceil(bookings.count() / REPORT_BATCH_ROWS))
+        timeout = getattr(settings, "REPORT_RENDER_TIMEOUT", 600)
+
+        # a single batch is written as rendered; otherwise each one is merged and dropped
+        writer = pdf_writer() if batches > 1 else None
+        pdf = None
+        for number, rows in enumerate(booking_row_batches(bookings), 1):
+            html = render_to_string(REPORT_TEMPLATE, {
+                **context,
+                "booking_rows": rows,
+                "continued": number > 1,
+                "last_batch": number == batches,
+            })
+            pdf = render_pdf(html, timeout=timeout)
+            if writer is not None:
+                writer.append(BytesIO(pdf))
+                pdf = None
+            _set_progress(job, min(95, number * 95 // batches))
+
+        path = reports_dir() / f"{job.id}.pdf"
+        _write_atomic(path, writer.write if writer is not None else lambda fh: fh.write(pdf))
+    except Exception as exc:
+        logger.exception("Report job %s failed", job.id)
+        job.status = "failed"
+        job.error = f"{type(exc).__name__}: {exc}"[:2000]
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+        return job
+
+    job.status = "done"
+    job.progress = 100
+    job.file_path = str(path)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "progress", "file_path", "finished_at"])
+    return job
+
+
+def run_pending(max_jobs=None):
+    """Run queued jobs one after another. Returns how many were processed."""
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def report_filename(job):
+    return f"bookings_report_{job.params.get('start')}_to_{job.params.get('end')}.pdf"
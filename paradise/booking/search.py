@@ -0,0 +1,129 @@
+# booking/search.py
+"""
+Full-text lookup of bookings by invoice number, guest name/email, room
+number and account username/email.
+
+On SQLite the index is an FTS5 table (booking_search, created by migration
+0012) with one row per booking, rowid = booking id, kept in step by
+booking/signals.py. Every term is matched as a prefix ("ali smi" finds
+"Alice Smith") and hits are ranked with bm25, invoice/room numbers first.
+Bulk writes that skip signals call rebuild_search_index() (seed_bookings,
+`manage.py rebuild_booking_search`).
+
+Elsewhere (or if SQLite lacks FTS5) search_booking_ids() returns None and
+callers keep their indexed ORM lookups (BookingAdmin.get_search_results).
+"""
+import re
+
+from django.contrib.auth.models import User
+from django.db import connections
+
+from .models import Booking, Room
+
+SEARCH_TABLE = "booking_search"
+SEARCH_LIMIT = 50
+MAX_TERMS = 8
+# bm25 column weights, in table column order
+SEARCH_COLUMNS = (
+    ("invoice_number", 10.0),
+    ("customer_name", 5.0),
+    ("customer_email", 4.0),
+    ("room_number", 8.0),
+    ("username", 3.0),
+    ("user_email", 2.0),
+)
+
+_available = set()
+
+
+def search_available(using="default"):
+    """True when the FTS table exists on this database."""
+    if using in _available:
+        return True
+    connection = connections[using]
+    if connection.vendor == "sqlite" and SEARCH_TABLE in connection.introspection.table_names():
+        _available.add(using)
+        return True
+    return False
+
+
+def _index_sql(where):
+    columns = ", ".join(name for name, _ in SEARCH_COLUMNS)
+    return (
+        f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) "
+        f"SELECT b.id, b.invoice_number, b.customer_name, COALESCE(b.customer_email, ''), "
+        f"r.room_number, COALESCE(u.username, ''), COALESCE(u.email, '') "
+        f"FROM {Booking._meta.db_table} b "
+        f"JOIN {Room._meta.db_table} r ON r.id = b.room_id "
+        f"LEFT JOIN {User._meta.db_table} u ON u.id = b.user_id "
+        f"WHERE {where}"
+    )
+
+
+def _reindex(where, params, using="default"):
+    """Replace the index rows of the bookings matching `where` (SQL over alias b)."""
+    if not search_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN "
+            f"(SELECT b.id FROM {Booking._meta.db_table} b WHERE {where})",
+            params,
+        )
+        cursor.execute(_index_sql(where), params)
+
+
+def index_booking(booking_id, using="default"):
+    _reindex("b.id = %s", [booking_id], using)
+
+
+def reindex_room(room_id, using="default"):
+    """After a room number change: every booking of the room."""
+    _reindex("b.room_id = %s", [room_id], using)
+
+
+def reindex_user(user_id, using="default"):
+    _reindex("b.user_id = %s", [user_id], using)
+
+
+def unindex_booking(booking_id, using="default"):
+    if search_available(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [booking_id])
+
+
+def rebuild_search_index(using="default"):
+    """Re-index every booking. Returns rows indexed, or None without an FTS table."""
+    if not search_available(using):
+        return None
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(_index_sql("1 = 1"))
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def match_expression(term):
+    """FTS5 query for free text: every word, as a prefix, all required."""
+    words = re.findall(r"\w+", term.lower())[:MAX_TERMS]
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_booking_ids(term, limit=SEARCH_LIMIT, using="default"):
+    """
+    Booking ids matching `term`, best first; [] for a term with no words,
+    None when there is no FTS index (callers fall back to the ORM).
+    """
+    if not search_available(using):
+        return None
+    expression = match_expression(term)
+    if not expression:
+        return []
+    weights = ", ".join(str(weight) for _, weight in SEARCH_COLUMNS)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+            f"ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s",
+            [expression, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
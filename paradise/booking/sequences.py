@@ -0,0 +1,73 @@
+# booking/sequences.py
+"""
+Per-year invoice number allocator.
+
+One InvoiceSequence row per year holds the last number handed out. Taking
+numbers is an atomic `UPDATE ... SET last_number = last_number + n` followed
+by a read of the same row inside one transaction, so concurrent inserts
+never see the same number and the cost doesn't grow with the year's booking
+count. Bulk imports reserve a whole block in that same round trip.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from .models import Booking, InvoiceSequence
+
+INVOICE_PREFIX = "INV"
+
+
+def format_invoice_number(year, number):
+    return f"{INVOICE_PREFIX}-{year}-{number:03d}"
+
+
+def _highest_existing_number(year):
+    """Largest number already used for `year` by invoices issued before the sequence existed."""
+    prefix = f"{INVOICE_PREFIX}-{year}-"
+    highest = 0
+    for invoice_number in Booking.objects.filter(invoice_number__startswith=prefix).values_list(
+        "invoice_number", flat=True
+    ).iterator():
+        suffix = invoice_number[len(prefix):]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
+
+
+def _ensure_sequence(year):
+    # first allocation of the year: seed past anything already issued
+    try:
+        with transaction.atomic():
+            InvoiceSequence.objects.create(year=year, last_number=_highest_existing_number(year))
+    except IntegrityError:
+        pass  # another process created it first
+
+
+def reserve_invoice_numbers(count=1, year=None):
+    """Atomically take `count` consecutive numbers for `year`. Returns them as a range."""
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    year = year or now().year
+    with transaction.atomic():
+        bump = InvoiceSequence.objects.filter(year=year)
+        if not bump.update(last_number=F("last_number") + count):
+            _ensure_sequence(year)
+            bump.update(last_number=F("last_number") + count)
+        last = bump.values_list("last_number", flat=True).get()
+    return range(last - count + 1, last + 1)
+
+
+def next_invoice_number(year=None):
+    """Formatted invoice number for a single new booking."""
+    year = year or now().year
+    return format_invoice_number(year, reserve_invoice_numbers(1, year)[0])
+
+
+def assign_invoice_numbers(bookings, year=None):
+    """Give every booking without an invoice number one, using a single block reservation."""
+    year = year or now().year
+    missing = [b for b in bookings if not b.invoice_number]
+    if missing:
+        for booking, number in zip(missing, reserve_invoice_numbers(len(missing), year)):
+            booking.invoice_number = format_invoice_number(year, number)
+    return bookings
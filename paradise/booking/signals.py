@@ -0,0 +1,99 @@
+# booking/signals.py
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+
+from .catalogue import bump_catalogue, bump_room
+from .images import delete_variants, image_variants
+from .invoices import invalidate_invoice
+from .models import Booking, Room
+from .search import index_booking, reindex_room, reindex_user, unindex_booking
+from .slow_queries import install as install_slow_query_log
+from .stats import refresh_booking_day
+
+
+# (The room-night index is written by Booking.save() in the save's own transaction,
+#  not here, so a clash rolls the row back; deletes cascade from RoomNight.booking.)
+
+
+# --- Drop cached invoice PDFs of deleted bookings ---
+@receiver(post_delete, sender=Booking)
+def booking_deleted_drop_invoice(sender, instance, **kwargs):
+    invalidate_invoice(instance.pk)
+
+
+# --- Keep the daily rollup (DailyBookingStat) current ---
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed_refresh_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_booking_day(instance)
+
+
+# --- Cached public catalogue pages (booking/catalogue.py) ---
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def room_changed_bump_catalogue(sender, instance, **kwargs):
+    bump_catalogue()
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed_bump_room(sender, instance, **kwargs):
+    bump_room(instance.room_id)
+
+
+# --- Resized JPEG/WebP variants of Room.image (booking/images.py) ---
+@receiver(post_save, sender=Room)
+def room_saved_build_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_loaded_image_name", None)
+    if previous and previous != instance.image.name:
+        # replaced or cleared: the old upload's variants would otherwise stay on disk
+        field = instance.image.field
+        delete_variants(field.attr_class(instance, field, previous))
+    instance._loaded_image_name = instance.image.name
+    if instance.image:
+        image_variants(instance.image)   # builds them for a new upload; a cache hit otherwise
+
+
+@receiver(post_delete, sender=Room)
+def room_deleted_drop_image_variants(sender, instance, **kwargs):
+    delete_variants(instance.image)
+
+
+# --- Full-text booking search (booking/search.py) ---
+@receiver(post_save, sender=Booking)
+def booking_saved_index_search(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_booking(instance.pk)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted_unindex_search(sender, instance, **kwargs):
+    unindex_booking(instance.pk)
+
+
+@receiver(post_save, sender=Room)
+def room_saved_reindex_search(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return   # nothing booked in it yet
+    reindex_room(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved_reindex_search(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # logins save last_login only; skip those
+    if raw or created or (update_fields and not {"username", "email"} & set(update_fields)):
+        return
+    reindex_user(instance.pk)
+
+
+# --- Slow-query log (booking/slow_queries.py) on every new connection ---
+@receiver(connection_created)
+def connection_install_slow_query_log(sender, connection, **kwargs):
+    install_slow_query_log(connection)
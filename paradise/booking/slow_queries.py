@@ -0,0 +1,198 @@
+# booking/slow_queries.py
+"""
+Slow-query log.
+
+A connection.execute_wrapper installed on every database connection (see
+booking/signals.py) times each query. A query is recorded as a SlowQuery row,
+with its EXPLAIN plan and the view or management command that ran it, when:
+
+  * it took longer than SLOW_QUERY_MS, or
+  * it is the first time this process sees its query shape touching one of
+    SLOW_QUERY_SCAN_TABLES, and the plan is a full scan of that table. So a
+    missing index shows up on first use, not after the table has grown.
+
+Every recorded query also goes to the "booking.slow_queries" logger, which
+settings.LOGGING routes to var/log/slow_queries.log. Nothing is recorded
+during `manage.py migrate` or while the SlowQuery table doesn't exist yet.
+Set SLOW_QUERY_MS = None to turn the whole thing off.
+"""
+import hashlib
+import logging
+import re
+import sys
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .timing import current_timings
+
+logger = logging.getLogger("booking.slow_queries")
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+MAX_SEEN_SHAPES = 5000
+# schema changes scan and rewrite whole tables by design
+SKIPPED_COMMANDS = ("manage.py migrate", "manage.py makemigrations")
+
+_recording = ContextVar("booking_slow_query_recording", default=False)
+_scan_checked = set()   # fingerprints already EXPLAINed for full scans in this process
+_table_ready = set()    # connection aliases known to have the SlowQuery table
+
+_IN_LIST = re.compile(r"IN \((?:%s(?:,\s*)?)+\)")
+_NUMBER = re.compile(r"(?<![\w\"])\d+(?:\.\d+)?\b")
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """SQL with literals and IN-lists collapsed, so one query shape has one fingerprint."""
+    sql = _QUOTED.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def is_full_scan(plan, table, sql=""):
+    """
+    True if an EXPLAIN plan (SQLite or PostgreSQL) reads every row of `table`.
+    A LIMITed query that can stop early (no sort step) is not counted.
+    """
+    if re.search(r"\bLIMIT\b", sql) and "TEMP B-TREE" not in plan and "Sort" not in plan:
+        return False
+    for line in plan.splitlines():
+        if f"Seq Scan on {table}" in line:
+            return True
+        if f"SCAN {table}" in line and "INDEX" not in line:
+            return True
+    return False
+
+
+def explain(connection, sql, params):
+    # a bare backend cursor: the EXPLAIN must not go through execute_wrappers or show up
+    # in query counts (timing middleware, assertNumQueries)
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def current_source():
+    """The running view (from the timing middleware) or management command."""
+    timings = current_timings()
+    if timings is not None and timings.view:
+        return timings.view
+    if len(sys.argv) > 1 and sys.argv[0].endswith("manage.py"):
+        return f"manage.py {sys.argv[1]}"
+    return ""
+
+
+def _log_ready(connection):
+    """True once the SlowQuery table exists on this connection (checked until it does)."""
+    if connection.alias in _table_ready:
+        return True
+    from .models import SlowQuery
+
+    if SlowQuery._meta.db_table in connection.introspection.table_names():
+        _table_ready.add(connection.alias)
+        return True
+    return False
+
+
+def _watched_tables():
+    return getattr(settings, "SLOW_QUERY_SCAN_TABLES", ("booking_booking",))
+
+
+def record(connection, sql, params, duration_ms, reason, plan=None, normalized=None):
+    from .models import SlowQuery
+
+    normalized = normalized or normalize_sql(sql)
+    explainable = sql.lstrip().upper().startswith(EXPLAINABLE)
+    if plan is None and explainable:
+        try:
+            plan = explain(connection, sql, params)
+        except DatabaseError as exc:
+            plan = f"EXPLAIN failed: {exc}"
+    plan = plan or ""
+    source = current_source()
+    logger.warning("%s %.1fms [%s] %s", reason, duration_ms, source, normalized)
+    try:
+        # savepoint: a failed insert (e.g. table not migrated yet) mustn't break the caller's transaction
+        with transaction.atomic(using=connection.alias):
+            SlowQuery.objects.using(connection.alias).create(
+                fingerprint=fingerprint(normalized),
+                normalized_sql=normalized,
+                sql=sql,
+                params=repr(params)[:2000],
+                duration_ms=duration_ms,
+                source=source[:200],
+                plan=plan,
+                full_scan=any(is_full_scan(plan, table, sql) for table in _watched_tables()),
+                reason=reason,
+            )
+    except DatabaseError as exc:
+        logger.warning("Could not store slow query: %s", exc)
+
+
+def _check_full_scan(connection, sql, params, duration_ms):
+    tables = [table for table in _watched_tables() if table in sql]
+    if not tables or not sql.lstrip().upper().startswith("SELECT"):
+        return
+    normalized = normalize_sql(sql)
+    key = fingerprint(normalized)
+    if key in _scan_checked:
+        return
+    if len(_scan_checked) >= MAX_SEEN_SHAPES:
+        _scan_checked.clear()
+    _scan_checked.add(key)
+    try:
+        plan = explain(connection, sql, params)
+    except DatabaseError:
+        return
+    if any(is_full_scan(plan, table, sql) for table in tables):
+        record(connection, sql, params, duration_ms, "full_scan", plan=plan, normalized=normalized)
+
+
+class SlowQueryWrapper:
+    """execute_wrapper for one connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = getattr(settings, "SLOW_QUERY_MS", 200)
+        if threshold is None or _recording.get():
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if many:
+            return result
+
+        token = _recording.set(True)
+        try:
+            if current_source() in SKIPPED_COMMANDS or not _log_ready(self.connection):
+                return result
+            if duration_ms >= threshold:
+                record(self.connection, sql, params, duration_ms, "slow")
+            else:
+                _check_full_scan(self.connection, sql, params, duration_ms)
+        except Exception:
+            logger.exception("Slow-query recording failed")
+        finally:
+            _recording.reset(token)
+        return result
+
+
+def install(connection):
+    """Add the slow-query wrapper to a connection (idempotent)."""
+    if not any(isinstance(w, SlowQueryWrapper) for w in connection.execute_wrappers):
+        # first, not last: execute_wrapper() context managers pop() the last entry on exit
+        connection.execute_wrappers.insert(0, SlowQueryWrapper(connection))
@@ -0,0 +1,158 @@
+# booking/staticfiles.py
+"""
+Static build + serving for production (DEBUG off).
+
+`collectstatic` with PrecompressedManifestStaticFilesStorage:
+  - fingerprints every file (style.css -> style.3f2a9c1b7d4e.css) so it can
+    be cached "forever"; {% static %} resolves names through the manifest
+  - writes .gz and .br siblings of hashed text assets when they are smaller
+    (.br only where the optional Brotli package is installed; gzip otherwise)
+  - losslessly recompresses hashed PNGs (Pillow optimize), keeping the smaller
+
+serve_static() serves STATIC_ROOT, picking the .br / .gz sibling the client
+accepts, with immutable caching for fingerprinted names. A front-end server
+(nginx gzip_static / brotli_static) can serve the same files instead.
+"""
+import gzip
+import mimetypes
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".html", ".json", ".txt", ".map", ".xml", ".ico")
+# (extension, Content-Encoding), in order of preference
+ENCODINGS = ((".br", "br"), (".gz", "gzip"))
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+UNHASHED_MAX_AGE = 60 * 5
+
+
+# ========================
+# Build (collectstatic)
+# ========================
+def _compressors():
+    """(extension, compress) for each sibling the build can write; Brotli is optional."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    compressors = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.insert(0, (".br", lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.append(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+
+        for hashed_name in dict.fromkeys(hashed):
+            if hashed_name.endswith(".png"):
+                if self._recompress_png(hashed_name):
+                    yield hashed_name, hashed_name, True
+            elif hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                for sibling in self._write_compressed(hashed_name):
+                    yield sibling, sibling, True
+
+    def _replace(self, name, data):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(data))
+
+    def _write_compressed(self, name):
+        with self.open(name) as fh:
+            data = fh.read()
+        for ext, compress in _compressors():
+            compressed = compress(data)
+            # tiny files can grow; then the plain file is all we serve
+            if len(compressed) < len(data):
+                self._replace(name + ext, compressed)
+                yield name + ext
+
+    def _recompress_png(self, name):
+        from PIL import Image
+
+        with self.open(name) as fh:
+            data = fh.read()
+        try:
+            img = Image.open(BytesIO(data))
+            buf = BytesIO()
+            img.save(buf, "PNG", optimize=True)
+        except OSError:
+            return False
+        if buf.tell() >= len(data):
+            return False
+        self._replace(name, buf.getvalue())
+        return True
+
+
+# ========================
+# Serving
+# ========================
+def _accepted_encodings(request):
+    """Codings the client takes, leaving out any it refuses with q=0."""
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            refused = params and float(q) == 0
+        except ValueError:
+            refused = False
+        if not refused:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve_static(request, path):
+    """A file from STATIC_ROOT, precompressed when the client accepts br or gzip."""
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Not found")
+    if not os.path.isfile(fullpath):
+        raise Http404("Not found")
+
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = _accepted_encodings(request)
+    served, encoding = fullpath, None
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        for ext, name in ENCODINGS:
+            if name in accepted and os.path.isfile(fullpath + ext):
+                served, encoding = fullpath + ext, name
+                break
+
+    stat = os.stat(served)
+    if not was_modified_since(request.headers.get("If-Modified-Since"), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(served, "rb"), content_type=content_type or "application/octet-stream")
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        if encoding:
+            response["Content-Encoding"] = encoding
+        # FileResponse would otherwise label a .gz file as an attachment
+        response.headers.pop("Content-Disposition", None)
+
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        patch_vary_headers(response, ("Accept-Encoding",))
+    if HASHED_NAME.search(path):
+        response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        response["Cache-Control"] = f"public, max-age={UNHASHED_MAX_AGE}"
+    return response
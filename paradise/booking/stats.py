@@ -0,0 +1,144 @@
+# booking/stats.py
+"""
+Daily booking/revenue rollup (DailyBookingStat, plus DailyPaymentStat for
+paid revenue by the day it was paid).
+
+Rows are rebuilt one day at a time from that day's bookings: Booking saves
+and deletes refresh their own day (see booking/signals.py), and
+`manage.py refresh_booking_stats` refreshes arbitrary ranges after bulk
+updates, imports or room changes. Dashboards then aggregate a handful of
+rows per day instead of every booking in the range.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Booking, DailyBookingStat, DailyPaymentStat
+
+
+def day_bounds(start_date, end_date):
+    """Half-open aware datetime range [start_date 00:00, end_date + 1 day 00:00)."""
+    start = timezone.make_aware(datetime.datetime.combine(start_date, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min))
+    return start, end
+
+
+STAT_KEY_FIELDS = ["date", "room_type", "source", "payment_status"]
+STAT_VALUE_FIELDS = ["bookings", "nights", "room_revenue", "amount_paid"]
+PAYMENT_KEY_FIELDS = ["date", "paid_on"]
+PAYMENT_VALUE_FIELDS = ["bookings", "amount_paid"]
+
+
+def _replace_rows(model, rows, key_fields, value_fields, start_date, end_date):
+    """Make `model`'s rows for [start_date, end_date] exactly `rows`."""
+    # upsert rather than delete + insert: two saves refreshing the same day at once
+    # would otherwise both insert and trip the unique constraint
+    model.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=key_fields,
+        update_fields=value_fields,
+    )
+    # groups with no bookings left (e.g. the last unpaid booking of the day got paid)
+    wanted = {tuple(getattr(r, name) for name in key_fields) for r in rows}
+    stale = [
+        pk for pk, *key in model.objects.filter(date__gte=start_date, date__lte=end_date)
+        .values_list("id", *key_fields)
+        if tuple(key) not in wanted
+    ]
+    if stale:
+        model.objects.filter(id__in=stale).delete()
+
+
+def refresh_range(start_date, end_date):
+    """Rebuild the rollup rows for every day in [start_date, end_date]. Returns rows written."""
+    lo, hi = day_bounds(start_date, end_date)
+    created = Booking.objects.filter(created_at__gte=lo, created_at__lt=hi).annotate(day=TruncDate("created_at"))
+    stay = ExpressionWrapper(F("check_out") - F("check_in"), output_field=DurationField())
+    groups = (
+        created.values("day", "room__room_type", "source", "payment_status")
+        .annotate(
+            n=Count("id"),
+            stay=Sum(stay),
+            room_revenue=Sum("room__price"),
+            paid=Sum("amount_paid"),
+        )
+        .order_by()
+    )
+    payments = (
+        created.filter(payment_status="paid", payment_date__isnull=False)
+        .annotate(paid_on=TruncDate("payment_date"))
+        .values("day", "paid_on")
+        .annotate(n=Count("id"), paid=Sum("amount_paid"))
+        .order_by()
+    )
+    with transaction.atomic():
+        rows = [
+            DailyBookingStat(
+                date=g["day"],
+                room_type=g["room__room_type"],
+                source=g["source"],
+                payment_status=g["payment_status"],
+                bookings=g["n"],
+                nights=g["stay"].days if g["stay"] else 0,
+                room_revenue=g["room_revenue"] or 0,
+                amount_paid=g["paid"] or 0,
+            )
+            for g in groups
+        ]
+        _replace_rows(DailyBookingStat, rows, STAT_KEY_FIELDS, STAT_VALUE_FIELDS, start_date, end_date)
+        payment_rows = [
+            DailyPaymentStat(date=g["day"], paid_on=g["paid_on"], bookings=g["n"], amount_paid=g["paid"] or 0)
+            for g in payments
+        ]
+        _replace_rows(DailyPaymentStat, payment_rows, PAYMENT_KEY_FIELDS, PAYMENT_VALUE_FIELDS, start_date, end_date)
+    return len(rows)
+
+
+def refresh_day(day):
+    return refresh_range(day, day)
+
+
+def refresh_booking_day(booking):
+    """Refresh the day a booking was created on (called from Booking signals)."""
+    if booking.created_at:
+        refresh_day(timezone.localdate(booking.created_at))
+
+
+def refresh_all(chunk_days=31):
+    """Rebuild the whole rollup, a month of bookings per query."""
+    bounds = Booking.objects.aggregate(first=Min("created_at"), last=Max("created_at"))
+    if not bounds["first"]:
+        DailyBookingStat.objects.all().delete()
+        DailyPaymentStat.objects.all().delete()
+        return 0
+    first = timezone.localdate(bounds["first"])
+    last = timezone.localdate(bounds["last"])
+    DailyBookingStat.objects.exclude(date__gte=first, date__lte=last).delete()
+    DailyPaymentStat.objects.exclude(date__gte=first, date__lte=last).delete()
+    written = 0
+    day = first
+    while day <= last:
+        chunk_end = min(day + datetime.timedelta(days=chunk_days - 1), last)
+        written += refresh_range(day, chunk_end)
+        day = chunk_end + datetime.timedelta(days=1)
+    return written
+
+
+def stats_between(start_date, end_date, room_type=None, payment_status=None):
+    """Rollup rows for a dashboard filter set."""
+    qs = DailyBookingStat.objects.filter(date__gte=start_date, date__lte=end_date)
+    if room_type:
+        qs = qs.filter(room_type=room_type)
+    if payment_status:
+        qs = qs.filter(payment_status=payment_status)
+    return qs
+
+
+def payments_between(start_date, end_date):
+    """Paid-revenue rows for bookings created in [start_date, end_date]."""
+    return DailyPaymentStat.objects.filter(date__gte=start_date, date__lte=end_date)
@@ -0,0 +1,47 @@
+# booking/templatetags/room_images.py
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from booking.images import image_variants
+
+register = template.Library()
+
+# stock photo for rooms without an upload (must exist under static/: the manifest storage is strict)
+STOCK_ROOM_IMAGE = "images/room-p4.jpg"
+# room cards: full width on phones, 2 per row on tablets, 3 on desktops
+CARD_SIZES = "(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw"
+
+
+def _srcset(found):
+    return ", ".join(f"{url} {width}w" for width, url in found)
+
+
+@register.simple_tag
+def room_srcset(room, ext="jpg"):
+    """`srcset` value for one variant format of the room's image ("" without variants)."""
+    return _srcset(image_variants(room.image).get(ext, []))
+
+
+@register.simple_tag
+def room_picture(room, sizes=CARD_SIZES, css_class="", alt=""):
+    """
+    <picture> with WebP and JPEG srcsets of the room's image; browsers pick
+    the smallest variant that fills `sizes`. Falls back to the original
+    upload, or the stock photo for rooms without one.
+    """
+    alt = alt or f"Room {room.room_number}"
+    variants = image_variants(room.image)
+    if not variants:
+        src = room.image.url if room.image else static(STOCK_ROOM_IMAGE)
+        return format_html('<img src="{}" class="{}" alt="{}" loading="lazy">', src, css_class, alt)
+
+    jpegs = variants.get("jpg", [])
+    sources = format_html_join(
+        "", '<source type="image/{}" srcset="{}" sizes="{}">',
+        ((ext, _srcset(found), sizes) for ext, found in variants.items() if ext != "jpg" and found),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="lazy"></picture>',
+        sources, jpegs[0][1], _srcset(jpegs), sizes, css_class, alt,
+    )
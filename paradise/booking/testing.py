@@ -0,0 +1,62 @@
+# booking/testing.py
+"""Test helpers shared by booking/tests, and the project's TEST_RUNNER."""
+import logging
+
+from django.db import connection
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+# settings every test run gets, however it is started (manage.py test,
+# python -m django test, IDE runners): a private cache instead of the site's
+# shared files under var/cache
+TEST_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+}
+# loggers whose file handlers are swapped out during tests (they are read with assertLogs)
+QUIET_LOGGERS = ("booking.slow_queries",)
+
+
+class BookingTestRunner(DiscoverRunner):
+    """DiscoverRunner with TEST_SETTINGS applied and QUIET_LOGGERS kept off disk."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+        self._saved_handlers = {}
+        for name in QUIET_LOGGERS:
+            logger = logging.getLogger(name)
+            self._saved_handlers[name] = logger.handlers[:]
+            logger.handlers = [logging.NullHandler()]
+
+    def teardown_test_environment(self, **kwargs):
+        for name, handlers in self._saved_handlers.items():
+            logging.getLogger(name).handlers = handlers
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryBudgetMixin:
+    """
+    assertWithinQueryBudget(url) GETs `url` and fails if it ran more queries
+    than the view declared with @query_budget (booking/timing.py), or than
+    an explicit `budget`.
+    """
+
+    def assertWithinQueryBudget(self, url, budget=None, client=None):
+        client = client or self.client
+        if budget is None:
+            view = resolve(url.split("?")[0]).func
+            budget = getattr(view, "query_budget", None)
+            if budget is None:
+                self.fail(f"{url} resolves to a view without @query_budget")
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+            if response.streaming:
+                b"".join(response.streaming_content)  # streaming bodies query while being read
+        if len(captured) > budget:
+            queries = "\n".join(f"  {q['sql']}" for q in captured.captured_queries)
+            self.fail(f"{url} ran {len(captured)} queries, budget is {budget}:\n{queries}")
+        return response
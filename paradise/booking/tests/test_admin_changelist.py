@@ -0,0 +1,62 @@
+# booking/tests/test_admin_changelist.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from booking.models import Room, Booking
+from booking.pagination import EstimatedCountPaginator
+
+URL = "/admin/booking/booking/"
+
+
+class BookingChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(self.admin)
+        self.room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+        self.day = datetime.date(2030, 1, 1)
+
+    def book(self, n, name="Alice"):
+        for i in range(n):
+            start = self.day + datetime.timedelta(days=2 * Booking.objects.count())
+            Booking.objects.create(
+                room=self.room, user=self.admin, customer_name=f"{name} {i}",
+                check_in=start, check_out=start + datetime.timedelta(days=1),
+            )
+
+    def test_query_count_independent_of_rows(self):
+        self.book(2)
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(URL).status_code, 200)
+        self.book(8, name="Bob")
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(URL)
+        self.assertEqual(len(more), len(few))
+        self.assertFalse([q for q in more.captured_queries if "COUNT(*)" in q["sql"] and "LIMIT" not in q["sql"]])
+
+    def test_search_prefix_and_exact(self):
+        self.book(1, name="Alice")
+        self.book(1, name="Bob")
+        response = self.client.get(URL, {"q": "ali"})
+        self.assertEqual([b.customer_name for b in response.context["cl"].result_list], ["Alice 0"])
+        invoice = Booking.objects.get(customer_name="Bob 0").invoice_number
+        response = self.client.get(URL, {"q": invoice.lower()})
+        self.assertEqual([b.customer_name for b in response.context["cl"].result_list], ["Bob 0"])
+
+    def test_date_hierarchy_lists_only_months_with_bookings(self):
+        self.book(1)
+        Booking.objects.update(created_at=datetime.datetime(2029, 3, 5, 12, tzinfo=datetime.timezone.utc))
+        self.book(1, name="Bob")   # created now
+        response = self.client.get(URL, {"created_at__year": "2029"})
+        self.assertContains(response, "created_at__month=3")
+        self.assertNotContains(response, "created_at__month=4")
+
+    def test_estimated_count_caps_filtered_counts(self):
+        self.book(3)
+        paginator = EstimatedCountPaginator(Booking.objects.filter(room=self.room), 2)
+        paginator.COUNT_CAP = 2
+        self.assertEqual(paginator.count, 2)
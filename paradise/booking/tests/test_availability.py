@@ -0,0 +1,123 @@
+# booking/tests/test_availability.py
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from booking.availability import RoomUnavailable, available_rooms, is_room_available
+from booking.models import Room, Booking, RoomNight
+
+
+class RoomNightIndexTests(TestCase):
+    def setUp(self):
+        self.single = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        self.other = Room.objects.create(room_number="102", room_type="Single", price=Decimal("100.00"))
+        self.day = datetime.date(2030, 1, 10)
+        self.booking = Booking.objects.create(
+            room=self.single,
+            customer_name="Alice",
+            check_in=self.day,
+            check_out=self.day + datetime.timedelta(days=3),
+        )
+
+    def test_nights_indexed_on_save(self):
+        self.assertEqual(RoomNight.objects.filter(booking=self.booking).count(), 3)
+
+    def test_overlapping_booking_rejected(self):
+        with self.assertRaises(RoomUnavailable):
+            Booking.objects.create(
+                room=self.single,
+                customer_name="Bob",
+                check_in=self.day + datetime.timedelta(days=2),
+                check_out=self.day + datetime.timedelta(days=4),
+            )
+
+    def test_back_to_back_stays_allowed(self):
+        Booking.objects.create(
+            room=self.single,
+            customer_name="Bob",
+            check_in=self.day + datetime.timedelta(days=3),
+            check_out=self.day + datetime.timedelta(days=5),
+        )
+        self.assertEqual(RoomNight.objects.filter(room=self.single).count(), 5)
+
+    def test_available_rooms_excludes_taken(self):
+        free = list(available_rooms(self.day, self.day + datetime.timedelta(days=1), room_type="Single"))
+        self.assertEqual(free, [self.other])
+
+    def test_cancel_releases_nights(self):
+        self.booking.status = "cancelled"
+        self.booking.save()
+        self.assertTrue(is_room_available(self.single, self.day, self.day + datetime.timedelta(days=3)))
+
+    def test_book_room_view_rejects_overlap(self):
+        resp = self.client.post("/book/", {
+            "room_id": self.single.id,
+            "customer_name": "Carol",
+            "check_in": self.day.isoformat(),
+            "check_out": (self.day + datetime.timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class OverlapHandlingTests(TestCase):
+    """RoomUnavailable never escapes as a 500, and a rejected save leaves no row behind."""
+
+    def setUp(self):
+        self.room = Room.objects.create(room_number="201", room_type="Double", price=Decimal("150.00"))
+        self.day = datetime.date(2030, 3, 1)
+        self.holder = Booking.objects.create(
+            room=self.room, customer_name="Alice",
+            check_in=self.day, check_out=self.day + datetime.timedelta(days=2),
+        )
+        # cancelled earlier, and its nights have since gone to Alice
+        self.released = Booking.objects.create(
+            room=self.room, customer_name="Bob", status="cancelled",
+            check_in=self.day, check_out=self.day + datetime.timedelta(days=2),
+        )
+
+    def test_rejected_save_is_rolled_back(self):
+        with self.assertRaises(RoomUnavailable):
+            Booking.objects.create(
+                room=self.room, customer_name="Carol",
+                check_in=self.day, check_out=self.day + datetime.timedelta(days=1),
+            )
+        self.assertFalse(Booking.objects.filter(customer_name="Carol").exists())
+
+    def test_admin_form_rejects_overlap(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+        resp = self.client.post(f"/admin/booking/booking/{self.released.pk}/change/", {
+            "room": self.room.pk,
+            "customer_name": "Bob",
+            "check_in": self.day.isoformat(),
+            "check_out": (self.day + datetime.timedelta(days=1)).isoformat(),
+            "status": "confirmed",
+            "payment_status": "unpaid",
+            "amount_paid": "0",
+            "source": "website",
+            "refund_amount": "0",
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "already booked")
+        self.released.refresh_from_db()
+        self.assertEqual(self.released.status, "cancelled")
+
+    def test_payment_cancel_keeps_released_booking(self):
+        resp = self.client.get(f"/booking/{self.released.pk}/paypal-cancel/")
+        self.assertRedirects(resp, "/my-bookings/", fetch_redirect_response=False)
+        self.released.refresh_from_db()
+        self.assertEqual((self.released.status, self.released.payment_status), ("cancelled", "unpaid"))
+
+    def test_late_payment_is_recorded_without_confirming(self):
+        payment = mock.Mock(**{"execute.return_value": True})
+        with mock.patch("booking.views.paypalrestsdk.Payment.find", return_value=payment):
+            resp = self.client.get(
+                f"/booking/{self.released.pk}/paypal-success/", {"paymentId": "PAY-1", "PayerID": "P1"}
+            )
+        self.assertRedirects(resp, "/my-bookings/", fetch_redirect_response=False)
+        self.released.refresh_from_db()
+        self.assertEqual((self.released.status, self.released.payment_status), ("cancelled", "paid"))
+        self.assertEqual(RoomNight.objects.filter(booking=self.released).count(), 0)
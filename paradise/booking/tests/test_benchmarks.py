@@ -0,0 +1,51 @@
+# booking/tests/test_benchmarks.py
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from booking.models import Booking, Payment, Room, RoomNight
+
+
+class SeedAndBenchmarkTests(TestCase):
+    def _seed(self, *args):
+        call_command("seed_bookings", "--bookings", "300", "--rooms", "12", "--seed", "7", *args, stdout=StringIO())
+        return list(
+            Booking.objects.order_by("id").values_list(
+                "room__room_number", "check_in", "check_out", "status", "payment_status", "amount_paid"
+            )
+        )
+
+    def test_seed_is_deterministic_and_consistent(self):
+        first = self._seed()
+        self.assertEqual((Room.objects.count(), len(first)), (12, 300))
+        self.assertEqual(Payment.objects.count(), Booking.objects.exclude(payment_date=None).count())
+        self.assertFalse(Booking.objects.filter(invoice_number="").exists())
+        self.assertTrue(RoomNight.objects.exists())
+        # backdated history, written without switching off auto_now_add
+        self.assertTrue(Booking._meta.get_field("created_at").auto_now_add)
+        self.assertGreater(Booking.objects.values("created_at__date").distinct().count(), 30)
+        self.assertFalse(Payment.objects.exclude(created_at=F("booking__payment_date")).exists())
+        self.assertEqual(self._seed("--flush"), first)
+
+    def test_benchmark_reports_json(self):
+        self._seed()
+        out = StringIO()
+        call_command(
+            "run_benchmarks", "--iterations", "2", "--warmup", "0",
+            "--only", "staff_finance", "finance_csv", "billing_maintenance",
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["dataset"]["bookings"], 300)
+        for name in ("staff_finance", "finance_csv", "billing_maintenance"):
+            self.assertEqual(
+                set(report["results"][name]), {"p50_ms", "p95_ms", "max_ms", "queries", "peak_memory_kb"}
+            )
+        # the superuser it logged in as exists only for the run
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Session.objects.exists())
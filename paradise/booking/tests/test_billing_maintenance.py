@@ -0,0 +1,52 @@
+# booking/tests/test_billing_maintenance.py
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.models import Room, Booking, OutboundEmail, RoomNight
+
+
+class BillingMaintenanceTests(TestCase):
+    def setUp(self):
+        self.room = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        start = timezone.now().date() + datetime.timedelta(days=30)
+        self.overdue = self._booking("Overdue", start, days_old=3)
+        self.very_overdue = self._booking("Very overdue", start + datetime.timedelta(days=5), days_old=6)
+        self.fresh = self._booking("Fresh", start + datetime.timedelta(days=10), days_old=0)
+
+    def _booking(self, name, check_in, days_old):
+        booking = Booking.objects.create(
+            room=self.room, customer_name=name, customer_email=f"{name.split()[0].lower()}@example.com",
+            check_in=check_in, check_out=check_in + datetime.timedelta(days=2),
+        )
+        # created_at is auto_now_add, so age the row afterwards
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - datetime.timedelta(days=days_old))
+        return booking
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("billing_maintenance", *args, stdout=out)
+        return out.getvalue()
+
+    def test_cancels_and_reminds_once_per_window(self):
+        output = self.run_command("--batch-size", "1")
+        self.assertIn("Reminded: 1, Auto-cancelled: 1", output)
+
+        self.very_overdue.refresh_from_db()
+        self.assertEqual(self.very_overdue.status, "cancelled")
+        self.assertFalse(RoomNight.objects.filter(booking=self.very_overdue).exists())
+        self.assertEqual(list(OutboundEmail.objects.values_list("booking_id", flat=True)), [self.overdue.pk])
+
+        # second run inside the window: nothing new
+        self.assertIn("Reminded: 0, Auto-cancelled: 0", self.run_command())
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        output = self.run_command("--dry-run")
+        self.assertIn("[dry run] Reminded: 1, Auto-cancelled: 1", output)
+        self.assertEqual(OutboundEmail.objects.count(), 0)
+        self.assertFalse(Booking.objects.filter(status="cancelled").exists())
@@ -0,0 +1,64 @@
+# booking/tests/test_catalogue.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from booking.models import Room, Booking
+
+
+class CatalogueCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+
+    def test_anonymous_room_list_served_from_cache(self):
+        first = self.client.get("/rooms/")
+        self.assertContains(first, "Room 101")
+        with self.assertNumQueries(0):
+            second = self.client.get("/rooms/")
+        self.assertEqual(second.content, first.content)
+        self.assertIn("no-cache", second["Cache-Control"])
+
+    def test_room_save_invalidates(self):
+        etag = self.client.get("/rooms/")["ETag"]
+        Room.objects.create(room_number="102", room_type="Single", price=Decimal("90.00"))
+        response = self.client.get("/rooms/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Room 102")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_conditional_get_returns_304(self):
+        first = self.client.get(f"/rooms/{self.room.pk}/")
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/rooms/{self.room.pk}/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(f"/rooms/{self.room.pk}/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_booking_invalidates_its_room_page(self):
+        etag = self.client.get(f"/rooms/{self.room.pk}/")["ETag"]
+        day = datetime.date(2030, 1, 10)
+        Booking.objects.create(room=self.room, customer_name="Alice", check_in=day, check_out=day + datetime.timedelta(days=2))
+        response = self.client.get(f"/rooms/{self.room.pk}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Alice")
+
+    def test_searches_and_signed_in_users_bypass_cache(self):
+        self.client.get("/rooms/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/rooms/?check_in=2030-01-10&check_out=2030-01-12")
+        self.assertNotIn("ETag", response)
+
+        self.client.force_login(get_user_model().objects.create_user("guest", password="pw"))
+        response = self.client.get("/rooms/")
+        self.assertNotIn("ETag", response)
+        self.assertContains(response, "My Bookings")
+
+    def test_book_room_form_caches_rooms_not_csrf(self):
+        self.client.get("/book/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/book/")
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertContains(response, "Room 101")
@@ -0,0 +1,83 @@
+# booking/tests/test_charts.py
+import datetime
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import matplotlib.pyplot as plt
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from booking.charts import cached_chart, chart_key, room_type_figure, weekly_bookings_html, weekly_checkins
+from booking.models import Room, Booking
+
+
+class CachedChartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_hit_skips_building_and_miss_closes_figure(self):
+        build = mock.Mock(side_effect=lambda: room_type_figure(["Suite"], [3]))
+        open_before = len(plt.get_fignums())
+
+        png = cached_chart("chart_test", build)
+        self.assertTrue(png)
+        self.assertEqual(len(plt.get_fignums()), open_before)
+
+        self.assertEqual(cached_chart("chart_test", build), png)
+        self.assertEqual(build.call_count, 1)
+
+    def test_figure_closed_when_encoding_fails(self):
+        open_before = len(plt.get_fignums())
+        with mock.patch("matplotlib.figure.Figure.savefig", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                cached_chart("chart_broken", lambda: room_type_figure(["Suite"], [3]))
+        self.assertEqual(len(plt.get_fignums()), open_before)
+
+    def test_warm_command_fills_the_default_view(self):
+        room = Room.objects.create(room_number="101", room_type="Suite", price=100)
+        today = timezone.now().date()
+        Booking.objects.create(room=room, customer_name="Guest", check_in=today,
+                               check_out=today + datetime.timedelta(days=2))
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location,
+        }}):
+            start = today - datetime.timedelta(days=30)
+            cache.set(chart_key("roomtype", start, today), "stale")   # still inside CHART_TIMEOUT
+            call_command("warm_dashboard_charts", "--days", "30", stdout=StringIO())
+            self.assertNotIn(cache.get(chart_key("roomtype", start, today)), (None, "stale"))
+            self.assertTrue(cache.get(chart_key("occupancy", start, today, "Suite")))
+
+    def test_warm_command_refuses_a_per_process_cache(self):
+        with self.assertRaises(CommandError):
+            call_command("warm_dashboard_charts", stdout=StringIO())
+
+
+class WeeklyPlotlyChartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        suite = Room.objects.create(room_number="201", room_type="Suite", price=200)
+        single = Room.objects.create(room_number="101", room_type="Single", price=100)
+        monday = self.today - datetime.timedelta(days=self.today.weekday()) + datetime.timedelta(days=14)
+        for room, offset in ((suite, 0), (suite, 3), (single, 0), (single, 7)):
+            check_in = monday + datetime.timedelta(days=offset)
+            Booking.objects.create(room=room, customer_name="Guest", check_in=check_in,
+                                   check_out=check_in + datetime.timedelta(days=1))
+        self.monday = monday
+
+    def test_histogram_is_grouped_in_the_database(self):
+        with self.assertNumQueries(1):
+            bins = weekly_checkins(self.today, self.today)
+        self.assertEqual(bins, [(self.monday, 3), (self.monday + datetime.timedelta(days=7), 1)])
+        self.assertEqual(weekly_checkins(self.today, self.today, "Suite"), [(self.monday, 2)])
+        yesterday = self.today - datetime.timedelta(days=1)
+        self.assertEqual(weekly_checkins(yesterday, yesterday), [])
+
+    def test_html_fragment_is_cached(self):
+        html = weekly_bookings_html(self.today, self.today)
+        self.assertIn("Weekly Bookings", html)
+        with self.assertNumQueries(0):
+            self.assertEqual(weekly_bookings_html(self.today, self.today), html)
@@ -36,4 +36,12 @@ class TestDashboard(TestCase):
         resp = self.client.get("/admin/?export=csv")
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp["Content-Type"], "text/csv")
-        self.assertIn("Customer", resp.content.decode())
+        self.assertIn("Customer", b"".join(resp.streaming_content).decode())
+
+    def test_csv_export_skips_kpis_and_charts(self):
+        # session + user only; the bookings are read while the body streams
+        with self.assertNumQueries(2):
+            resp = self.client.get("/admin/?export=csv")
+        with self.assertNumQueries(1):
+            body = b"".join(resp.streaming_content).decode()
+        self.assertIn("Alice", body)
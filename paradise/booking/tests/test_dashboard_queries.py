@@ -0,0 +1,57 @@
+# booking/tests/test_dashboard_queries.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.dashboard import plan_dashboard, plan_finance
+from booking.models import Room, Booking
+
+
+class DashboardQueryBudgetTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.suite = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("250.00"))
+        self.single = Room.objects.create(room_number="102", room_type="Single", price=Decimal("100.00"))
+
+    def _bookings(self, count, start=0):
+        for i in range(start, start + count):
+            check_in = self.today + datetime.timedelta(days=i * 3)
+            Booking.objects.create(
+                room=self.suite if i % 2 else self.single, customer_name=f"Guest {i}",
+                check_in=check_in, check_out=check_in + datetime.timedelta(days=2),
+                source="agent" if i % 3 else "direct",
+            )
+
+    def test_plan_dashboard_numbers(self):
+        self._bookings(4)
+        with self.assertNumQueries(3):
+            plan = plan_dashboard(self.today - datetime.timedelta(days=6), self.today, today=self.today)
+        self.assertEqual(plan["total_bookings"], 4)
+        self.assertEqual(plan["avg_stay_days"], 2)
+        self.assertEqual(plan["today_checkins"], 1)
+        self.assertEqual(plan["weekly_counts"][-1], 4)
+        self.assertEqual(dict(plan["by_room_type"]), {"Single": 2, "Suite": 2})
+        self.assertEqual(plan["revenue_per_type"][0], {"room__room_type": "Suite", "total_revenue": Decimal("500.00")})
+
+    def test_plan_finance_is_two_queries(self):
+        self._bookings(3)
+        with self.assertNumQueries(2):
+            plan = plan_finance(self.today, self.today)
+        self.assertEqual((plan["total_unpaid_count"], plan["total_paid"], plan["daily"]), (3, 0, []))
+        with self.assertNumQueries(1):   # no paid revenue to list when filtering on another status
+            plan_finance(self.today, self.today, payment_status="unpaid")
+
+    def test_admin_dashboard_query_count_is_flat(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+        self._bookings(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/admin/")
+        self._bookings(20, start=2)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get("/admin/")
+        self.assertEqual(len(many), len(few))
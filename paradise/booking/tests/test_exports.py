@@ -0,0 +1,70 @@
+# booking/tests/test_exports.py
+import datetime
+import gzip
+import io
+from decimal import Decimal
+
+import pyarrow.parquet as pq
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.exports import csv_lines, parquet_chunks
+from booking.models import Room, Booking
+
+
+class StreamingCsvTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        )
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("250.00"))
+        today = timezone.localdate()
+        for i in range(3):
+            check_in = today + datetime.timedelta(days=10 + i * 2)
+            Booking.objects.create(room=room, customer_name=f"Guest {i}", check_in=check_in,
+                                   check_out=check_in + datetime.timedelta(days=1))
+
+    def test_header_is_the_first_chunk(self):
+        chunks = csv_lines(["a", "b"], iter([(1, 2)]))
+        self.assertEqual(next(chunks), b"a,b\r\n")
+        self.assertEqual(list(chunks), [b"1,2\r\n"])
+
+    def test_finance_csv_streams_rows(self):
+        resp = self.client.get("/staff/finance/export/csv/")
+        self.assertTrue(resp.streaming)
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("Invoice #,Customer"))
+        self.assertEqual(len(lines), 4)
+        self.assertIn(",Guest 0,,101,Suite,pending,unpaid,0,,", lines[1])
+
+    def test_gzip_download(self):
+        resp = self.client.get("/staff/finance/export/csv/?gzip=1")
+        self.assertEqual(resp["Content-Type"], "application/gzip")
+        self.assertIn('.csv.gz"', resp["Content-Disposition"])
+        body = gzip.decompress(b"".join(resp.streaming_content)).decode()
+        self.assertEqual(len(body.splitlines()), 4)
+
+    def test_finance_parquet_is_typed(self):
+        resp = self.client.get("/staff/finance/export/parquet/")
+        self.assertEqual(resp.status_code, 200)
+        table = pq.read_table(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(str(table.schema.field("amount_paid").type), "decimal128(10, 2)")
+        self.assertEqual(str(table.schema.field("check_in").type), "date32[day]")
+        self.assertEqual(str(table.schema.field("status").type), "dictionary<values=string, indices=int32, ordered=0>")
+        self.assertEqual(table.column("room_number").to_pylist(), ["101"] * 3)
+
+    def test_parquet_row_groups(self):
+        rows = [(f"Guest {i}", i % 2 and "paid" or "unpaid") for i in range(5)]
+        chunks = list(parquet_chunks([("name", "string"), ("status", "category")], rows, row_group_rows=2))
+        parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+        self.assertEqual((parquet.metadata.num_rows, parquet.num_row_groups), (5, 3))
+
+    def test_dashboard_parquet_export(self):
+        # session + user only: no KPI, occupancy or chart queries before the body streams
+        with self.assertNumQueries(2):
+            resp = self.client.get("/admin/?export=parquet")
+        table = pq.read_table(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(table.column_names[:3], ["customer_name", "room_room_number", "room_room_type"])
+        self.assertEqual(table.num_rows, 3)
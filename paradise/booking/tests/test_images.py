@@ -0,0 +1,91 @@
+# booking/tests/test_images.py
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from booking.images import image_variants
+from booking.models import Room
+
+
+def upload(width=800, height=600, name="sea.jpg"):
+    buf = BytesIO()
+    Image.new("RGB", (width, height), "steelblue").save(buf, "JPEG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+def transparent_png(width=200, height=100, name="logo.png"):
+    buf = BytesIO()
+    Image.new("RGBA", (width, height), (0, 0, 0, 0)).save(buf, "PNG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/png")
+
+
+class RoomImageVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_variants_built_on_upload(self):
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200"), image=upload())
+        variants = image_variants(room.image)
+        # widths above the 800px original are clamped to it
+        self.assertEqual([w for w, _ in variants["webp"]], [160, 320, 640, 800])
+        self.assertTrue(variants["jpg"][0][1].endswith(".160w.jpg"))
+        with room.image.storage.open(room.image.name.replace(".jpg", ".320w.webp")) as fh:
+            self.assertEqual(Image.open(fh).size, (320, 240))
+
+        cache.clear()   # found again from disk, not rebuilt
+        self.assertEqual(image_variants(room.image), variants)
+
+    def test_room_picture_tag(self):
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200"), image=upload(300, 200))
+        html = Template("{% load room_images %}{% room_picture room %}").render(Context({"room": room}))
+        self.assertIn('<source type="image/webp" srcset="/media/rooms/', html)
+        self.assertIn(".160w.jpg 160w", html)
+        self.assertIn(".300w.jpg 300w", html)
+
+        bare = Room.objects.create(room_number="102", room_type="Suite", price=Decimal("200"))
+        html = Template("{% load room_images %}{% room_picture room %}").render(Context({"room": bare}))
+        self.assertIn("/static/images/room-p4.jpg", html)
+
+    def test_delete_removes_variants(self):
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200"), image=upload())
+        storage, name = room.image.storage, room.image.name
+        room.delete()
+        self.assertEqual(storage.listdir("rooms")[1], [name.rsplit("/", 1)[1]])
+
+    def test_transparency_kept_in_webp_and_white_in_jpeg(self):
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200"), image=transparent_png())
+        storage, name = room.image.storage, room.image.name
+        with storage.open(name.replace(".png", ".160w.webp")) as fh:
+            webp = Image.open(fh)
+            webp.load()
+        self.assertEqual(webp.mode, "RGBA")
+        self.assertEqual(webp.getpixel((0, 0))[3], 0)
+        with storage.open(name.replace(".png", ".160w.jpg")) as fh:
+            self.assertGreater(min(Image.open(fh).convert("RGB").getpixel((0, 0))), 245)   # white, not black
+
+    def test_replacing_the_image_removes_old_variants(self):
+        Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200"), image=upload(name="old.jpg"))
+        room = Room.objects.get()   # as the admin loads it
+        old_name = room.image.name
+        room.image = upload(300, 200, name="new.jpg")
+        room.save()
+        files = room.image.storage.listdir("rooms")[1]
+        self.assertFalse([f for f in files if f.startswith("old.") and f != old_name.rsplit("/", 1)[1]])
+        self.assertIn("new.300w.webp", files)
+
+        room = Room.objects.get()
+        room.image = None
+        room.save()
+        self.assertEqual(sorted(room.image.storage.listdir("rooms")[1]), ["new.jpg", "old.jpg"])
@@ -0,0 +1,51 @@
+# booking/tests/test_invoices.py
+import datetime
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from booking.models import Room, Booking
+
+
+class InvoiceCacheTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(INVOICE_CACHE_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        render = mock.patch("booking.invoices.render_pdf", return_value=b"%PDF-1.7 test")
+        self.render_pdf = render.start()
+        self.addCleanup(render.stop)
+
+        room = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        today = datetime.date.today()
+        self.booking = Booking.objects.create(
+            room=room, customer_name="Alice", check_in=today, check_out=today + datetime.timedelta(days=1),
+        )
+
+    def test_repeat_download_is_served_from_cache(self):
+        for _ in range(2):
+            resp = self.client.get(f"/booking/{self.booking.id}/invoice/")
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(b"".join(resp.streaming_content), b"%PDF-1.7 test")
+        self.assertEqual(self.render_pdf.call_count, 1)
+
+    def test_changed_invoice_field_invalidates(self):
+        self.client.get(f"/booking/{self.booking.id}/invoice/")
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.payment_status = "paid"
+        booking.save()
+        self.client.get(f"/booking/{self.booking.id}/invoice/")
+        self.assertEqual(self.render_pdf.call_count, 2)
+
+    def test_unrelated_save_keeps_cache(self):
+        self.client.get(f"/booking/{self.booking.id}/invoice/")
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.source = "agent"
+        booking.save()
+        self.client.get(f"/booking/{self.booking.id}/invoice/")
+        self.assertEqual(self.render_pdf.call_count, 1)
@@ -0,0 +1,60 @@
+# booking/tests/test_occupancy.py
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from booking.models import Room, Booking
+from booking.occupancy import occupancy, occupancy_by_room, occupancy_by_room_type
+
+
+class OccupancyTests(TestCase):
+    def setUp(self):
+        self.start = datetime.date(2030, 3, 1)
+        self.end = datetime.date(2030, 3, 10)  # 10 nights
+        self.suite = Room.objects.create(room_number="201", room_type="Suite", price=Decimal("250.00"))
+        self.single = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        Room.objects.create(room_number="102", room_type="Single", price=Decimal("100.00"))
+
+    def _book(self, room, check_in, check_out, **kwargs):
+        return Booking.objects.create(room=room, customer_name="Guest", check_in=check_in, check_out=check_out, **kwargs)
+
+    def test_stays_are_clipped_to_the_window(self):
+        # 3 nights before the window, 2 inside
+        self._book(self.suite, datetime.date(2030, 2, 26), datetime.date(2030, 3, 3))
+        # 1 night inside, 4 after
+        self._book(self.single, datetime.date(2030, 3, 10), datetime.date(2030, 3, 15))
+        self._book(self.single, datetime.date(2030, 3, 4), datetime.date(2030, 3, 6), status="cancelled")
+
+        with self.assertNumQueries(2):
+            stats = occupancy(self.start, self.end)
+        self.assertEqual(stats, {"room_nights": 3, "available_room_nights": 30, "rate": 10.0})
+        self.assertEqual(occupancy(self.start, self.end, room_type="Suite")["rate"], 20.0)
+
+    def test_per_room_and_per_type(self):
+        self._book(self.suite, datetime.date(2030, 3, 1), datetime.date(2030, 3, 6))
+        self._book(self.single, datetime.date(2030, 3, 1), datetime.date(2030, 3, 3))
+
+        with self.assertNumQueries(2):
+            rooms = occupancy_by_room(self.start, self.end)
+        self.assertEqual(
+            [(r["room_number"], r["room_nights"], r["rate"]) for r in rooms],
+            [("201", 5, 50.0), ("101", 2, 20.0), ("102", 0, 0)],
+        )
+        by_type = {r["room_type"]: r for r in occupancy_by_room_type(self.start, self.end)}
+        self.assertEqual((by_type["Single"]["rooms"], by_type["Single"]["rate"]), (2, 10.0))
+        self.assertEqual(by_type["Suite"]["available_room_nights"], 10)
+
+    def test_window_filters_room_nights_in_where(self):
+        # the night range must reach the RoomNight scan, not sit in a COUNT(... FILTER)
+        with CaptureQueriesContext(connection) as ctx:
+            occupancy_by_room(self.start, self.end)
+            occupancy_by_room_type(self.start, self.end)
+        night_queries = [q["sql"] for q in ctx.captured_queries if "booking_roomnight" in q["sql"]]
+        self.assertEqual(len(night_queries), 2)
+        for sql in night_queries:
+            self.assertIn("WHERE", sql)
+            self.assertNotIn("LEFT OUTER JOIN", sql)
+            self.assertNotIn("FILTER", sql)
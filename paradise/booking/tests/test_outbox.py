@@ -0,0 +1,84 @@
+# booking/tests/test_outbox.py
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from booking.models import Room, Booking, OutboundEmail
+from booking.outbox import deliver_pending, enqueue_email
+from booking.pdf import RenderTimeout
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class OutboxTests(TestCase):
+    def setUp(self):
+        room = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        today = timezone.now().date()
+        self.booking = Booking.objects.create(
+            room=room, customer_name="Alice", customer_email="alice@example.com",
+            check_in=today, check_out=today + datetime.timedelta(days=1),
+        )
+
+    def test_enqueue_skips_empty_recipients(self):
+        self.assertIsNone(enqueue_email("Hi", "Body", to=[None, ""]))
+        self.assertEqual(OutboundEmail.objects.count(), 0)
+
+    def test_deliver_sends_in_batches_and_marks_sent(self):
+        for i in range(5):
+            enqueue_email(f"Reminder {i}", "Body", to=["guest@example.com"])
+        sent, retried, failed = deliver_pending(batch_size=2)
+        self.assertEqual((sent, retried, failed), (5, 0, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(OutboundEmail.objects.filter(status="sent").count(), 5)
+
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        enqueue_email("Invoice", "Body", to=["alice@example.com"], booking=self.booking, attach_invoice=True)
+        with mock.patch("booking.outbox.get_invoice_pdf", side_effect=RenderTimeout("slow")):
+            self.assertEqual(deliver_pending(max_attempts=2), (0, 1, 0))
+            row = OutboundEmail.objects.get()
+            self.assertEqual(row.status, "pending")
+            self.assertGreater(row.next_attempt_at, timezone.now())
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(deliver_pending(max_attempts=2), (0, 0, 1))
+        row.refresh_from_db()
+        self.assertEqual(row.status, "failed")
+        self.assertIn("RenderTimeout", row.last_error)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class OutboxConnectionTests(TestCase):
+    """The SMTP session is opened only when a message goes out, and reset only after a transport error."""
+
+    def setUp(self):
+        self.connection = mock.MagicMock()
+        patcher = mock.patch("booking.outbox.get_connection", return_value=self.connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_nothing_due_never_connects(self):
+        self.assertEqual(deliver_pending(), (0, 0, 0))
+        self.connection.open.assert_not_called()
+
+    def test_render_failure_keeps_the_session(self):
+        room = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        today = timezone.now().date()
+        booking = Booking.objects.create(room=room, customer_name="Alice", check_in=today,
+                                         check_out=today + datetime.timedelta(days=1))
+        enqueue_email("Invoice", "Body", to=["alice@example.com"], booking=booking, attach_invoice=True)
+        enqueue_email("Reminder", "Body", to=["bob@example.com"])
+        with mock.patch("booking.outbox.get_invoice_pdf", side_effect=RenderTimeout("slow")):
+            self.assertEqual(deliver_pending(), (1, 1, 0))
+        self.connection.send_messages.assert_called_once()
+        self.assertEqual(self.connection.close.call_count, 1)   # only the final close
+
+    def test_transport_error_reconnects_for_the_next_message(self):
+        self.connection.send_messages.side_effect = [OSError("connection reset"), 1]
+        enqueue_email("One", "Body", to=["a@example.com"])
+        enqueue_email("Two", "Body", to=["b@example.com"])
+        self.assertEqual(deliver_pending(), (1, 1, 0))
+        self.assertEqual(self.connection.close.call_count, 2)
+        self.assertEqual(self.connection.open.call_count, 2)
@@ -0,0 +1,98 @@
+# booking/tests/test_pdf.py
+import asyncio
+import datetime
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from booking.models import Room, Booking
+from booking.pdf import RenderPool, RenderQueueFull, RenderTimeout, arender_pdf, render_pdf
+
+
+class RenderPoolTests(SimpleTestCase):
+    """The pool's bounds and timeouts, with a thread standing in for the worker process."""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+        def slow_write_pdf(html, base_url=None):
+            self.release.wait(5)
+            return b"%PDF-1.7 " + html.encode()
+
+        patcher = mock.patch("booking.pdf.write_pdf", side_effect=slow_write_pdf)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _pool(self, queue_size):
+        # spawned processes wouldn't see the mock; a thread keeps the job in this process
+        pool = RenderPool(workers=1, queue_size=queue_size)
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown, wait=True)
+        pool._get_executor = lambda: executor
+        return pool
+
+    def _use(self, pool):
+        patcher = mock.patch("booking.pdf.get_pool", return_value=pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_full_queue_fails_fast_and_frees_the_slot_when_done(self):
+        pool = self._pool(queue_size=1)
+        running = pool.submit("<p>one</p>")
+        with self.assertRaises(RenderQueueFull):
+            pool.submit("<p>two</p>", wait=0)
+
+        self.release.set()
+        self.assertEqual(running.result(timeout=5), b"%PDF-1.7 <p>one</p>")
+        self.assertEqual(pool.submit("<p>three</p>", wait=1).result(timeout=5), b"%PDF-1.7 <p>three</p>")
+
+    def test_render_timeout(self):
+        self._use(self._pool(queue_size=2))
+        with self.assertRaises(RenderTimeout):
+            render_pdf("<p>slow</p>", timeout=0.05)
+        self.release.set()
+
+    def test_inline_pool_renders_and_releases(self):
+        self.release.set()
+        pool = RenderPool(workers=0, queue_size=1)
+        for _ in range(2):
+            self.assertEqual(pool.submit("<p>x</p>", wait=0).result(), b"%PDF-1.7 <p>x</p>")
+
+    def test_async_render(self):
+        self._use(self._pool(queue_size=2))
+        self.release.set()
+        self.assertEqual(asyncio.run(arender_pdf("<p>async</p>", timeout=5)), b"%PDF-1.7 <p>async</p>")
+
+    def test_async_render_timeout(self):
+        self._use(self._pool(queue_size=2))
+        with self.assertRaises(RenderTimeout):
+            asyncio.run(arender_pdf("<p>slow</p>", timeout=0.05))
+        self.release.set()
+
+
+class RenderBusyResponseTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(INVOICE_CACHE_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        room = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        today = datetime.date.today()
+        self.booking = Booking.objects.create(
+            room=room, customer_name="Alice", check_in=today, check_out=today + datetime.timedelta(days=1),
+        )
+
+    def test_saturated_pool_is_a_503_with_retry_after(self):
+        for error in (RenderQueueFull("full"), RenderTimeout("slow")):
+            with mock.patch("booking.invoices.render_pdf", side_effect=error):
+                for url in (f"/booking/{self.booking.id}/invoice/", f"/booking/{self.booking.id}/invoice/download/"):
+                    resp = self.client.get(url)
+                    self.assertEqual(resp.status_code, 503)
+                    self.assertEqual(resp["Retry-After"], "5")
@@ -0,0 +1,50 @@
+# booking/tests/test_portal.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from booking.models import Room, Booking
+from booking.pagination import PORTAL_PAGE_SIZE
+
+
+class PortalPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("corp", password="pw")
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+        day = datetime.date(2030, 1, 1)
+        for i in range(PORTAL_PAGE_SIZE + 5):
+            Booking.objects.create(
+                room=room, user=self.user, customer_name=f"Guest {i}",
+                check_in=day + datetime.timedelta(days=2 * i), check_out=day + datetime.timedelta(days=2 * i + 1),
+            )
+        self.client.force_login(self.user)
+
+    def test_pages_walk_newest_first_and_back(self):
+        first = self.client.get("/portal/bookings/")
+        items = first.context["bookings"]
+        self.assertEqual(len(items), PORTAL_PAGE_SIZE)
+        self.assertNotIn("customer_name", items[0].__dict__)   # only() projection
+        self.assertIsNone(first.context["page"]["newer"])
+
+        second = self.client.get(f"/portal/bookings/?after={first.context['page']['older']}")
+        self.assertEqual(len(second.context["bookings"]), 5)
+        self.assertIsNone(second.context["page"]["older"])
+        seen = [b.id for b in items] + [b.id for b in second.context["bookings"]]
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+        back = self.client.get(f"/portal/bookings/?before={second.context['page']['newer']}")
+        self.assertEqual([b.id for b in back.context["bookings"]], [b.id for b in items])
+        self.assertIsNone(back.context["page"]["newer"])
+
+    def test_query_count_independent_of_history(self):
+        # session + user + one joined page of bookings
+        with self.assertNumQueries(3):
+            self.client.get("/portal/bookings/")
+        with self.assertNumQueries(3):
+            self.client.get("/my-bookings/")
+
+    def test_bad_cursor_gives_first_page(self):
+        response = self.client.get("/my-bookings/?after=not-a-cursor")
+        self.assertEqual(len(response.context["bookings"]), PORTAL_PAGE_SIZE)
@@ -0,0 +1,73 @@
+# booking/tests/test_query_plans.py
+import datetime
+
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.models import Booking
+from booking.stats import day_bounds
+
+
+class HotQueryPlanTests(TestCase):
+    """EXPLAIN every hot Booking query and fail on a full scan of the table."""
+
+    def assertUsesIndex(self, queryset, index=None):
+        plan = queryset.explain()
+        table = Booking._meta.db_table
+        scans = [
+            line for line in plan.splitlines()
+            if f"SCAN {table}" in line and "INDEX" not in line
+        ]
+        self.assertFalse(scans, f"full scan of {table}:\n{plan}")
+        if index:
+            self.assertIn(index, plan)
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plans are asserted against SQLite's EXPLAIN QUERY PLAN output")
+        self.today = timezone.localdate()
+        self.period = day_bounds(self.today - datetime.timedelta(days=30), self.today)
+
+    def test_period_filters(self):
+        lo, hi = self.period
+        period = Booking.objects.filter(created_at__gte=lo, created_at__lt=hi)
+        self.assertUsesIndex(period, "booking_created_idx")
+        self.assertUsesIndex(period.filter(payment_status="paid"), "booking_pay_created_idx")
+        self.assertUsesIndex(period.filter(room__room_type="Suite"))
+
+    def test_billing_maintenance_scans(self):
+        cutoff = timezone.now() - datetime.timedelta(days=2)
+        overdue = Booking.objects.filter(payment_status="unpaid", created_at__lte=cutoff).exclude(status="cancelled")
+        self.assertUsesIndex(overdue, "booking_pay_created_idx")
+
+    def test_todays_movements(self):
+        movements = Booking.objects.filter(Q(check_in=self.today) | Q(check_out=self.today))
+        self.assertUsesIndex(movements, "booking_check_in_idx")
+        self.assertIn("booking_check_out_idx", movements.explain())
+
+    def test_top_rooms_grouping(self):
+        lo, hi = self.period
+        top = (
+            Booking.objects.filter(created_at__gte=lo, created_at__lt=hi)
+            .values("room").annotate(n=Count("id")).order_by("-n")
+        )
+        self.assertUsesIndex(top)
+
+    def test_customer_keyset_page(self):
+        page = (
+            Booking.objects.filter(user_id=1)
+            .filter(Q(created_at__lt=timezone.now()) | Q(created_at=timezone.now(), id__lt=10))
+            .order_by("-created_at", "-id")[:26]
+        )
+        self.assertUsesIndex(page, "booking_user_created_idx")
+
+    def test_admin_search_without_fts(self):
+        from booking.admin import BookingAdmin
+
+        self.assertUsesIndex(BookingAdmin.indexed_search(Booking.objects.all(), "ali"), "booking_customer_name_idx")
+
+    def test_room_bookings_page(self):
+        page = Booking.objects.filter(room_id=1, check_in__lt=self.today).order_by("-check_in", "-id")[:21]
+        self.assertUsesIndex(page, "booking_room_check_in_idx")
@@ -0,0 +1,96 @@
+# booking/tests/test_reports.py
+import datetime
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from pypdf import PdfReader, PdfWriter
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from booking.models import Room, Booking, ReportJob
+from booking import reports
+from booking.reports import run_pending
+
+
+class BackgroundReportTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(REPORT_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        render = mock.patch("booking.reports.render_pdf", return_value=b"%PDF-1.7 report")
+        self.render_pdf = render.start()
+        self.addCleanup(render.stop)
+
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+        today = timezone.localdate()
+        for i in range(5):
+            check_in = today + datetime.timedelta(days=10 + i * 2)
+            Booking.objects.create(room=room, customer_name=f"Guest {i}", check_in=check_in,
+                                   check_out=check_in + datetime.timedelta(days=1))
+
+    def test_export_queues_a_job_without_rendering(self):
+        resp = self.client.get("/admin/?export=pdf")
+        job = ReportJob.objects.get()
+        self.assertRedirects(resp, f"/admin/reports/{job.id}/")
+        self.assertEqual(job.status, "queued")
+        self.render_pdf.assert_not_called()
+        self.assertContains(self.client.get(f"/admin/reports/{job.id}/"), 'http-equiv="refresh"')
+
+    def test_worker_renders_in_chunks_and_download_serves_file(self):
+        self.client.get("/admin/?export=pdf")
+        with mock.patch("booking.reports.REPORT_CHUNK_SIZE", 2):
+            self.assertEqual(run_pending(), 1)
+
+        job = ReportJob.objects.get()
+        self.assertEqual((job.status, job.progress), ("done", 100))
+        self.render_pdf.assert_called_once()
+        html = self.render_pdf.call_args[0][0]
+        self.assertEqual(html.count("Guest "), 5)
+
+        status = self.client.get(f"/admin/reports/{job.id}/?format=json").json()
+        self.assertEqual(status["download_url"], f"/admin/reports/{job.id}/download/")
+        resp = self.client.get(status["download_url"])
+        self.assertEqual(b"".join(resp.streaming_content), b"%PDF-1.7 report")
+
+    def test_render_failure_is_recorded(self):
+        self.render_pdf.side_effect = RuntimeError("boom")
+        self.client.get("/admin/?export=pdf")
+        run_pending()
+        job = ReportJob.objects.get()
+        self.assertEqual(job.status, "failed")
+        self.assertIn("boom", job.error)
+        self.assertEqual(self.client.get(f"/admin/reports/{job.id}/download/").status_code, 404)
+
+    def test_long_tables_render_in_batches_and_are_concatenated(self):
+        def one_page_pdf(html, timeout=None):
+            writer, out = PdfWriter(), BytesIO()
+            writer.add_blank_page(width=200, height=200)
+            writer.write(out)
+            return out.getvalue()
+
+        self.render_pdf.side_effect = one_page_pdf
+        self.client.get("/admin/?export=pdf")
+        progress = []
+        real_set_progress = reports._set_progress
+        with mock.patch("booking.reports.REPORT_BATCH_ROWS", 2), mock.patch(
+            "booking.reports._set_progress", side_effect=lambda job, p: progress.append(p) or real_set_progress(job, p)
+        ):
+            run_pending()
+
+        job = ReportJob.objects.get()
+        self.assertEqual(job.status, "done")
+        # 5 bookings, 2 per batch: three documents, header and charts only in the first
+        batches = [call.args[0] for call in self.render_pdf.call_args_list]
+        self.assertEqual([html.count("Guest ") for html in batches], [2, 2, 1])
+        self.assertIn("Key performance indicators", batches[0])
+        self.assertNotIn("Key performance indicators", batches[1])
+        self.assertEqual(progress, [31, 63, 95])
+        self.assertEqual(len(PdfReader(job.file_path).pages), 3)
@@ -0,0 +1,74 @@
+# booking/tests/test_room_admin.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from booking.admin import ROOM_BOOKINGS_PAGE_SIZE
+from booking.models import Room, Booking
+
+
+class RoomChangePageTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+        self.room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+        self.day = datetime.date(2030, 1, 1)
+
+    def book(self, n):
+        start = Booking.objects.count()
+        for i in range(start, start + n):
+            check_in = self.day + datetime.timedelta(days=2 * i)
+            Booking.objects.create(
+                room=self.room, customer_name=f"Guest {i}",
+                check_in=check_in, check_out=check_in + datetime.timedelta(days=1),
+            )
+
+    def change_page_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/admin/booking/room/{self.room.pk}/change/")
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_change_page_cost_independent_of_history(self):
+        self.book(1)
+        self.change_page_queries()   # warm the ContentType cache
+        few, response = self.change_page_queries()
+        self.assertNotContains(response, "bookings-TOTAL_FORMS")   # no inline formset
+        self.assertContains(response, f"/admin/booking/room/{self.room.pk}/bookings/")
+        self.book(30)
+        self.assertEqual(self.change_page_queries()[0], few)
+        self.assertEqual(few, 5)   # session, user, savepoint pair and the room itself
+
+    def test_bookings_fragment_pages_latest_first(self):
+        self.book(ROOM_BOOKINGS_PAGE_SIZE + 3)
+        url = f"/admin/booking/room/{self.room.pk}/bookings/"
+        first = self.client.get(url)
+        rows = first.context["bookings"]
+        self.assertEqual(len(rows), ROOM_BOOKINGS_PAGE_SIZE)
+        self.assertEqual(rows[0].customer_name, f"Guest {ROOM_BOOKINGS_PAGE_SIZE + 2}")
+        self.assertContains(first, f'data-next="{url}?after=')
+        self.assertContains(first, "/admin/booking/booking/")
+
+        second = self.client.get(url, {"after": first.context["older"]})
+        self.assertEqual([b.customer_name for b in second.context["bookings"]], ["Guest 2", "Guest 1", "Guest 0"])
+        self.assertNotContains(second, "data-next")
+
+    def test_bookings_fragment_needs_booking_view_permission(self):
+        self.book(1)
+        staff = get_user_model().objects.create_user("clerk", password="pw", is_staff=True)
+        staff.user_permissions.add(Permission.objects.get(codename="view_room"))
+        self.client.force_login(staff)
+
+        change = self.client.get(f"/admin/booking/room/{self.room.pk}/change/")
+        self.assertEqual(change.status_code, 200)
+        self.assertNotContains(change, "room-bookings")
+        self.assertEqual(self.client.get(f"/admin/booking/room/{self.room.pk}/bookings/").status_code, 403)
+
+        staff.user_permissions.add(Permission.objects.get(codename="view_booking"))
+        staff = get_user_model().objects.get(pk=staff.pk)   # drop the cached permission set
+        self.client.force_login(staff)
+        self.assertContains(self.client.get(f"/admin/booking/room/{self.room.pk}/bookings/"), "Guest 0")
@@ -0,0 +1,62 @@
+# booking/tests/test_search.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from booking.models import Room, Booking
+from booking.search import rebuild_search_index, search_available, search_booking_ids
+
+
+class BookingSearchTests(TestCase):
+    def setUp(self):
+        if not search_available():
+            self.skipTest("needs SQLite with FTS5")
+        self.staff = get_user_model().objects.create_user("desk", "desk@example.com", "pw", is_staff=True)
+        self.suite = Room.objects.create(room_number="701", room_type="Suite", price=Decimal("300.00"))
+        day = datetime.date(2030, 5, 1)
+        self.alice = Booking.objects.create(
+            room=self.suite, customer_name="Alice Smith", customer_email="alice@example.com",
+            check_in=day, check_out=day + datetime.timedelta(days=2),
+        )
+        self.bob = Booking.objects.create(
+            room=self.suite, user=self.staff, customer_name="Bob Alison",
+            check_in=day + datetime.timedelta(days=3), check_out=day + datetime.timedelta(days=4),
+        )
+
+    def test_prefix_match_and_ranking(self):
+        self.assertEqual(search_booking_ids("ali smi"), [self.alice.id])
+        self.assertEqual(search_booking_ids(self.bob.invoice_number.lower()), [self.bob.id])
+        self.assertCountEqual(search_booking_ids("701"), [self.alice.id, self.bob.id])
+        # a hit in the name outranks one in the account email
+        self.assertEqual(search_booking_ids("ali")[0], self.alice.id)
+        self.assertEqual(search_booking_ids("\"*"), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.alice.customer_name = "Alicia Jones"
+        self.alice.save()
+        self.assertEqual(search_booking_ids("jon"), [self.alice.id])
+        self.suite.room_number = "801"
+        self.suite.save()
+        self.assertCountEqual(search_booking_ids("801"), [self.alice.id, self.bob.id])
+        self.bob.delete()
+        self.assertEqual(search_booking_ids("bob"), [])
+        self.staff.email = "frontdesk@example.com"
+        self.staff.save()
+        self.assertEqual(rebuild_search_index(), 1)
+
+    def test_staff_lookup_endpoint(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/staff/bookings/lookup/", {"q": "smith"})
+        results = response.json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.alice.id])
+        self.assertEqual(results[0]["room"], "701")
+        self.assertEqual(self.client.get("/staff/bookings/lookup/").json()["results"], [])
+
+    def test_admin_search_uses_index(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+        response = self.client.get("/admin/booking/booking/", {"q": "alis"})
+        self.assertEqual([b.id for b in response.context["cl"].result_list], [self.bob.id])
+        self.assertIn("booking_search", connection.introspection.table_names())
@@ -0,0 +1,59 @@
+# booking/tests/test_sequences.py
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.availability import RoomUnavailable
+from booking.models import Room, Booking, InvoiceSequence
+from booking.sequences import assign_invoice_numbers, reserve_invoice_numbers
+
+
+class InvoiceSequenceTests(TestCase):
+    def setUp(self):
+        self.room = Room.objects.create(room_number="101", room_type="Single", price=Decimal("100.00"))
+        self.year = timezone.now().year
+
+    def _booking(self, **kwargs):
+        day = datetime.date(2031, 1, 1) + datetime.timedelta(days=2 * Booking.objects.count())
+        return Booking(room=self.room, customer_name="Guest", check_in=day,
+                       check_out=day + datetime.timedelta(days=1), **kwargs)
+
+    def test_save_takes_next_number(self):
+        first = self._booking()
+        first.save()
+        second = self._booking()
+        second.save()
+        self.assertEqual(first.invoice_number, f"INV-{self.year}-001")
+        self.assertEqual(second.invoice_number, f"INV-{self.year}-002")
+
+    def test_rejected_booking_leaves_no_gap(self):
+        first = self._booking()
+        first.save()
+        clash = Booking(room=self.room, customer_name="Late", check_in=first.check_in, check_out=first.check_out)
+        with self.assertRaises(RoomUnavailable):
+            clash.save()
+        self.assertEqual(clash.invoice_number, "")
+        second = self._booking()
+        second.save()
+        self.assertEqual(second.invoice_number, f"INV-{self.year}-002")
+
+    def test_seeds_past_legacy_numbers(self):
+        self._booking(invoice_number=f"INV-{self.year}-041").save()
+        booking = self._booking()
+        booking.save()
+        self.assertEqual(booking.invoice_number, f"INV-{self.year}-042")
+
+    def test_block_reservation_is_contiguous(self):
+        block = reserve_invoice_numbers(100, year=2040)
+        self.assertEqual((block.start, block.stop), (1, 101))
+        self.assertEqual(reserve_invoice_numbers(1, year=2040)[0], 101)
+        self.assertEqual(InvoiceSequence.objects.get(year=2040).last_number, 101)
+
+    def test_assign_uses_one_reservation(self):
+        reserve_invoice_numbers(1, year=2041)  # first use of a year seeds the row
+        bookings = [self._booking() for _ in range(3)]
+        with self.assertNumQueries(2 + 1 + 1):  # savepoint pair + UPDATE + SELECT
+            assign_invoice_numbers(bookings, year=2041)
+        self.assertEqual([b.invoice_number for b in bookings], ["INV-2041-002", "INV-2041-003", "INV-2041-004"])
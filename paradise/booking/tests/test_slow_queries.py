@@ -0,0 +1,87 @@
+# booking/tests/test_slow_queries.py
+import logging
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from booking import slow_queries
+from booking.logs import LazyDirRotatingFileHandler
+from booking.models import Room, Booking, SlowQuery
+
+
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        slow_queries._scan_checked.clear()
+        Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+
+    def test_normalized_sql_groups_literals(self):
+        self.assertEqual(
+            slow_queries.normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND n = 5 AND s = 'x'"),
+            "SELECT * FROM t WHERE id IN (...) AND n = ? AND s = ?",
+        )
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_query_is_recorded_with_plan(self):
+        with self.assertLogs("booking.slow_queries", "WARNING"):
+            list(Room.objects.filter(room_type="Suite"))
+        row = SlowQuery.objects.filter(normalized_sql__contains='FROM "booking_room"').latest("id")
+        self.assertEqual(row.reason, "slow")
+        self.assertIn("room_type_idx", row.plan)
+        self.assertIn("Suite", row.params)
+
+    def test_full_scan_of_bookings_is_flagged_once(self):
+        with self.assertLogs("booking.slow_queries", "WARNING"):
+            list(Booking.objects.filter(customer_email="alice@example.com"))
+        list(Booking.objects.filter(customer_email="bob@example.com"))  # same shape: already checked
+        row = SlowQuery.objects.get()
+        self.assertEqual((row.reason, row.full_scan), ("full_scan", True))
+        self.assertIn("customer_email", row.normalized_sql)
+
+        list(Booking.objects.filter(payment_status="paid"))  # indexed: not recorded
+        self.assertEqual(SlowQuery.objects.count(), 1)
+
+    def test_admin_groups_by_fingerprint(self):
+        with self.assertLogs("booking.slow_queries", "WARNING"):
+            list(Booking.objects.filter(customer_email="alice@example.com"))
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+        resp = self.client.get("/admin/slow-queries/")
+        self.assertEqual(len(resp.context["groups"]), 1)
+        self.assertEqual(resp.context["groups"][0]["full_scans"], 1)
+
+        # junk falls back to a week; out-of-range windows are clamped to 1..90 days
+        for days, expected in (("abc", 7), ("-5", 1), ("99999999999", 90)):
+            resp = self.client.get("/admin/slow-queries/", {"days": days})
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual((timezone.now() - resp.context["since"]).days, expected)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_nothing_recorded_during_migrate_or_before_the_table_exists(self):
+        room_queries = SlowQuery.objects.filter(normalized_sql__contains='FROM "booking_room"')
+        with override_settings(SLOW_QUERY_MS=0):
+            with mock.patch("booking.slow_queries.current_source", return_value="manage.py migrate"):
+                list(Room.objects.filter(room_type="Suite"))
+            slow_queries._table_ready.clear()
+            with mock.patch.object(connection.introspection, "table_names", return_value=[]):
+                list(Room.objects.filter(room_type="Suite"))
+        self.assertFalse(room_queries.exists())
+
+        with override_settings(SLOW_QUERY_MS=0), self.assertLogs("booking.slow_queries", "WARNING"):
+            list(Room.objects.filter(room_type="Suite"))
+        self.assertTrue(room_queries.exists())
+
+
+class LazyDirLogHandlerTests(TestCase):
+    def test_directory_is_created_on_first_write_only(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "var", "log", "slow_queries.log")
+            handler = LazyDirRotatingFileHandler(path, delay=True)
+            self.assertFalse(os.path.exists(os.path.dirname(path)))
+            handler.emit(logging.makeLogRecord({"msg": "slow"}))
+            handler.close()
+            self.assertTrue(os.path.isfile(path))
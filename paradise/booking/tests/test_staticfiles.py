@@ -0,0 +1,95 @@
+# booking/tests/test_staticfiles.py
+import json
+import os
+import shutil
+import sys
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+
+from booking.models import Room
+from booking.staticfiles import _compressors, serve_static
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "booking.staticfiles.PrecompressedManifestStaticFilesStorage"},
+}
+
+
+class PrecompressedStaticTests(TestCase):
+    def setUp(self):
+        src, self.root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, src, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        os.makedirs(os.path.join(src, "css"))
+        with open(os.path.join(src, "css", "style.css"), "w") as fh:
+            fh.write(".hero { background: url('../img/hero.png'); }\n" * 50)
+        os.makedirs(os.path.join(src, "img"))
+        Image.new("RGB", (200, 100), "navy").save(os.path.join(src, "img", "hero.png"), compress_level=0)
+
+        override = override_settings(STATICFILES_DIRS=[("theme", src)], STATIC_ROOT=self.root, STORAGES=STORAGES)
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.modify_settings(INSTALLED_APPS={"remove": "django.contrib.admin"}):   # just the theme
+            call_command("collectstatic", interactive=False, verbosity=0)
+        with open(os.path.join(self.root, "staticfiles.json")) as fh:
+            self.manifest = json.load(fh)["paths"]
+
+    def test_build_fingerprints_and_compresses(self):
+        css = self.manifest["theme/css/style.css"]
+        self.assertRegex(css, r"style\.[0-9a-f]{12}\.css$")
+        for ext in (".gz", ".br"):
+            self.assertLess(os.path.getsize(os.path.join(self.root, css + ext)), os.path.getsize(os.path.join(self.root, css)))
+        png = self.manifest["theme/img/hero.png"]
+        self.assertLess(os.path.getsize(os.path.join(self.root, png)), os.path.getsize(os.path.join(self.root, "theme/img/hero.png")))
+
+    def test_build_without_brotli_writes_gzip_only(self):
+        with mock.patch.dict(sys.modules, {"brotli": None}):   # import brotli -> ImportError
+            self.assertEqual([ext for ext, _ in _compressors()], [".gz"])
+        self.assertEqual([ext for ext, _ in _compressors()], [".br", ".gz"])
+
+    def test_serve_picks_encoding(self):
+        url = "/static/" + self.manifest["theme/css/style.css"]
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT_ENCODING="br;q=0, gzip;q=0.5")["Content-Encoding"], "gzip")
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn(b".hero", b"".join(plain.streaming_content))
+
+    def test_serve_rejects_traversal(self):
+        with self.assertRaises(Http404):
+            serve_static(RequestFactory().get("/static/"), "../manage.py")
+        self.assertEqual(self.client.get("/static/theme/missing.css").status_code, 404)
+
+
+class PublicPagesUnderManifestTests(TestCase):
+    """Every {% static %} a public page uses must be in the manifest (it is strict)."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        override = override_settings(STATIC_ROOT=self.root, STORAGES=STORAGES)
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.modify_settings(INSTALLED_APPS={"remove": "django.contrib.admin"}):
+            call_command("collectstatic", interactive=False, verbosity=0)
+        cache.clear()
+
+    def test_public_pages_render(self):
+        Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+        for url in ("/", "/rooms/", "/book/", "/accounts/login/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+        self.assertContains(self.client.get("/rooms/"), "/static/images/room-p4.")
@@ -0,0 +1,80 @@
+# booking/tests/test_stats.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.models import Room, Booking, DailyBookingStat, DailyPaymentStat
+from booking.stats import refresh_all, refresh_day
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("250.00"))
+        self.today = timezone.localdate()
+
+    def _booking(self, offset, nights=2, **kwargs):
+        check_in = self.today + datetime.timedelta(days=offset)
+        return Booking.objects.create(
+            room=self.room, customer_name="Guest", check_in=check_in,
+            check_out=check_in + datetime.timedelta(days=nights), **kwargs
+        )
+
+    def test_save_refreshes_the_day(self):
+        self._booking(10, nights=3, source="agent")
+        self._booking(20, nights=1, source="agent")
+        row = DailyBookingStat.objects.get(date=self.today, source="agent", payment_status="unpaid")
+        self.assertEqual((row.bookings, row.nights, row.room_revenue), (2, 4, Decimal("500.00")))
+
+    def test_payment_moves_booking_between_rows(self):
+        booking = self._booking(10)
+        booking.payment_status = "paid"
+        booking.amount_paid = Decimal("250.00")
+        booking.save()
+        self.assertFalse(DailyBookingStat.objects.filter(payment_status="unpaid").exists())
+        self.assertEqual(DailyBookingStat.objects.get(payment_status="paid").amount_paid, Decimal("250.00"))
+
+    def test_refresh_upserts_rows_another_writer_just_inserted(self):
+        self._booking(10)
+        row = DailyBookingStat.objects.get()
+        # a concurrent refresh of the same day already wrote (stale) numbers for the group
+        DailyBookingStat.objects.filter(pk=row.pk).update(bookings=99)
+        self.assertEqual(refresh_day(self.today), 1)
+        self.assertEqual(DailyBookingStat.objects.get(pk=row.pk).bookings, 1)
+
+    def test_delete_and_full_rebuild(self):
+        booking = self._booking(10)
+        booking.delete()
+        self.assertFalse(DailyBookingStat.objects.exists())
+
+        self._booking(30)
+        DailyBookingStat.objects.all().delete()
+        self.assertEqual(refresh_all(), 1)
+
+    def test_staff_finance_reads_rollup(self):
+        self._booking(10)
+        self.client.force_login(
+            get_user_model().objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        )
+        resp = self.client.get("/staff/finance/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["total_unpaid_count"], 1)
+
+    def test_daily_paid_revenue_is_grouped_by_payment_day(self):
+        paid_later = timezone.now() + datetime.timedelta(days=3)
+        for offset in (10, 20):
+            self._booking(offset, payment_status="paid", amount_paid=Decimal("250.00"), payment_date=paid_later)
+        self._booking(30, payment_status="paid", amount_paid=Decimal("100.00"), payment_date=timezone.now())
+        self.assertEqual(DailyPaymentStat.objects.count(), 2)
+
+        self.client.force_login(
+            get_user_model().objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        )
+        resp = self.client.get("/staff/finance/")
+        self.assertEqual(
+            [(d["payment_date"], d["count"], d["amount"]) for d in resp.context["daily"]],
+            [(self.today, 1, Decimal("100.00")), (timezone.localdate(paid_later), 2, Decimal("500.00"))],
+        )
+        self.assertNotContains(resp, "by booking date")
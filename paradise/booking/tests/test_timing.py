@@ -0,0 +1,56 @@
+# booking/tests/test_timing.py
+import datetime
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.models import Room, Booking
+from booking.testing import QueryBudgetMixin
+from booking.timing import collect, span
+
+
+class RequestTimingTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        room = Room.objects.create(room_number="101", room_type="Suite", price=Decimal("200.00"))
+        today = timezone.localdate()
+        for i in range(3):
+            check_in = today + datetime.timedelta(days=5 + i * 2)
+            Booking.objects.create(room=room, customer_name=f"Guest {i}", check_in=check_in,
+                                   check_out=check_in + datetime.timedelta(days=1))
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs("booking.timing", "INFO") as logs:
+            resp = self.client.get("/admin/")
+        header = resp["Server-Timing"]
+        self.assertRegex(header, r'^sql;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn("chart;dur=", header)
+        self.assertIn("template;dur=", header)
+
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((entry["path"], entry["status"]), ("/admin/", 200))
+        self.assertTrue(entry["view"].endswith("CustomAdminSite.index"))
+        self.assertGreater(entry["queries"], 0)
+
+    def test_no_header_for_anonymous_visitors(self):
+        self.client.logout()
+        self.assertNotIn("Server-Timing", self.client.get("/rooms/"))
+
+    def test_views_stay_within_their_query_budgets(self):
+        self.assertWithinQueryBudget("/admin/")
+        self.assertWithinQueryBudget("/staff/finance/")
+        self.assertWithinQueryBudget("/staff/finance/export/csv/")
+
+    def test_spans_accumulate_only_inside_a_request(self):
+        with span("chart"):
+            pass  # no collector: nothing recorded, nothing raised
+        with collect() as timings:
+            for _ in range(2):
+                with span("pdf"):
+                    pass
+        self.assertEqual(list(timings.spans), ["pdf"])
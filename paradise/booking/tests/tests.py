@@ -54,7 +54,7 @@ class DashboardSmokeTests(TestCase):
         resp = self.client.get("/admin/?export=csv")
         self.assertEqual(resp.status_code, 200)
         self.assertIn("text/csv", resp["Content-Type"])
-        body = resp.content.decode("utf-8", errors="ignore")
+        body = b"".join(resp.streaming_content).decode("utf-8", errors="ignore")
         # header "Customer" should be present in CSV output first line
         first_line = body.splitlines()[0] if body else ""
         self.assertIn("Customer", first_line)
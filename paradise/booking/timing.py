@@ -0,0 +1,82 @@
+# booking/timing.py
+"""
+Per-request timing: SQL (via connection.execute_wrapper) and named spans.
+
+RequestTimingMiddleware (booking/middleware.py) opens a RequestTimings for
+each request. Code that does expensive work wraps it in `span("name")`:
+chart rendering, PDF rendering, email. Outside a request (management
+commands, tests calling functions directly) span() is a no-op.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("booking_request_timings", default=None)
+
+
+class RequestTimings:
+    """Accumulated SQL and span timings for one request (milliseconds)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.spans = {}   # name -> total ms
+        self.view = ""
+        self.query_budget = None
+
+    def add(self, name, ms):
+        self.spans[name] = self.spans.get(name, 0.0) + ms
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook: time every query on the connection
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_ms += (time.perf_counter() - started) * 1000
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Make a fresh RequestTimings current for the duration of the block."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name):
+    """Time a block under `name` in the current request, if there is one."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - started) * 1000)
+
+
+def query_budget(max_queries):
+    """
+    Declare how many queries a view may run; see booking/testing.py and the timing middleware.
+    Only queries made before the view returns count: a streaming response's
+    body (CSV/Parquet exports) runs its queries later, outside the budget.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
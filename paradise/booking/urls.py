@@ -8,9 +8,12 @@ urlpatterns = [
     path("rooms/", views.room_list, name="room_list"),
     path("rooms/<int:pk>/", views.room_detail, name="room_detail"),
     path("book/", views.book_room, name="book_room"),
+    path("signup/", views.signup, name="signup"),
+    path("my-bookings/", views.my_bookings, name="my_bookings"),
 
     # Existing booking utilities
     path("booking/<int:booking_id>/invoice/", views.download_invoice, name="download_invoice"),
+    path("booking/<int:pk>/invoice/download/", views.booking_invoice, name="booking_invoice"),
     path("booking/<int:booking_id>/paypal-start/", views.start_payment, name="paypal_start"),
     path("booking/<int:booking_id>/paypal-success/", views.paypal_success, name="paypal_success"),
     path("booking/<int:booking_id>/paypal-cancel/", views.paypal_cancel, name="paypal_cancel"),
@@ -21,5 +24,7 @@ urlpatterns = [
 
     # ✅ Step 14: Staff Finance Dashboard + CSV
     path("staff/finance/", views.staff_finance, name="staff_finance"),
+    path("staff/bookings/lookup/", views.staff_booking_lookup, name="staff_booking_lookup"),
     path("staff/finance/export/csv/", views.finance_csv, name="finance_csv"),
+    path("staff/finance/export/parquet/", views.finance_parquet, name="finance_parquet"),
 ]
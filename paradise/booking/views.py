@@ -1,11 +1,8 @@
 # booking/views.py
-import tempfile
-import csv
 from datetime import timedelta
 
 from decimal import Decimal
 
-import weasyprint
 import paypalrestsdk
 
 from django.conf import settings
@@ -13,15 +10,26 @@ from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
-from django.core.mail import EmailMessage
-from django.db.models import Count, Sum
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.template.loader import render_to_string
+from django.urls import reverse
 from django.utils.dateparse import parse_date
 from django.utils.timezone import now
 
 from .models import Room, Booking, Payment  # assumes Payment model exists with booking FK
+from .availability import RoomUnavailable, available_rooms, is_room_available
+from .catalogue import catalogue_page, catalogue_rooms
+from .invoices import invoice_path
+from .outbox import enqueue_email
+from .pdf import PDFRenderError
+from .dashboard import plan_finance
+from .exports import ExportUnavailable, stream_csv, stream_parquet
+from .pagination import keyset_page
+from .search import search_booking_ids
+from .stats import day_bounds
+from .timing import query_budget
 from booking.utils import send_booking_confirmation
 from django.contrib.auth.decorators import login_required
 
@@ -56,14 +64,45 @@ def signup(request):
     return render(request, "booking/signup.html", {"form": form})
 
 
+def _parse_stay(params):
+    """Return (check_in, check_out) from request params, or (None, None) if missing/invalid."""
+    check_in = parse_date(params.get("check_in") or "")
+    check_out = parse_date(params.get("check_out") or "")
+    if not check_in or not check_out or check_in >= check_out:
+        return None, None
+    return check_in, check_out
+
+
+@catalogue_page
 def room_list(request):
-    rooms = Room.objects.all()
-    return render(request, "booking/room_list.html", {"rooms": rooms})
+    """
+    All rooms, or — when ?check_in=&check_out= are given — only the rooms that
+    are free for every night of the stay (optionally narrowed by ?room_type=).
+    """
+    check_in, check_out = _parse_stay(request.GET)
+    room_type = request.GET.get("room_type") or None
+    if check_in:
+        rooms = available_rooms(check_in, check_out, room_type=room_type)
+    else:
+        rooms = catalogue_rooms()
+        if room_type:
+            rooms = [room for room in rooms if room.room_type == room_type]
+    return render(request, "booking/room_list.html", {
+        "rooms": rooms,
+        "check_in": check_in,
+        "check_out": check_out,
+        "room_type": room_type or "",
+    })
 
 
+@catalogue_page
 def room_detail(request, pk):
     room = get_object_or_404(Room, pk=pk)
-    return render(request, "booking/room_detail.html", {"room": room})
+    check_in, check_out = _parse_stay(request.GET)
+    context = {"room": room, "check_in": check_in, "check_out": check_out}
+    if check_in:
+        context["is_available"] = is_room_available(room, check_in, check_out)
+    return render(request, "booking/room_detail.html", context)
 
 
 def book_room(request):
@@ -72,17 +111,34 @@ def book_room(request):
     since your stubbed BookingForm wasn’t actually wired.
     """
     if request.method == "POST":
-        room_id = request.POST.get("room_id")
+        room = get_object_or_404(Room, id=request.POST.get("room_id"))
         customer = request.POST.get("customer_name")
-        checkin = request.POST.get("check_in")
-        checkout = request.POST.get("check_out")
-
-        booking = Booking.objects.create(
-            room=Room.objects.get(id=room_id),
-            customer_name=customer,
-            check_in=checkin,
-            check_out=checkout,
-        )
+        checkin, checkout = _parse_stay(request.POST)
+
+        if not checkin:
+            messages.error(request, "Please choose a check-out date after the check-in date.")
+            return render(request, "booking/book_room.html", {"rooms": catalogue_rooms()}, status=400)
+
+        # The room-night index rejects overlapping stays (see booking/availability.py);
+        # the atomic block makes sure a rejected stay leaves no Booking row behind.
+        try:
+            with transaction.atomic():
+                booking = Booking.objects.create(
+                    room=room,
+                    customer_name=customer,
+                    check_in=checkin,
+                    check_out=checkout,
+                )
+        except RoomUnavailable:
+            messages.error(
+                request,
+                f"Room {room.room_number} is already booked for some of those nights.",
+            )
+            context = {
+                "rooms": catalogue_rooms(),
+                "alternatives": available_rooms(checkin, checkout, room_type=room.room_type),
+            }
+            return render(request, "booking/book_room.html", context, status=409)
 
         # Optional confirmation email (your util)
         try:
@@ -94,15 +150,29 @@ def book_room(request):
         # ✅ Show confirmation page
         return render(request, "booking/booking_success.html", {"booking": booking})
 
-    rooms = Room.objects.all()
-    return render(request, "booking/book_room.html", {"rooms": rooms})
+    # the form carries a per-visitor CSRF token, so only the room list is cached
+    return render(request, "booking/book_room.html", {"rooms": catalogue_rooms()})
+
+
+# Columns the customer pages render (one query per page: bookings joined to their rooms)
+MY_BOOKINGS_FIELDS = (
+    "id", "created_at", "check_in", "check_out", "room__room_number", "room__room_type",
+)
+PORTAL_BOOKING_FIELDS = MY_BOOKINGS_FIELDS + (
+    "invoice_number", "status", "payment_status", "amount_paid", "payment_date",
+)
 
 
 def my_bookings(request):
     if not request.user.is_authenticated:
         return redirect("login")
-    bookings = Booking.objects.filter(user=request.user).order_by("-created_at")
-    return render(request, "booking/my_bookings.html", {"bookings": bookings})
+    page = keyset_page(
+        Booking.objects.filter(user=request.user)
+        .select_related("room")
+        .only(*MY_BOOKINGS_FIELDS),
+        request.GET,
+    )
+    return render(request, "booking/my_bookings.html", {"bookings": page["items"], "page": page})
 
 
 def room_bookings_view(request, room_id):
@@ -114,23 +184,39 @@ def room_bookings_view(request, room_id):
 # ---------------------------------------------------------------------
 # Invoice (kept both endpoints you had)
 # ---------------------------------------------------------------------
-def booking_invoice(request, pk):
-    booking = get_object_or_404(Booking, pk=pk)
-    html = render_to_string("booking/invoice.html", {"booking": booking})
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f"attachment; filename=invoice_{booking.id}.pdf"
-    weasyprint.HTML(string=html).write_pdf(response)
+def _render_busy():
+    """503 for when the PDF pool is saturated or a render timed out."""
+    response = HttpResponse("Invoice rendering is busy, please try again in a moment.", status=503)
+    response["Retry-After"] = "5"
     return response
 
 
-def download_invoice(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
-    html = render_to_string("booking/invoice.html", {"booking": booking})
+def booking_invoice(request, pk):
+    booking = get_object_or_404(Booking.objects.select_related("room"), pk=pk)
+    try:
+        path = invoice_path(booking)
+    except PDFRenderError:
+        return _render_busy()
+    return FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename=f"invoice_{booking.id}.pdf",
+        content_type="application/pdf",
+    )
 
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="Invoice-{booking.invoice_number}.pdf"'
-    weasyprint.HTML(string=html).write_pdf(response)
-    return response
+
+def download_invoice(request, booking_id):
+    booking = get_object_or_404(Booking.objects.select_related("room"), id=booking_id)
+    try:
+        path = invoice_path(booking)
+    except PDFRenderError:
+        return _render_busy()
+
+    return FileResponse(
+        open(path, "rb"),
+        filename=f"Invoice-{booking.invoice_number}.pdf",
+        content_type="application/pdf",
+    )
 
 
 # ---------------------------------------------------------------------
@@ -216,8 +302,15 @@ def payment_success(request, booking_id):
     booking.payment_status = "paid"
     booking.amount_paid = amount
     booking.payment_date = now()
-    booking.status = "confirmed"
-    booking.save()
+    previous_status, booking.status = booking.status, "confirmed"
+    try:
+        with transaction.atomic():
+            booking.save()
+    except RoomUnavailable:
+        # e.g. a cancelled booking paid late, after its nights went to someone else:
+        # keep the payment on record without confirming the stay, and let staff sort it out
+        booking.status = previous_status
+        booking.save()
 
     # Update Payment row if present
     try:
@@ -225,12 +318,15 @@ def payment_success(request, booking_id):
     except Exception:
         pass
 
-    # ---------- Generate PDF Invoice ----------
-    html = render_to_string("booking/invoice.html", {"booking": booking})
-    pdf_file = tempfile.NamedTemporaryFile(delete=True, suffix=".pdf")
-    weasyprint.HTML(string=html).write_pdf(pdf_file.name)
+    if booking.status != "confirmed":
+        messages.error(
+            request,
+            f"Payment received for {booking.invoice_number}, but room {booking.room.room_number} is no longer "
+            "free for those dates. Our team will contact you to rebook or refund.",
+        )
+        return redirect("my_bookings")
 
-    # ---------- Send Email with Invoice ----------
+    # ---------- Queue invoice email (PDF is attached by the outbox worker) ----------
     recipient = None
     if booking.user and getattr(booking.user, "email", None):
         recipient = booking.user.email
@@ -238,18 +334,14 @@ def payment_success(request, booking_id):
         recipient = booking.customer_email
 
     if recipient:
-        email = EmailMessage(
+        enqueue_email(
             subject=f"Paradise Hotel Invoice — {booking.invoice_number}",
             body="Thank you for your booking. Your payment was successful. The invoice is attached as a PDF.",
             from_email="no-reply@paradisehotel.com",
             to=[recipient],
+            booking=booking,
+            attach_invoice=True,
         )
-        try:
-            email.attach_file(pdf_file.name)
-            email.send()
-        except Exception:
-            # Don’t crash the flow if email backend isn’t configured
-            pass
 
     messages.success(request, f"Payment successful for {booking.invoice_number}. Invoice emailed.")
     # You can redirect to details page if you have it, else back to my bookings
@@ -271,8 +363,20 @@ def payment_cancel(request, booking_id):
 
     # Mark booking as unpaid/pending
     booking.payment_status = "unpaid"
-    booking.status = "pending"
-    booking.save()
+    previous_status, booking.status = booking.status, "pending"
+    try:
+        with transaction.atomic():
+            booking.save()
+    except RoomUnavailable:
+        # the booking had released its room and someone else has the nights now
+        booking.status = previous_status
+        booking.save()
+        messages.error(
+            request,
+            f"Payment cancelled for {booking.invoice_number}. Room {booking.room.room_number} is no longer "
+            "free for those dates, so the booking could not be reopened.",
+        )
+        return redirect("my_bookings")
 
     messages.error(request, f"Payment cancelled for {booking.invoice_number}.")
     return redirect("my_bookings")
@@ -311,21 +415,17 @@ def process_refund(request, booking_id):
             recipient = booking.customer_email
 
         if recipient:
-            try:
-                messages_body = (
-                    f"Dear {booking.customer_name}, your payment of {booking.amount_paid} "
-                    f"has been refunded for invoice {booking.invoice_number}."
-                )
-                from django.core.mail import send_mail
-                send_mail(
-                    subject=f"Refund Issued — {booking.invoice_number}",
-                    message=messages_body,
-                    from_email="noreply@paradisehotel.com",
-                    recipient_list=[recipient],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+            messages_body = (
+                f"Dear {booking.customer_name}, your payment of {booking.amount_paid} "
+                f"has been refunded for invoice {booking.invoice_number}."
+            )
+            enqueue_email(
+                subject=f"Refund Issued — {booking.invoice_number}",
+                body=messages_body,
+                from_email="noreply@paradisehotel.com",
+                to=[recipient],
+                booking=booking,
+            )
 
         messages.success(request, f"Refund processed for {booking.invoice_number}.")
     else:
@@ -364,13 +464,19 @@ def portal_bookings(request):
     Signed-in user sees their bookings, payment status, invoice download,
     and a PayPal 'Complete payment' action if unpaid.
     """
-    bookings = Booking.objects.filter(user=request.user).order_by("-created_at")
-    return render(request, "booking/portal_bookings.html", {"bookings": bookings})
+    page = keyset_page(
+        Booking.objects.filter(user=request.user)
+        .select_related("room")
+        .only(*PORTAL_BOOKING_FIELDS),
+        request.GET,
+    )
+    return render(request, "booking/portal_bookings.html", {"bookings": page["items"], "page": page})
 
 # =================================================
 # Step 14 — STAFF FINANCE DASHBOARD (no JavaScript)
 # =================================================
 @staff_member_required
+@query_budget(6)
 def staff_finance(request):
     """
     Staff summary of revenue & payment breakdown with filters.
@@ -378,79 +484,102 @@ def staff_finance(request):
     start_date, end_date = _parse_period(request)
     status = request.GET.get("payment_status")  # unpaid|paid|refunded|all/None
 
-    qs = Booking.objects.filter(created_at__date__gte=start_date,
-                                created_at__date__lte=end_date)
+    created_from, created_to = day_bounds(start_date, end_date)
+    qs = Booking.objects.filter(created_at__gte=created_from, created_at__lt=created_to)
 
     if status in {"unpaid", "paid", "refunded"}:
         qs = qs.filter(payment_status=status)
+    else:
+        status = None
 
-    # Totals
-    total_paid = qs.filter(payment_status="paid").aggregate(s=Sum("amount_paid"))["s"] or 0
-    total_unpaid_count = qs.filter(payment_status="unpaid").count()
-    total_paid_count = qs.filter(payment_status="paid").count()
-    total_refunded_count = qs.filter(payment_status="refunded").count()
-
-    # Revenue by day (simple list for the template)
-    daily = (
-        qs.filter(payment_status="paid")
-          .values("payment_date")
-          .annotate(amount=Sum("amount_paid"), count=Count("id"))
-          .order_by("payment_date")
-    )
+    # Totals, and daily paid revenue by payment day: the two rollups (booking/dashboard.py)
+    finance = plan_finance(start_date, end_date, payment_status=status)
 
     context = {
         "start": start_date,
         "end": end_date,
         "filter_payment_status": status or "",
-        "total_paid": total_paid,
-        "total_unpaid_count": total_unpaid_count,
-        "total_paid_count": total_paid_count,
-        "total_refunded_count": total_refunded_count,
-        "daily": daily,
+        "total_paid": finance["total_paid"],
+        "total_unpaid_count": finance["total_unpaid_count"],
+        "total_paid_count": finance["total_paid_count"],
+        "total_refunded_count": finance["total_refunded_count"],
+        "daily": finance["daily"],
         "rows": qs.select_related("room").order_by("-created_at")[:200],  # cap for page
     }
     return render(request, "booking/staff_finance.html", context)
 
-@staff_member_required
-def finance_csv(request):
-    """
-    Export filtered finance data as CSV (same filters as staff_finance).
-    """
+FINANCE_EXPORT_FIELDS = (
+    "invoice_number", "customer_name", "customer_email", "room__room_number", "room__room_type",
+    "status", "payment_status", "amount_paid", "payment_date",
+    "source", "check_in", "check_out", "created_at",
+)
+
+
+def _finance_csv_row(values):
+    (invoice_number, customer_name, email, room_number, room_type,
+     status, payment_status, amount_paid, payment_date,
+     source, check_in, check_out, created_at) = values
+    return [
+        invoice_number, customer_name, email or "", room_number or "", room_type or "",
+        status, payment_status, amount_paid or 0, payment_date or "",
+        source, check_in, check_out, created_at.strftime("%Y-%m-%d %H:%M"),
+    ]
+
+
+# Parquet column names/types for FINANCE_EXPORT_FIELDS (see booking/exports.py)
+FINANCE_PARQUET_COLUMNS = [
+    ("invoice_number", "string"), ("customer_name", "string"), ("customer_email", "string"),
+    ("room_number", "string"), ("room_type", "category"),
+    ("status", "category"), ("payment_status", "category"), ("amount_paid", "decimal"),
+    ("payment_date", "timestamp"), ("source", "category"),
+    ("check_in", "date"), ("check_out", "date"), ("created_at", "timestamp"),
+]
+
+
+def _finance_export_queryset(request):
+    """Bookings for the finance exports, with the staff_finance filters applied."""
     start_date, end_date = _parse_period(request)
     status = request.GET.get("payment_status")
 
-    qs = Booking.objects.filter(created_at__date__gte=start_date,
-                                created_at__date__lte=end_date)
+    created_from, created_to = day_bounds(start_date, end_date)
+    qs = Booking.objects.filter(created_at__gte=created_from, created_at__lt=created_to)
     if status in {"unpaid", "paid", "refunded"}:
         qs = qs.filter(payment_status=status)
+    return qs.order_by("id"), start_date, end_date
 
-    response = HttpResponse(content_type="text/csv")
-    filename = f"finance_{start_date}_{end_date}.csv"
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
-    writer = csv.writer(response)
-    writer.writerow([
-        "Invoice #", "Customer", "Email", "Room", "Room Type",
-        "Status", "Payment Status", "Amount Paid", "Payment Date",
-        "Source", "Check-in", "Check-out", "Created"
-    ])
-    for b in qs.select_related("room"):
-        writer.writerow([
-            b.invoice_number,
-            b.customer_name,
-            b.customer_email or "",
-            getattr(b.room, "room_number", ""),
-            getattr(b.room, "room_type", ""),
-            b.status,
-            b.payment_status,
-            b.amount_paid or 0,
-            b.payment_date or "",
-            b.source,
-            b.check_in,
-            b.check_out,
-            b.created_at.strftime("%Y-%m-%d %H:%M"),
-        ])
-    return response
+@staff_member_required
+@query_budget(4)
+def finance_csv(request):
+    """
+    Export filtered finance data as CSV (same filters as staff_finance).
+    """
+    qs, start_date, end_date = _finance_export_queryset(request)
+    return stream_csv(
+        request,
+        f"finance_{start_date}_{end_date}.csv",
+        [
+            "Invoice #", "Customer", "Email", "Room", "Room Type",
+            "Status", "Payment Status", "Amount Paid", "Payment Date",
+            "Source", "Check-in", "Check-out", "Created"
+        ],
+        qs,
+        FINANCE_EXPORT_FIELDS,
+        _finance_csv_row,
+    )
+
+@staff_member_required
+@query_budget(4)
+def finance_parquet(request):
+    """
+    Same rows and filters as finance_csv, as typed Parquet for pandas/Arrow.
+    """
+    qs, start_date, end_date = _finance_export_queryset(request)
+    try:
+        return stream_parquet(
+            f"finance_{start_date}_{end_date}.parquet", FINANCE_PARQUET_COLUMNS, qs, FINANCE_EXPORT_FIELDS
+        )
+    except ExportUnavailable as exc:
+        return HttpResponse(str(exc), status=501)
 
 # ================
 # PayPal aliases
@@ -458,3 +587,49 @@ def finance_csv(request):
 # If your earlier names differ, keep the ones you already wired in urls.
 paypal_success = payment_success  # if your existing function is named payment_success
 paypal_cancel = payment_cancel    # alias for consistency
+
+
+# =================================================
+# STAFF BOOKING LOOKUP (front desk search box)
+# =================================================
+LOOKUP_FIELDS = (
+    "id", "invoice_number", "customer_name", "customer_email", "check_in", "check_out",
+    "status", "payment_status", "room__room_number",
+)
+
+
+@staff_member_required
+@query_budget(4)
+def staff_booking_lookup(request):
+    """
+    JSON list of the bookings best matching ?q= (invoice number, guest name or
+    email, room number, account), ranked by the full-text index (booking/search.py).
+    """
+    term = (request.GET.get("q") or "").strip()
+    ids = search_booking_ids(term) if term else []
+    if ids is None:
+        # no FTS index on this database: exact invoice/room match or a guest-name prefix
+        ids = list(
+            Booking.objects.filter(
+                Q(invoice_number=term.upper())
+                | Q(room__room_number=term)
+                | Q(customer_name__gte=term, customer_name__lt=term + "\U0010ffff")
+            ).order_by("-created_at").values_list("id", flat=True)[:20]
+        )
+    found = Booking.objects.select_related("room").only(*LOOKUP_FIELDS).in_bulk(ids)
+    results = [
+        {
+            "id": b.id,
+            "invoice_number": b.invoice_number,
+            "customer_name": b.customer_name,
+            "customer_email": b.customer_email,
+            "room": b.room.room_number,
+            "check_in": b.check_in,
+            "check_out": b.check_out,
+            "status": b.status,
+            "payment_status": b.payment_status,
+            "admin_url": reverse("admin:booking_booking_change", args=[b.id]),
+        }
+        for b in (found[i] for i in ids if i in found)
+    ]
+    return JsonResponse({"query": term, "results": results})
@@ -1,4 +1,3 @@
-import os
 from pathlib import Path
 
 # --------------------------------------------------
@@ -38,6 +37,7 @@ INSTALLED_APPS = [
 # Middleware
 # --------------------------------------------------
 MIDDLEWARE = [
+    "booking.middleware.RequestTimingMiddleware",   # SQL/span timings, Server-Timing header
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -120,14 +120,52 @@ LOCALE_PATHS = [
 # --------------------------------------------------
 # For serving CSS, JS, images
 STATIC_URL = "/static/"
-STATICFILES_DIRS = [BASE_DIR / "static"]  # for development
+STATICFILES_DIRS = [
+    BASE_DIR / "static",  # for development
+    ("theme", BASE_DIR.parent / "paradise-bootstrap" / "assets"),  # {% static 'theme/css/style.css' %}
+]
 STATIC_ROOT = BASE_DIR / "staticfiles"    # for collectstatic in production
 
+# Production: collectstatic fingerprints files and writes .gz/.br siblings (booking/staticfiles.py),
+# so {% static %} needs the manifest — run collectstatic before starting with DEBUG off.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage" if DEBUG
+            else "booking.staticfiles.PrecompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+
 # For room images and user uploads
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 
+# --------------------------------------------------
+# Cache (shared by every process on the host)
+# --------------------------------------------------
+# Catalogue versions (booking/catalogue.py), dashboard charts warmed by
+# `manage.py warm_dashboard_charts` (booking/charts.py) and image variant lists
+# must be seen by every gunicorn worker and management command, so the default
+# per-process LocMemCache is not enough. Files under var/cache need no extra
+# service on a single host; across several hosts point this at Redis instead
+# ("django.core.cache.backends.redis.RedisCache", needs the `redis` package).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "var" / "cache",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
+
+# Test runs get a private LocMemCache and keep the slow-query log off disk
+# (booking/testing.py), whichever way `test` is started
+TEST_RUNNER = "booking.testing.BookingTestRunner"
+
+
 # --------------------------------------------------
 # Default primary key field type
 # --------------------------------------------------
@@ -141,6 +179,50 @@ PAYPAL_CLIENT_SECRET = "ELRkcoi05qFqse1K1PCkM3bEphVH6WQx7gy8d6rLie8TctUhzamD4CKC
 PAYPAL_MODE = "sandbox"  # "live" later
 
 
+# PDF rendering pool (booking/pdf.py) ==========================================
+
+PDF_RENDER_WORKERS = 2          # WeasyPrint processes; 0 renders inline (tests/dev)
+PDF_RENDER_QUEUE_SIZE = 16      # jobs queued or running before callers get a 503
+PDF_RENDER_TIMEOUT = 30         # seconds per job
+PDF_RENDER_SUBMIT_TIMEOUT = 2   # seconds to wait for a free queue slot
+
+# Rendered invoices, keyed by a hash of the invoice fields (booking/invoices.py)
+INVOICE_CACHE_DIR = BASE_DIR / "var" / "invoices"
+
+# Slow-query log (booking/slow_queries.py); SLOW_QUERY_MS = None turns it off
+SLOW_QUERY_MS = 200
+SLOW_QUERY_SCAN_TABLES = ("booking_booking",)   # full scans of these are logged on first sight
+
+# Logging: slow queries go to var/log/slow_queries.log, not the console. The
+# directory is created by the handler on the first write (nothing is written
+# on startup); on a read-only deploy point LOG_DIR at a writable volume.
+LOG_DIR = BASE_DIR / "var" / "log"
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "slow_queries": {
+            "class": "booking.logs.LazyDirRotatingFileHandler",
+            "filename": LOG_DIR / "slow_queries.log",
+            "maxBytes": 5 * 1024 * 1024,
+            "backupCount": 5,
+            "delay": True,
+            "formatter": "plain",
+        },
+    },
+    "loggers": {
+        "booking.slow_queries": {"handlers": ["slow_queries"], "level": "WARNING", "propagate": False},
+    },
+}
+
+# Background dashboard PDF reports (booking/reports.py, `manage.py run_report_jobs`)
+REPORT_DIR = BASE_DIR / "var" / "reports"
+REPORT_RENDER_TIMEOUT = 600     # seconds; long ranges make big tables
+
+
 # =============================================================
 
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -151,5 +233,9 @@ EMAIL_HOST_USER = "nuhad7july02@gmail.com"
 EMAIL_HOST_PASSWORD = "rkypyfyuxuqoskzu"  # ⚠️ Use app password, not plain password
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Email outbox (booking/outbox.py, `manage.py deliver_outbox`)
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
 
-# ========================================================================
\ No newline at end of file
+# ========================================================================
@@ -1,9 +1,10 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
 # Use the custom admin site we made
 from booking.admin import custom_admin_site
+from booking.staticfiles import serve_static
 
 urlpatterns = [
     # ✅ Custom Admin (replaces default admin)
@@ -16,7 +17,12 @@ urlpatterns = [
     path("accounts/", include("django.contrib.auth.urls")),
 ]
 
-# ✅ Serve media (room images) + static files during development
+# ✅ Serve media (room images) during development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+# ✅ Collected static files, precompressed (br/gzip) and fingerprinted; runserver's
+#    own static handler still takes over in DEBUG
+urlpatterns += [
+    re_path(rf"^{settings.STATIC_URL.strip('/')}/(?P<path>.+)$", serve_static, name="static"),
+]